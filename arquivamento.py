@@ -0,0 +1,158 @@
+"""Arquivamento de cortes antigos em partições mensais (tabelas cortes_AAAA_MM).
+
+A tabela cortes é a tabela quente: fila do dia, histórico recente e tudo o
+que ainda está em aberto ou sem pagar. Cortes finalizados e pagos com mais de
+alguns meses saem dela para a partição do mês de chegada, com as mesmas colunas
+e o mesmo índice de chegada; o catálogo arquivo_cortes diz quais meses existem.
+
+  - resumo_diario não muda: o trigger de DELETE de cortes ignora os uids já
+    registrados em arquivo_uids, então séries, totais e tempo médio continuam
+    cobrindo o histórico inteiro;
+  - as consultas por período passam por banco.fonte_cortes, que só une as
+    partições quando o período chega a um mês arquivado;
+  - fiado (pago = 0) e cortes em aberto nunca são arquivados.
+
+No app.py a réplica só arquiva o que já foi enviado ao Supabase, e uma
+alteração remota de um corte arquivado o devolve à tabela quente antes de ser
+aplicada (desarquivar). O Supabase tem o próprio arquivamento, em tabelas
+particionadas (supabase/migrations/20261017070000_arquivo_cortes.sql).
+
+Linha de comando:
+    python arquivamento.py --meses 12
+    python arquivamento.py --meses 12 --replica   (banco do app.py)
+"""
+import argparse
+from datetime import date
+
+from banco import get_pool, get_cache, COLUNAS_PARTICAO, tabela_particao
+from metricas import medir
+
+HORIZONTE_MESES = 12  # meses inteiros que ficam na tabela quente, além do atual
+
+SQL_PARTICAO = '''
+    CREATE TABLE IF NOT EXISTS {tabela}
+        (id INTEGER PRIMARY KEY,
+         cliente TEXT,
+         chegada DATETIME,
+         saida DATETIME,
+         pago BOOLEAN,
+         valor REAL,
+         barbeiro TEXT NOT NULL DEFAULT '',
+         inicio DATETIME,
+         cliente_id INTEGER,
+         uid TEXT,
+         updated_at TEXT,
+         pendente INTEGER NOT NULL DEFAULT 0);
+    CREATE INDEX IF NOT EXISTS idx_{tabela}_chegada ON {tabela} (chegada, id);
+'''
+
+# Tira do resumo diário a contribuição de um corte arquivado (a mesma conta do trigger
+# resumo_cortes_update da migração 11), antes de o INSERT na tabela quente somá-la de novo
+SQL_DESCONTAR_RESUMO = '''
+    UPDATE resumo_diario SET
+        cortes = cortes - 1,
+        finalizados = finalizados - (a.saida IS NOT NULL),
+        faturado = faturado - COALESCE(a.valor, 0),
+        recebido = recebido - CASE WHEN a.pago THEN COALESCE(a.valor, 0) ELSE 0 END,
+        minutos = minutos - COALESCE(CASE WHEN (julianday(a.saida) - julianday(a.chegada)) * 1440 BETWEEN 5 AND 180
+                                   THEN (julianday(a.saida) - julianday(a.chegada)) * 1440 END, 0),
+        medidos = medidos - COALESCE((julianday(a.saida) - julianday(a.chegada)) * 1440 BETWEEN 5 AND 180, 0),
+        a_receber = a_receber - CASE WHEN a.saida IS NOT NULL AND a.pago = 0 THEN COALESCE(a.valor, 0) ELSE 0 END
+    FROM (SELECT chegada, saida, pago, valor, barbeiro FROM {tabela} WHERE id = ?) AS a
+    WHERE resumo_diario.dia = date(a.chegada) AND resumo_diario.barbeiro = a.barbeiro
+'''
+
+
+def limite_arquivamento(meses=HORIZONTE_MESES, hoje=None):
+    """Primeiro dia do mês mais antigo que fica na tabela quente."""
+    hoje = hoje or date.today()
+    indice = hoje.year * 12 + hoje.month - 1 - meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _meses(inicio, fim):
+    """('AAAA-MM', primeiro dia, primeiro dia do mês seguinte) de cada mês de inicio até antes de fim."""
+    mes = date(inicio.year, inicio.month, 1)
+    while mes < fim:
+        seguinte = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+        yield f"{mes:%Y-%m}", mes, seguinte
+        mes = seguinte
+
+
+def arquivar(meses=HORIZONTE_MESES, somente_sincronizados=False, hoje=None):
+    """Move para as partições os cortes finalizados e pagos anteriores ao limite. Devolve {mês: linhas}.
+
+    Um mês por transação: entre um mês e outro a fila continua gravando.
+    somente_sincronizados (réplica do app.py): o que ainda não foi enviado ao
+    Supabase fica na tabela quente até o próximo arquivamento.
+    """
+    limite = limite_arquivamento(meses, hoje)
+    filtro = "chegada >= ? AND chegada < ? AND saida IS NOT NULL AND pago = 1"
+    if somente_sincronizados:
+        filtro += " AND pendente = 0"
+    movidos = {}
+    with get_pool().conexao() as conn:
+        # Colunas DATETIME têm afinidade NUMERIC: compara sempre com datas completas
+        primeira = conn.execute("SELECT MIN(chegada) FROM cortes WHERE chegada < ?",
+                                (limite.isoformat(),)).fetchone()[0]
+        if primeira is None:
+            return movidos
+        for mes, inicio, fim in _meses(date.fromisoformat(primeira[:10]), limite):
+            periodo = (inicio.isoformat(), fim.isoformat())
+            if not conn.execute(f"SELECT EXISTS (SELECT 1 FROM cortes WHERE {filtro})", periodo).fetchone()[0]:
+                continue
+            tabela = tabela_particao(mes)
+            with medir("sqlite", f"arquivar {mes}") as medida:
+                conn.executescript(SQL_PARTICAO.format(tabela=tabela))
+                with conn:
+                    linhas = conn.execute(f"INSERT INTO {tabela} ({COLUNAS_PARTICAO}) "
+                                          f"SELECT {COLUNAS_PARTICAO} FROM cortes WHERE {filtro}", periodo).rowcount
+                    # arquivo_uids antes do DELETE: o trigger resumo_cortes_delete mantém esses no resumo
+                    conn.execute(f"INSERT INTO arquivo_uids (uid, mes, id) SELECT uid, ?, id FROM cortes "
+                                 f"WHERE {filtro}", (mes, *periodo))
+                    conn.execute(f"DELETE FROM cortes WHERE {filtro}", periodo)
+                    conn.execute("INSERT INTO arquivo_cortes (mes, linhas) VALUES (?, ?) "
+                                 "ON CONFLICT (mes) DO UPDATE SET linhas = linhas + excluded.linhas", (mes, linhas))
+                medida.resultado(linhas)
+            movidos[mes] = linhas
+        if movidos:
+            conn.execute("PRAGMA optimize")
+    if movidos:
+        get_cache().invalidar("cortes", "arquivo_cortes")
+    return movidos
+
+
+def desarquivar(conn, uid):
+    """Devolve à tabela quente o corte arquivado com este uid, na transação de quem chama.
+
+    Devolve True se o corte estava arquivado (quem chama invalida o cache de
+    cortes e arquivo_cortes depois do commit).
+    """
+    linha = conn.execute("SELECT mes, id FROM arquivo_uids WHERE uid = ?", (uid,)).fetchone()
+    if linha is None:
+        return False
+    mes, id_corte = linha
+    tabela = tabela_particao(mes)
+    conn.execute(SQL_DESCONTAR_RESUMO.format(tabela=tabela), (id_corte,))
+    # Sai do catálogo antes do INSERT: o trigger arquivo_cortes_insert ignoraria a linha
+    conn.execute("DELETE FROM arquivo_uids WHERE uid = ?", (uid,))
+    conn.execute(f"INSERT INTO cortes ({COLUNAS_PARTICAO}) SELECT {COLUNAS_PARTICAO} FROM {tabela} WHERE id = ?",
+                 (id_corte,))
+    conn.execute(f"DELETE FROM {tabela} WHERE id = ?", (id_corte,))
+    conn.execute("UPDATE arquivo_cortes SET linhas = linhas - 1 WHERE mes = ?", (mes,))
+    return True
+
+
+# --- LINHA DE COMANDO ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arquiva cortes finalizados e pagos em partições mensais.")
+    parser.add_argument("--meses", type=int, default=HORIZONTE_MESES,
+                        help="meses inteiros mantidos na tabela quente, além do atual")
+    parser.add_argument("--replica", action="store_true",
+                        help="banco do app.py: arquiva só o que já foi enviado ao Supabase")
+    args = parser.parse_args()
+
+    movidos = arquivar(args.meses, somente_sincronizados=args.replica)
+    for mes, linhas in movidos.items():
+        print(f"{mes}: {linhas} corte(s)")
+    print(f"{sum(movidos.values())} corte(s) arquivado(s) antes de {limite_arquivamento(args.meses):%d/%m/%Y}.")
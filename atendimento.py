@@ -0,0 +1,226 @@
+"""Escalonador da fila: barbeiros, cadeiras, prioridade de mensalistas e estimativa de espera.
+
+Um Escalonador por processo guarda em memória só a fila ativa de hoje
+(quem aguarda e quem está na cadeira) e uma janela móvel com as durações dos
+últimos atendimentos de cada barbeiro. Ele se mantém atualizado pelo registro
+de alterações do banco (banco.alteracoes_desde), relendo só os cortes que
+mudaram; a estimativa de espera percorre a fila ativa uma vez, sem consultar
+o histórico.
+
+Ordem de atendimento: mensalistas com plano ativo primeiro, depois os demais;
+dentro de cada grupo, por ordem de chegada.
+"""
+import bisect
+import heapq
+import threading
+from collections import deque
+from datetime import date, datetime
+
+import streamlit as st
+
+from banco import get_pool, carregar_registros, ultima_alteracao, alteracoes_desde
+from metricas import medir
+from modelos import COLUNAS_CORTE, corte
+
+JANELA_DURACAO = 20      # atendimentos considerados na média de cada barbeiro
+DURACAO_PADRAO = 30.0    # minutos, enquanto não há histórico
+# Durações fora desta faixa (em minutos) são esquecimentos de "Finalizar", não atendimentos
+DURACAO_MINIMA, DURACAO_MAXIMA = 5, 180
+CADEIRA_UNICA = ""       # sem barbeiros cadastrados, a barbearia funciona com uma cadeira
+
+
+class DuracaoMovel:
+    """Média das últimas JANELA_DURACAO durações, atualizada em O(1)."""
+    __slots__ = ("_valores", "_soma")
+
+    def __init__(self, janela=JANELA_DURACAO):
+        self._valores = deque(maxlen=janela)
+        self._soma = 0.0
+
+    def adicionar(self, minutos):
+        if len(self._valores) == self._valores.maxlen:
+            self._soma -= self._valores[0]
+        self._valores.append(minutos)
+        self._soma += minutos
+
+    def media(self, padrao=DURACAO_PADRAO):
+        return self._soma / len(self._valores) if self._valores else padrao
+
+
+def _duracao(corte):
+    """Minutos de cadeira; cortes antigos, sem inicio, contam desde a chegada."""
+    comeco = corte.inicio or corte.chegada
+    if not (comeco and corte.saida):
+        return None
+    minutos = (corte.saida - comeco).total_seconds() / 60
+    return minutos if DURACAO_MINIMA <= minutos <= DURACAO_MAXIMA else None
+
+
+def _ordem(corte):
+    return (corte.chegada, corte.id)
+
+
+class Escalonador:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.recarregar()
+
+    # --- CARGA ---
+    def recarregar(self):
+        with self._lock:
+            self._recarregar()
+
+    def _recarregar(self):
+        self.dia = date.today()
+        self.seq = ultima_alteracao()
+        self.barbeiros = self._ler_barbeiros()
+        self.mensalistas = self._ler_mensalistas()
+        self.duracoes = {nome: DuracaoMovel() for nome in self.barbeiros}
+        self.duracao_geral = DuracaoMovel()
+        with get_pool().conexao() as conn, medir("sqlite", "escalonador: duracoes"):
+            for nome in self.barbeiros:
+                # Usa idx_cortes_barbeiro_saida: lê só os últimos atendimentos de cada um
+                for inicio, chegada, saida in conn.execute(
+                        "SELECT inicio, chegada, saida FROM cortes WHERE barbeiro = ? AND saida IS NOT NULL "
+                        "ORDER BY saida DESC LIMIT ?", (nome, JANELA_DURACAO)).fetchall()[::-1]:
+                    self._registrar_duracao(nome, corte(None, (None, "", chegada, saida, 1, None, nome, inicio, None)))
+        # Fila ativa: cortes de hoje sem saída (idx_cortes_chegada)
+        self.aguardando = {}                       # id -> Corte
+        self.prioritarios, self.comuns = [], []    # (chegada, id), em ordem de chegada
+        self.atendendo = {}                        # barbeiro -> Corte
+        for registro in carregar_registros(
+                f"SELECT {COLUNAS_CORTE} FROM cortes WHERE chegada >= ? AND saida IS NULL",
+                (self.dia.isoformat(),), corte, usar_cache=False):
+            self._entrar(registro)
+
+    def _ler_barbeiros(self):
+        with get_pool().conexao() as conn:
+            nomes = [linha[0] for linha in conn.execute(
+                "SELECT nome FROM barbeiros WHERE ativo = 1 AND cadeira IS NOT NULL ORDER BY cadeira, nome")]
+        return nomes or [CADEIRA_UNICA]
+
+    def _ler_mensalistas(self):
+        """ids dos clientes com plano ativo (planos e cortes ligados pelo cadastro de clientes)."""
+        with get_pool().conexao() as conn:
+            return {linha[0] for linha in conn.execute(
+                "SELECT DISTINCT cliente_id FROM planos WHERE excluido = 0 AND status = 'Ativo' "
+                "AND vencimento >= ? AND cliente_id IS NOT NULL", (date.today().isoformat(),))}
+
+    # --- ESTRUTURA EM MEMÓRIA ---
+    def _registrar_duracao(self, barbeiro, registro):
+        minutos = _duracao(registro)
+        if minutos is not None:
+            self.duracoes.setdefault(barbeiro, DuracaoMovel()).adicionar(minutos)
+            self.duracao_geral.adicionar(minutos)
+
+    def _media(self, barbeiro):
+        duracao = self.duracoes.get(barbeiro)
+        return duracao.media(self.duracao_geral.media()) if duracao else self.duracao_geral.media()
+
+    def _grupo(self, registro):
+        return self.prioritarios if self.mensalista(registro.cliente_id) else self.comuns
+
+    def _entrar(self, registro):
+        if registro.saida or not registro.chegada or registro.chegada.date() < self.dia:
+            return
+        if registro.inicio:
+            self.atendendo[registro.barbeiro or CADEIRA_UNICA] = registro
+        else:
+            self.aguardando[registro.id] = registro
+            bisect.insort(self._grupo(registro), _ordem(registro))
+
+    def _sair(self, id_corte):
+        """Tira o corte da fila ativa; devolve (barbeiro, Corte) se ele estava na cadeira."""
+        registro = self.aguardando.pop(id_corte, None)
+        if registro:
+            for grupo in (self.prioritarios, self.comuns):
+                posicao = bisect.bisect_left(grupo, _ordem(registro))
+                if posicao < len(grupo) and grupo[posicao] == _ordem(registro):
+                    del grupo[posicao]
+            return None
+        for barbeiro, atual in list(self.atendendo.items()):
+            if atual.id == id_corte:
+                return barbeiro, self.atendendo.pop(barbeiro)
+        return None
+
+    def _reordenar(self):
+        """Refaz os grupos quando a lista de mensalistas muda (O(fila ativa))."""
+        self.prioritarios, self.comuns = [], []
+        for registro in sorted(self.aguardando.values(), key=_ordem):
+            self._grupo(registro).append(_ordem(registro))
+
+    # --- ATUALIZAÇÃO PELO REGISTRO DE ALTERAÇÕES ---
+    def atualizar(self):
+        with self._lock:
+            if self.dia != date.today():
+                self._recarregar()
+                return
+            seq = self.seq
+            self.seq, ids = alteracoes_desde("cortes", seq)
+            _, ids_planos = alteracoes_desde("planos", seq)
+            _, ids_barbeiros = alteracoes_desde("barbeiros", seq)
+            if None in (ids, ids_planos, ids_barbeiros) or ids_barbeiros:
+                self._recarregar()
+                return
+            if ids_planos:
+                self.mensalistas = self._ler_mensalistas()
+                self._reordenar()
+            if not ids:
+                return
+            marcadores = ",".join("?" * len(ids))
+            for registro in carregar_registros(f"SELECT {COLUNAS_CORTE} FROM cortes WHERE id IN ({marcadores})",
+                                               tuple(ids), corte, usar_cache=False):
+                saiu = self._sair(registro.id)
+                if saiu and registro.saida:
+                    self._registrar_duracao(registro.barbeiro or saiu[0], registro)
+                self._entrar(registro)
+
+    # --- CONSULTAS ---
+    def mensalista(self, cliente_id):
+        return cliente_id in self.mensalistas
+
+    def proximos(self, quantidade):
+        """Os próximos clientes a serem chamados (mensalistas primeiro)."""
+        self.atualizar()
+        with self._lock:
+            ids = [id_corte for grupo in (self.prioritarios, self.comuns) for _, id_corte in grupo[:quantidade]]
+            return [self.aguardando[id_corte] for id_corte in ids[:quantidade]]
+
+    def cadeiras(self):
+        """[(barbeiro, Corte na cadeira ou None)], na ordem das cadeiras."""
+        self.atualizar()
+        with self._lock:
+            return [(nome, self.atendendo.get(nome)) for nome in self.barbeiros]
+
+    def estimativas(self, agora=None):
+        """{id do corte: (posição, minutos de espera, barbeiro previsto)} para quem aguarda.
+
+        Simula as cadeiras com um heap de "livre daqui a t minutos": O(fila ativa · log cadeiras).
+        """
+        self.atualizar()
+        agora = agora or datetime.now()
+        with self._lock:
+            livres = []
+            for nome in self.barbeiros:
+                atual = self.atendendo.get(nome)
+                restante = 0.0
+                if atual:
+                    decorrido = (agora - atual.inicio).total_seconds() / 60
+                    restante = max(0.0, self._media(nome) - decorrido)
+                heapq.heappush(livres, (restante, nome))
+            resultado = {}
+            fila = [self.aguardando[id_corte] for grupo in (self.prioritarios, self.comuns) for _, id_corte in grupo]
+            for posicao, registro in enumerate(fila, start=1):
+                espera, nome = heapq.heappop(livres)
+                resultado[registro.id] = (posicao, round(espera), nome)
+                heapq.heappush(livres, (espera + self._media(nome), nome))
+            return resultado
+
+    def estimativa(self, id_corte):
+        return self.estimativas().get(id_corte)
+
+
+# Um escalonador por processo, compartilhado por todas as sessões
+@st.cache_resource
+def get_escalonador():
+    return Escalonador()
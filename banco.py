@@ -0,0 +1,857 @@
+"""Banco local (SQLite) da barbearia: conexões, migrações e consultas do painel.
+
+É o único motor de armazenamento do sistema. O barber.py usa só este banco;
+o app.py usa o mesmo banco como réplica local e sincroniza com o Supabase
+em segundo plano (ver sincronizacao.py).
+
+Linha de comando:
+    python banco.py --reconstruir-resumo   (recalcula resumo_diario a partir dos cortes)
+"""
+import argparse
+import bisect
+import sqlite3
+import queue
+import re
+import threading
+import time
+import pandas as pd
+import streamlit as st
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from metricas import medir
+from modelos import COLUNAS_CORTE, corte, texto_instante
+from regras import chave_nome
+
+# --- BANCO DE DADOS (SQLite) ---
+ARQUIVO_DB = 'barbearia.db'
+TAMANHO_POOL = 4
+
+class PoolConexoes:
+    """Conexões SQLite abertas uma vez por processo e emprestadas a cada consulta."""
+
+    def __init__(self, caminho, tamanho=TAMANHO_POOL):
+        self.caminho = caminho
+        self._livres = queue.LifoQueue()
+        for _ in range(tamanho):
+            self._livres.put(self._conectar())
+
+    def _conectar(self):
+        # check_same_thread=False: a conexão circula entre as threads das sessões,
+        # mas só uma thread por vez a usa (ver conexao()).
+        # cached_statements: reaproveita as consultas preparadas entre reruns.
+        conn = sqlite3.connect(self.caminho, timeout=5, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")      # leitores não bloqueiam o escritor
+        conn.execute("PRAGMA synchronous=NORMAL")    # seguro com WAL e bem mais rápido
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-16000")     # ~16 MB de cache de páginas
+        # Usada pelos triggers que ligam cortes e planos a clientes (migração 7)
+        conn.create_function("chave_nome", 1, chave_nome, deterministic=True)
+        return conn
+
+    @contextmanager
+    def conexao(self):
+        # Bloqueia até existir uma conexão livre (checkout thread-safe)
+        conn = self._livres.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._livres.put(conn)
+
+# --- MIGRAÇÕES (versão do esquema guardada em PRAGMA user_version) ---
+# Cada entrada é aplicada uma única vez, em ordem, dentro de uma transação.
+# Nunca altere uma migração já publicada: acrescente uma nova no final da lista.
+MIGRACOES = [
+    # 1 - Esquema original
+    '''
+    -- Tabela de Cortes (Fila/Histórico)
+    CREATE TABLE IF NOT EXISTS cortes
+        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+         cliente TEXT,
+         chegada DATETIME,
+         saida DATETIME,
+         pago BOOLEAN,
+         valor REAL);
+    -- Tabela de Planos
+    CREATE TABLE IF NOT EXISTS planos
+        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+         cliente TEXT,
+         vencimento DATE,
+         status TEXT,
+         obs TEXT);
+    ''',
+    # 2 - Datas em texto ISO ordenável e índices das consultas do painel
+    '''
+    -- Normaliza registros antigos ('2024-01-31T10:00:00.123', datas soltas...) para
+    -- 'YYYY-MM-DD HH:MM:SS', o mesmo formato gravado pelo check-in
+    UPDATE cortes SET chegada = strftime('%Y-%m-%d %H:%M:%S', chegada)
+     WHERE strftime('%Y-%m-%d %H:%M:%S', chegada) IS NOT NULL
+       AND chegada <> strftime('%Y-%m-%d %H:%M:%S', chegada);
+    UPDATE cortes SET saida = strftime('%Y-%m-%d %H:%M:%S', saida)
+     WHERE strftime('%Y-%m-%d %H:%M:%S', saida) IS NOT NULL
+       AND saida <> strftime('%Y-%m-%d %H:%M:%S', saida);
+    UPDATE planos SET vencimento = date(vencimento)
+     WHERE date(vencimento) IS NOT NULL AND vencimento <> date(vencimento);
+    UPDATE cortes SET pago = (pago IN (1, '1', 'True', 'true')) WHERE pago IS NULL OR pago NOT IN (0, 1);
+
+    -- Fila (keyset por chegada/id) e filtros por período
+    CREATE INDEX IF NOT EXISTS idx_cortes_chegada ON cortes (chegada, id);
+    -- Extrato e faturamento: pago = 1 AND chegada no período
+    CREATE INDEX IF NOT EXISTS idx_cortes_pago_chegada ON cortes (pago, chegada, valor);
+    CREATE INDEX IF NOT EXISTS idx_cortes_cliente ON cortes (cliente);
+    -- Lista de mensalistas (ORDER BY vencimento) e planos vencendo por status
+    CREATE INDEX IF NOT EXISTS idx_planos_vencimento ON planos (vencimento);
+    CREATE INDEX IF NOT EXISTS idx_planos_status_vencimento ON planos (status, vencimento);
+    CREATE INDEX IF NOT EXISTS idx_planos_cliente ON planos (cliente);
+    ''',
+    # 3 - Resumo diário por barbeiro, mantido incrementalmente por triggers
+    '''
+    ALTER TABLE cortes ADD COLUMN barbeiro TEXT NOT NULL DEFAULT '';
+
+    CREATE TABLE resumo_diario
+        (dia DATE NOT NULL,
+         barbeiro TEXT NOT NULL DEFAULT '',
+         cortes INTEGER NOT NULL DEFAULT 0,
+         finalizados INTEGER NOT NULL DEFAULT 0,
+         faturado REAL NOT NULL DEFAULT 0,
+         recebido REAL NOT NULL DEFAULT 0,
+         PRIMARY KEY (dia, barbeiro)) WITHOUT ROWID;
+
+    -- Check-in: entra mais um corte no dia
+    CREATE TRIGGER resumo_cortes_insert AFTER INSERT ON cortes
+    WHEN NEW.chegada IS NOT NULL
+    BEGIN
+        INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido)
+        VALUES (date(NEW.chegada), NEW.barbeiro, 1, NEW.saida IS NOT NULL,
+                COALESCE(NEW.valor, 0), CASE WHEN NEW.pago THEN COALESCE(NEW.valor, 0) ELSE 0 END)
+        ON CONFLICT (dia, barbeiro) DO UPDATE SET
+            cortes = cortes + excluded.cortes,
+            finalizados = finalizados + excluded.finalizados,
+            faturado = faturado + excluded.faturado,
+            recebido = recebido + excluded.recebido;
+    END;
+
+    -- Finalizar / Receber (ou qualquer correção): tira a contribuição antiga e soma a nova
+    CREATE TRIGGER resumo_cortes_update AFTER UPDATE OF chegada, saida, pago, valor, barbeiro ON cortes
+    BEGIN
+        UPDATE resumo_diario SET
+            cortes = cortes - 1,
+            finalizados = finalizados - (OLD.saida IS NOT NULL),
+            faturado = faturado - COALESCE(OLD.valor, 0),
+            recebido = recebido - CASE WHEN OLD.pago THEN COALESCE(OLD.valor, 0) ELSE 0 END
+        WHERE dia = date(OLD.chegada) AND barbeiro = OLD.barbeiro;
+        INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido)
+        SELECT date(NEW.chegada), NEW.barbeiro, 1, NEW.saida IS NOT NULL,
+               COALESCE(NEW.valor, 0), CASE WHEN NEW.pago THEN COALESCE(NEW.valor, 0) ELSE 0 END
+        WHERE NEW.chegada IS NOT NULL
+        ON CONFLICT (dia, barbeiro) DO UPDATE SET
+            cortes = cortes + excluded.cortes,
+            finalizados = finalizados + excluded.finalizados,
+            faturado = faturado + excluded.faturado,
+            recebido = recebido + excluded.recebido;
+    END;
+    -- Sem trigger de DELETE: a interface não apaga cortes, e o resumo guarda o histórico consolidado.
+
+    -- Carga inicial com o histórico já existente
+    INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido)
+    SELECT date(chegada), barbeiro, COUNT(*), COUNT(saida),
+           COALESCE(SUM(valor), 0), COALESCE(SUM(CASE WHEN pago THEN valor END), 0)
+    FROM cortes
+    WHERE chegada IS NOT NULL
+    GROUP BY date(chegada), barbeiro;
+    ''',
+    # 4 - Metadados de sincronização com o Supabase e exclusão lógica de planos
+    '''
+    -- uid: identidade global da linha (o id local não vale no Supabase)
+    -- updated_at: instante UTC da última alteração; pendente: falta enviar ao Supabase
+    ALTER TABLE cortes ADD COLUMN uid TEXT;
+    ALTER TABLE cortes ADD COLUMN updated_at TEXT;
+    ALTER TABLE cortes ADD COLUMN pendente INTEGER NOT NULL DEFAULT 1;
+    ALTER TABLE planos ADD COLUMN uid TEXT;
+    ALTER TABLE planos ADD COLUMN updated_at TEXT;
+    ALTER TABLE planos ADD COLUMN pendente INTEGER NOT NULL DEFAULT 1;
+    -- Excluir um plano vira uma alteração comum, que também precisa ser sincronizada
+    ALTER TABLE planos ADD COLUMN excluido INTEGER NOT NULL DEFAULT 0;
+
+    UPDATE cortes SET uid = lower(hex(randomblob(16))), updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now');
+    UPDATE planos SET uid = lower(hex(randomblob(16))), updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now');
+    CREATE UNIQUE INDEX idx_cortes_uid ON cortes (uid);
+    CREATE UNIQUE INDEX idx_planos_uid ON planos (uid);
+    CREATE INDEX idx_cortes_pendente ON cortes (pendente) WHERE pendente = 1;
+    CREATE INDEX idx_planos_pendente ON planos (pendente) WHERE pendente = 1;
+
+    -- Estado da sincronização: marcas d'água do pull e a flag 'aplicando', ligada
+    -- só dentro da transação que grava alterações vindas do Supabase
+    CREATE TABLE sync_controle (chave TEXT PRIMARY KEY, valor TEXT) WITHOUT ROWID;
+    INSERT INTO sync_controle (chave, valor) VALUES ('aplicando', '0');
+
+    -- Toda escrita local ganha uid/updated_at e fica pendente de envio
+    CREATE TRIGGER sync_cortes_insert AFTER INSERT ON cortes
+    WHEN (SELECT valor FROM sync_controle WHERE chave = 'aplicando') = '0'
+    BEGIN
+        UPDATE cortes SET uid = COALESCE(NEW.uid, lower(hex(randomblob(16)))),
+                          updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), pendente = 1
+        WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER sync_cortes_update AFTER UPDATE OF cliente, chegada, saida, pago, valor, barbeiro ON cortes
+    WHEN (SELECT valor FROM sync_controle WHERE chave = 'aplicando') = '0'
+    BEGIN
+        UPDATE cortes SET updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), pendente = 1 WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER sync_planos_insert AFTER INSERT ON planos
+    WHEN (SELECT valor FROM sync_controle WHERE chave = 'aplicando') = '0'
+    BEGIN
+        UPDATE planos SET uid = COALESCE(NEW.uid, lower(hex(randomblob(16)))),
+                          updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), pendente = 1
+        WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER sync_planos_update AFTER UPDATE OF cliente, vencimento, status, obs, excluido ON planos
+    WHEN (SELECT valor FROM sync_controle WHERE chave = 'aplicando') = '0'
+    BEGIN
+        UPDATE planos SET updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), pendente = 1 WHERE id = NEW.id;
+    END;
+    ''',
+    # 5 - Registro de alterações (canal de notificação da fila ao vivo)
+    '''
+    -- Cada linha inserida/alterada (pela interface, pela sincronização ou por outro
+    -- processo no mesmo arquivo) entra aqui; as sessões leem só o que veio depois do seu seq
+    CREATE TABLE alteracoes
+        (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+         tabela TEXT NOT NULL,
+         id_linha INTEGER NOT NULL);
+
+    CREATE TRIGGER alteracoes_cortes_insert AFTER INSERT ON cortes
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('cortes', NEW.id);
+    END;
+    CREATE TRIGGER alteracoes_cortes_update AFTER UPDATE OF cliente, chegada, saida, pago, valor, barbeiro ON cortes
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('cortes', NEW.id);
+    END;
+    CREATE TRIGGER alteracoes_planos_insert AFTER INSERT ON planos
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('planos', NEW.id);
+    END;
+    CREATE TRIGGER alteracoes_planos_update AFTER UPDATE OF cliente, vencimento, status, obs, excluido ON planos
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('planos', NEW.id);
+    END;
+    -- Guarda só as últimas 10 mil alterações
+    CREATE TRIGGER alteracoes_limpeza AFTER INSERT ON alteracoes
+    BEGIN
+        DELETE FROM alteracoes WHERE seq <= NEW.seq - 10000;
+    END;
+    ''',
+    # 6 - Escalonador da fila: início do atendimento, barbeiros e cadeiras
+    '''
+    -- inicio: quando o cliente foi chamado para a cadeira (NULL = aguardando)
+    ALTER TABLE cortes ADD COLUMN inicio DATETIME;
+    -- Configuração local de cada barbearia (não vai para o Supabase)
+    CREATE TABLE barbeiros
+        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+         nome TEXT NOT NULL UNIQUE,
+         cadeira INTEGER,
+         ativo INTEGER NOT NULL DEFAULT 1);
+    -- Últimos cortes finalizados de cada barbeiro (janela de durações do escalonador)
+    CREATE INDEX idx_cortes_barbeiro_saida ON cortes (barbeiro, saida);
+
+    -- inicio também é sincronizado e notificado
+    DROP TRIGGER sync_cortes_update;
+    CREATE TRIGGER sync_cortes_update AFTER UPDATE OF cliente, chegada, saida, pago, valor, barbeiro, inicio ON cortes
+    WHEN (SELECT valor FROM sync_controle WHERE chave = 'aplicando') = '0'
+    BEGIN
+        UPDATE cortes SET updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), pendente = 1 WHERE id = NEW.id;
+    END;
+    DROP TRIGGER alteracoes_cortes_update;
+    CREATE TRIGGER alteracoes_cortes_update AFTER UPDATE OF cliente, chegada, saida, pago, valor, barbeiro, inicio ON cortes
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('cortes', NEW.id);
+    END;
+    CREATE TRIGGER alteracoes_barbeiros_insert AFTER INSERT ON barbeiros
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('barbeiros', NEW.id);
+    END;
+    CREATE TRIGGER alteracoes_barbeiros_update AFTER UPDATE ON barbeiros
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('barbeiros', NEW.id);
+    END;
+    ''',
+    # 7 - Cadastro de clientes: cortes e planos ligados pelo nome canônico
+    '''
+    -- chave = regras.chave_nome(nome), registrada como função SQL em cada conexão do pool.
+    -- Tabela local, derivada dos nomes: cada réplica monta a sua a partir dos cortes e planos
+    CREATE TABLE clientes
+        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+         nome TEXT NOT NULL,
+         chave TEXT NOT NULL UNIQUE);
+    ALTER TABLE cortes ADD COLUMN cliente_id INTEGER REFERENCES clientes (id);
+    ALTER TABLE planos ADD COLUMN cliente_id INTEGER REFERENCES clientes (id);
+    CREATE INDEX idx_cortes_cliente_id ON cortes (cliente_id, chegada);
+    CREATE INDEX idx_planos_cliente_id ON planos (cliente_id, vencimento);
+
+    -- Clientes já existentes: o nome mais recente de cada chave vira o nome do cadastro
+    INSERT OR IGNORE INTO clientes (nome, chave)
+    SELECT trim(cliente), chave_nome(cliente)
+    FROM (SELECT cliente, chegada AS quando FROM cortes
+          UNION ALL SELECT cliente, vencimento FROM planos WHERE excluido = 0)
+    WHERE chave_nome(cliente) <> ''
+    ORDER BY quando DESC;
+    UPDATE cortes SET cliente_id = (SELECT id FROM clientes WHERE chave = chave_nome(cortes.cliente));
+    UPDATE planos SET cliente_id = (SELECT id FROM clientes WHERE chave = chave_nome(planos.cliente));
+
+    -- Linhas novas (check-in, planos, importação e o que chega da sincronização) e nomes corrigidos.
+    -- cliente_id não está nas listas de colunas dos triggers de sincronização: ligar não marca pendente.
+    -- NOT EXISTS em vez de INSERT OR IGNORE: num upsert (a sincronização, a importação) o ON CONFLICT
+    -- do comando de fora vale também para os triggers, e o OR IGNORE seria trocado por ABORT
+    CREATE TRIGGER clientes_cortes_insert AFTER INSERT ON cortes
+    WHEN NEW.cliente_id IS NULL AND chave_nome(NEW.cliente) <> ''
+    BEGIN
+        INSERT INTO clientes (nome, chave) SELECT trim(NEW.cliente), chave_nome(NEW.cliente)
+        WHERE NOT EXISTS (SELECT 1 FROM clientes WHERE chave = chave_nome(NEW.cliente));
+        UPDATE cortes SET cliente_id = (SELECT id FROM clientes WHERE chave = chave_nome(NEW.cliente))
+        WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER clientes_cortes_update AFTER UPDATE OF cliente ON cortes
+    WHEN chave_nome(NEW.cliente) <> ''
+    BEGIN
+        INSERT INTO clientes (nome, chave) SELECT trim(NEW.cliente), chave_nome(NEW.cliente)
+        WHERE NOT EXISTS (SELECT 1 FROM clientes WHERE chave = chave_nome(NEW.cliente));
+        UPDATE cortes SET cliente_id = (SELECT id FROM clientes WHERE chave = chave_nome(NEW.cliente))
+        WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER clientes_planos_insert AFTER INSERT ON planos
+    WHEN NEW.cliente_id IS NULL AND chave_nome(NEW.cliente) <> ''
+    BEGIN
+        INSERT INTO clientes (nome, chave) SELECT trim(NEW.cliente), chave_nome(NEW.cliente)
+        WHERE NOT EXISTS (SELECT 1 FROM clientes WHERE chave = chave_nome(NEW.cliente));
+        UPDATE planos SET cliente_id = (SELECT id FROM clientes WHERE chave = chave_nome(NEW.cliente))
+        WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER clientes_planos_update AFTER UPDATE OF cliente ON planos
+    WHEN chave_nome(NEW.cliente) <> ''
+    BEGIN
+        INSERT INTO clientes (nome, chave) SELECT trim(NEW.cliente), chave_nome(NEW.cliente)
+        WHERE NOT EXISTS (SELECT 1 FROM clientes WHERE chave = chave_nome(NEW.cliente));
+        UPDATE planos SET cliente_id = (SELECT id FROM clientes WHERE chave = chave_nome(NEW.cliente))
+        WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER alteracoes_clientes_insert AFTER INSERT ON clientes
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('clientes', NEW.id);
+    END;
+    CREATE TRIGGER alteracoes_clientes_update AFTER UPDATE ON clientes
+    BEGIN
+        INSERT INTO alteracoes (tabela, id_linha) VALUES ('clientes', NEW.id);
+    END;
+    ''',
+    # 8 - Tempo de atendimento no resumo diário (relatorios.py)
+    '''
+    -- minutos: soma de saida - chegada dos atendimentos medidos; medidos: quantos entraram na soma.
+    -- Como no escalonador (atendimento.DURACAO_MINIMA/MAXIMA), fora de 5 a 180 minutos é
+    -- esquecimento de "Finalizar" e não entra na média
+    ALTER TABLE resumo_diario ADD COLUMN minutos REAL NOT NULL DEFAULT 0;
+    ALTER TABLE resumo_diario ADD COLUMN medidos INTEGER NOT NULL DEFAULT 0;
+
+    DROP TRIGGER resumo_cortes_insert;
+    CREATE TRIGGER resumo_cortes_insert AFTER INSERT ON cortes
+    WHEN NEW.chegada IS NOT NULL
+    BEGIN
+        INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido, minutos, medidos)
+        VALUES (date(NEW.chegada), NEW.barbeiro, 1, NEW.saida IS NOT NULL,
+                COALESCE(NEW.valor, 0), CASE WHEN NEW.pago THEN COALESCE(NEW.valor, 0) ELSE 0 END,
+                COALESCE(CASE WHEN (julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 BETWEEN 5 AND 180
+                         THEN (julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 END, 0),
+                COALESCE((julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 BETWEEN 5 AND 180, 0))
+        ON CONFLICT (dia, barbeiro) DO UPDATE SET
+            cortes = cortes + excluded.cortes,
+            finalizados = finalizados + excluded.finalizados,
+            faturado = faturado + excluded.faturado,
+            recebido = recebido + excluded.recebido,
+            minutos = minutos + excluded.minutos,
+            medidos = medidos + excluded.medidos;
+    END;
+
+    DROP TRIGGER resumo_cortes_update;
+    CREATE TRIGGER resumo_cortes_update AFTER UPDATE OF chegada, saida, pago, valor, barbeiro ON cortes
+    BEGIN
+        UPDATE resumo_diario SET
+            cortes = cortes - 1,
+            finalizados = finalizados - (OLD.saida IS NOT NULL),
+            faturado = faturado - COALESCE(OLD.valor, 0),
+            recebido = recebido - CASE WHEN OLD.pago THEN COALESCE(OLD.valor, 0) ELSE 0 END,
+            minutos = minutos - COALESCE(CASE WHEN (julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 BETWEEN 5 AND 180
+                                       THEN (julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 END, 0),
+            medidos = medidos - COALESCE((julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 BETWEEN 5 AND 180, 0)
+        WHERE dia = date(OLD.chegada) AND barbeiro = OLD.barbeiro;
+        INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido, minutos, medidos)
+        SELECT date(NEW.chegada), NEW.barbeiro, 1, NEW.saida IS NOT NULL,
+               COALESCE(NEW.valor, 0), CASE WHEN NEW.pago THEN COALESCE(NEW.valor, 0) ELSE 0 END,
+               COALESCE(CASE WHEN (julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 BETWEEN 5 AND 180
+                         THEN (julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 END, 0),
+               COALESCE((julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 BETWEEN 5 AND 180, 0)
+        WHERE NEW.chegada IS NOT NULL
+        ON CONFLICT (dia, barbeiro) DO UPDATE SET
+            cortes = cortes + excluded.cortes,
+            finalizados = finalizados + excluded.finalizados,
+            faturado = faturado + excluded.faturado,
+            recebido = recebido + excluded.recebido,
+            minutos = minutos + excluded.minutos,
+            medidos = medidos + excluded.medidos;
+    END;
+
+    -- Recalcula o histórico com as colunas novas
+    DELETE FROM resumo_diario;
+    INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido, minutos, medidos)
+    SELECT date(chegada), barbeiro, COUNT(*), COUNT(saida),
+           COALESCE(SUM(valor), 0), COALESCE(SUM(CASE WHEN pago THEN valor END), 0),
+           COALESCE(SUM(CASE WHEN (julianday(saida) - julianday(chegada)) * 1440 BETWEEN 5 AND 180
+                             THEN (julianday(saida) - julianday(chegada)) * 1440 END), 0),
+           COUNT(CASE WHEN (julianday(saida) - julianday(chegada)) * 1440 BETWEEN 5 AND 180 THEN 1 END)
+    FROM cortes
+    WHERE chegada IS NOT NULL
+    GROUP BY date(chegada), barbeiro;
+    ''',
+    # 9 - Arquivo de cortes antigos em partições mensais (arquivamento.py)
+    '''
+    -- Catálogo das partições: uma tabela cortes_AAAA_MM por mês, criada pelo arquivamento
+    CREATE TABLE arquivo_cortes
+        (mes TEXT PRIMARY KEY,
+         linhas INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID;
+    -- Onde está cada corte arquivado (a sincronização devolve à tabela quente os que mudam no Supabase)
+    CREATE TABLE arquivo_uids
+        (uid TEXT PRIMARY KEY,
+         mes TEXT NOT NULL,
+         id INTEGER NOT NULL) WITHOUT ROWID;
+    -- Um corte arquivado não volta duplicado para a tabela quente (reimportação de um arquivo antigo)
+    CREATE TRIGGER arquivo_cortes_insert BEFORE INSERT ON cortes
+    WHEN NEW.uid IS NOT NULL AND EXISTS (SELECT 1 FROM arquivo_uids WHERE uid = NEW.uid)
+    BEGIN
+        SELECT RAISE(IGNORE);
+    END;
+    ''',
+    # 10 - Corte apagado sai do resumo diário (correções feitas direto no banco)
+    '''
+    -- O arquivamento também apaga de cortes, mas registra o uid em arquivo_uids antes:
+    -- esses continuam no resumo, que cobre o histórico inteiro
+    CREATE TRIGGER resumo_cortes_delete AFTER DELETE ON cortes
+    WHEN NOT EXISTS (SELECT 1 FROM arquivo_uids WHERE uid = OLD.uid)
+    BEGIN
+        UPDATE resumo_diario SET
+            cortes = cortes - 1,
+            finalizados = finalizados - (OLD.saida IS NOT NULL),
+            faturado = faturado - COALESCE(OLD.valor, 0),
+            recebido = recebido - CASE WHEN OLD.pago THEN COALESCE(OLD.valor, 0) ELSE 0 END,
+            minutos = minutos - COALESCE(CASE WHEN (julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 BETWEEN 5 AND 180
+                                       THEN (julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 END, 0),
+            medidos = medidos - COALESCE((julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 BETWEEN 5 AND 180, 0)
+        WHERE dia = date(OLD.chegada) AND barbeiro = OLD.barbeiro;
+    END;
+    ''',
+    # 11 - Fiado no resumo diário (relatorios.py)
+    '''
+    -- a_receber: valor dos atendimentos finalizados e não pagos, o mesmo filtro da lista
+    -- relatorios.a_receber. faturado - recebido contaria também quem ainda está na fila
+    ALTER TABLE resumo_diario ADD COLUMN a_receber REAL NOT NULL DEFAULT 0;
+
+    DROP TRIGGER resumo_cortes_insert;
+    CREATE TRIGGER resumo_cortes_insert AFTER INSERT ON cortes
+    WHEN NEW.chegada IS NOT NULL
+    BEGIN
+        INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido, minutos, medidos,
+                                   a_receber)
+        VALUES (date(NEW.chegada), NEW.barbeiro, 1, NEW.saida IS NOT NULL,
+                COALESCE(NEW.valor, 0), CASE WHEN NEW.pago THEN COALESCE(NEW.valor, 0) ELSE 0 END,
+                COALESCE(CASE WHEN (julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 BETWEEN 5 AND 180
+                         THEN (julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 END, 0),
+                COALESCE((julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 BETWEEN 5 AND 180, 0),
+                CASE WHEN NEW.saida IS NOT NULL AND NEW.pago = 0 THEN COALESCE(NEW.valor, 0) ELSE 0 END)
+        ON CONFLICT (dia, barbeiro) DO UPDATE SET
+            cortes = cortes + excluded.cortes,
+            finalizados = finalizados + excluded.finalizados,
+            faturado = faturado + excluded.faturado,
+            recebido = recebido + excluded.recebido,
+            minutos = minutos + excluded.minutos,
+            medidos = medidos + excluded.medidos,
+            a_receber = a_receber + excluded.a_receber;
+    END;
+
+    DROP TRIGGER resumo_cortes_update;
+    CREATE TRIGGER resumo_cortes_update AFTER UPDATE OF chegada, saida, pago, valor, barbeiro ON cortes
+    BEGIN
+        UPDATE resumo_diario SET
+            cortes = cortes - 1,
+            finalizados = finalizados - (OLD.saida IS NOT NULL),
+            faturado = faturado - COALESCE(OLD.valor, 0),
+            recebido = recebido - CASE WHEN OLD.pago THEN COALESCE(OLD.valor, 0) ELSE 0 END,
+            minutos = minutos - COALESCE(CASE WHEN (julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 BETWEEN 5 AND 180
+                                       THEN (julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 END, 0),
+            medidos = medidos - COALESCE((julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 BETWEEN 5 AND 180, 0),
+            a_receber = a_receber - CASE WHEN OLD.saida IS NOT NULL AND OLD.pago = 0 THEN COALESCE(OLD.valor, 0) ELSE 0 END
+        WHERE dia = date(OLD.chegada) AND barbeiro = OLD.barbeiro;
+        INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido, minutos, medidos,
+                                   a_receber)
+        SELECT date(NEW.chegada), NEW.barbeiro, 1, NEW.saida IS NOT NULL,
+               COALESCE(NEW.valor, 0), CASE WHEN NEW.pago THEN COALESCE(NEW.valor, 0) ELSE 0 END,
+               COALESCE(CASE WHEN (julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 BETWEEN 5 AND 180
+                         THEN (julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 END, 0),
+               COALESCE((julianday(NEW.saida) - julianday(NEW.chegada)) * 1440 BETWEEN 5 AND 180, 0),
+               CASE WHEN NEW.saida IS NOT NULL AND NEW.pago = 0 THEN COALESCE(NEW.valor, 0) ELSE 0 END
+        WHERE NEW.chegada IS NOT NULL
+        ON CONFLICT (dia, barbeiro) DO UPDATE SET
+            cortes = cortes + excluded.cortes,
+            finalizados = finalizados + excluded.finalizados,
+            faturado = faturado + excluded.faturado,
+            recebido = recebido + excluded.recebido,
+            minutos = minutos + excluded.minutos,
+            medidos = medidos + excluded.medidos,
+            a_receber = a_receber + excluded.a_receber;
+    END;
+
+    DROP TRIGGER resumo_cortes_delete;
+    CREATE TRIGGER resumo_cortes_delete AFTER DELETE ON cortes
+    WHEN NOT EXISTS (SELECT 1 FROM arquivo_uids WHERE uid = OLD.uid)
+    BEGIN
+        UPDATE resumo_diario SET
+            cortes = cortes - 1,
+            finalizados = finalizados - (OLD.saida IS NOT NULL),
+            faturado = faturado - COALESCE(OLD.valor, 0),
+            recebido = recebido - CASE WHEN OLD.pago THEN COALESCE(OLD.valor, 0) ELSE 0 END,
+            minutos = minutos - COALESCE(CASE WHEN (julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 BETWEEN 5 AND 180
+                                       THEN (julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 END, 0),
+            medidos = medidos - COALESCE((julianday(OLD.saida) - julianday(OLD.chegada)) * 1440 BETWEEN 5 AND 180, 0),
+            a_receber = a_receber - CASE WHEN OLD.saida IS NOT NULL AND OLD.pago = 0 THEN COALESCE(OLD.valor, 0) ELSE 0 END
+        WHERE dia = date(OLD.chegada) AND barbeiro = OLD.barbeiro;
+    END;
+
+    -- Carga inicial: fiado nunca é arquivado, basta a tabela quente
+    UPDATE resumo_diario SET a_receber = fiado.valor
+    FROM (SELECT date(chegada) AS dia, barbeiro, COALESCE(SUM(valor), 0) AS valor FROM cortes
+          WHERE chegada IS NOT NULL AND saida IS NOT NULL AND pago = 0
+          GROUP BY date(chegada), barbeiro) AS fiado
+    WHERE resumo_diario.dia = fiado.dia AND resumo_diario.barbeiro = fiado.barbeiro;
+    ''',
+]
+
+# Recalcula o resumo diário a partir de cortes (dados antigos ou correções manuais).
+# {cortes}: a tabela quente unida a todas as partições arquivadas (ver fonte_cortes)
+SQL_RECONSTRUIR_RESUMO = '''
+    INSERT INTO resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido, minutos, medidos, a_receber)
+    SELECT date(chegada), barbeiro, COUNT(*), COUNT(saida),
+           COALESCE(SUM(valor), 0), COALESCE(SUM(CASE WHEN pago THEN valor END), 0),
+           COALESCE(SUM(CASE WHEN (julianday(saida) - julianday(chegada)) * 1440 BETWEEN 5 AND 180
+                             THEN (julianday(saida) - julianday(chegada)) * 1440 END), 0),
+           COUNT(CASE WHEN (julianday(saida) - julianday(chegada)) * 1440 BETWEEN 5 AND 180 THEN 1 END),
+           COALESCE(SUM(CASE WHEN saida IS NOT NULL AND pago = 0 THEN valor END), 0)
+    FROM {cortes}
+    WHERE chegada IS NOT NULL
+    GROUP BY date(chegada), barbeiro
+'''
+
+def reconstruir_resumo():
+    with get_pool().conexao() as conn:
+        with conn:
+            # O DELETE trava a escrita antes de ler o catálogo: nenhum mês é arquivado no meio do caminho
+            conn.execute("DELETE FROM resumo_diario")
+            conn.execute(SQL_RECONSTRUIR_RESUMO.format(cortes=fonte_cortes(meses=_ler_meses_arquivados(conn))))
+    get_cache().invalidar("resumo_diario")
+
+def init_db(conn):
+    versao = conn.execute("PRAGMA user_version").fetchone()[0]
+    for numero, script in enumerate(MIGRACOES[versao:], start=versao + 1):
+        try:
+            # executescript não abre transação sozinho: BEGIN/COMMIT explícitos
+            # garantem que a migração entra inteira ou não entra
+            conn.executescript(f"BEGIN; {script}; PRAGMA user_version = {numero}; COMMIT;")
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    conn.execute("PRAGMA optimize")
+
+# Um único pool por processo, compartilhado por todas as sessões.
+# O init_db roda só na criação do pool, e não a cada execução do script.
+@st.cache_resource
+def get_pool():
+    pool = PoolConexoes(ARQUIVO_DB)
+    with pool.conexao() as conn:
+        init_db(conn)
+    return pool
+
+# --- CACHE DE CONSULTAS (compartilhado entre sessões, invalidado nas escritas) ---
+TTL_CACHE = 60  # segundos; limita o atraso de escritas feitas por outro processo
+
+# Tabelas alteradas pelos triggers quando a tabela da chave é escrita
+DEPENDENCIAS = {"cortes": {"resumo_diario", "clientes"}, "planos": {"clientes"}}
+
+RE_TABELAS_LEITURA = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)", re.IGNORECASE)
+RE_TABELA_ESCRITA = re.compile(r"^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM)\s+(\w+)", re.IGNORECASE)
+
+class CacheConsultas:
+    """Resultados de leitura por (consulta, parâmetros), com TTL e invalidação por tabela."""
+
+    def __init__(self, ttl=TTL_CACHE):
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+        self._itens = {}      # chave -> (expira_em, tabelas, valor)
+        self._geracao = {}    # tabela -> contador de escritas
+        self._lock = threading.Lock()
+
+    def obter(self, chave, tabelas, carregar):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item and item[0] > time.monotonic():
+                self.acertos += 1
+                return item[2]
+            self.falhas += 1
+            geracao = tuple(self._geracao.get(t, 0) for t in tabelas)
+        valor = carregar()
+        with self._lock:
+            # Se alguém escreveu numa dessas tabelas durante a carga, o valor já nasceu velho
+            if geracao == tuple(self._geracao.get(t, 0) for t in tabelas):
+                self._itens[chave] = (time.monotonic() + self.ttl, frozenset(tabelas), valor)
+        return valor
+
+    def invalidar(self, *tabelas):
+        afetadas = set(tabelas)
+        for tabela in tabelas:
+            afetadas |= DEPENDENCIAS.get(tabela, set())
+        with self._lock:
+            for tabela in afetadas:
+                self._geracao[tabela] = self._geracao.get(tabela, 0) + 1
+            for chave in [c for c, item in self._itens.items() if item[1] & afetadas]:
+                del self._itens[chave]
+                self.invalidacoes += 1
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {"acertos": self.acertos, "falhas": self.falhas, "invalidacoes": self.invalidacoes,
+                    "itens": len(self._itens),
+                    "taxa_acerto": self.acertos / consultas if consultas else 0.0}
+
+@st.cache_resource
+def get_cache():
+    return CacheConsultas()
+
+# --- FUNÇÕES AUXILIARES (Helpers) ---
+def run_query(query, params=(), return_data=False, usar_cache=True):
+    if return_data and not usar_cache:
+        return _ler(query, params)
+    if return_data:
+        tabelas = set(RE_TABELAS_LEITURA.findall(query))
+        df = get_cache().obter((query, tuple(params)), tabelas, lambda: _ler(query, params))
+        return df.copy()  # quem chama pode alterar o DataFrame à vontade
+    with get_pool().conexao() as conn, medir("sqlite", query) as medida:
+        with conn:  # commit ao final, rollback se der erro
+            cursor = conn.execute(query, params)
+            medida.resultado(cursor.rowcount)
+    escrita = RE_TABELA_ESCRITA.match(query)
+    if escrita:
+        get_cache().invalidar(escrita.group(1))
+    return cursor.lastrowid  # id da linha inserida (INSERT)
+
+def _ler(query, params):
+    with get_pool().conexao() as conn, medir("sqlite", query) as medida:
+        df = pd.read_sql_query(query, conn, params=params)
+        medida.resultado(df)
+    return df
+
+def carregar_registros(query, params, fabrica, usar_cache=True):
+    """Lê a consulta como uma tupla de registros montados por fabrica (row_factory, ver modelos.py).
+
+    Os registros são imutáveis: o cache devolve a mesma tupla, sem cópia.
+    """
+    def carregar():
+        with get_pool().conexao() as conn, medir("sqlite", query) as medida:
+            cursor = conn.cursor()
+            cursor.row_factory = fabrica
+            registros = tuple(cursor.execute(query, params))
+            medida.resultado(registros)
+        return registros
+    if not usar_cache:
+        return carregar()
+    return get_cache().obter((query, tuple(params)), set(RE_TABELAS_LEITURA.findall(query)), carregar)
+
+# --- ARQUIVO DE CORTES (partições mensais; o arquivamento em si está em arquivamento.py) ---
+# Cortes antigos, finalizados e pagos saem da tabela quente para uma tabela por
+# mês (cortes_AAAA_MM), com as mesmas colunas. O resumo diário continua contando
+# com eles (cortes não tem trigger de DELETE); só as consultas cujo período
+# alcança um mês arquivado leem as partições.
+COLUNAS_PARTICAO = ("id, cliente, chegada, saida, pago, valor, barbeiro, inicio, cliente_id, "
+                    "uid, updated_at, pendente")
+
+def tabela_particao(mes):
+    """Nome da partição do mês 'AAAA-MM'."""
+    return f"cortes_{mes.replace('-', '_')}"
+
+def _ler_meses_arquivados(conn):
+    return tuple(linha[0] for linha in conn.execute(
+        "SELECT mes FROM arquivo_cortes WHERE linhas > 0 ORDER BY mes"))
+
+def meses_arquivados(inicio=None, fim=None):
+    """Meses ('AAAA-MM') arquivados de inicio a fim (datas; sem uma das pontas, sem limite daquele lado)."""
+    def carregar():
+        with get_pool().conexao() as conn, medir("sqlite", "meses_arquivados"):
+            return _ler_meses_arquivados(conn)
+    meses = get_cache().obter(("meses_arquivados",), {"arquivo_cortes"}, carregar)
+    # Catálogo em ordem: o período é uma faixa contínua (décadas de meses não pesam a cada consulta)
+    primeiro = bisect.bisect_left(meses, f"{inicio:%Y-%m}") if inicio else 0
+    ultimo = bisect.bisect_right(meses, f"{fim:%Y-%m}") if fim else len(meses)
+    return list(meses[primeiro:ultimo])
+
+def fonte_cortes(inicio=None, fim=None, colunas=COLUNAS_PARTICAO, meses=None):
+    """O FROM de uma consulta de cortes no período: a tabela quente sozinha ou unida às partições do período.
+
+    colunas: as que a consulta de fora usa (com só chegada, cada parte lê apenas o
+    índice). Com meses, usa exatamente essas partições. As condições da consulta
+    de fora descem para cada parte do UNION ALL, e cada uma usa o próprio índice de chegada.
+    """
+    if meses is None:
+        meses = meses_arquivados(inicio, fim)
+    if not meses:
+        return "cortes"
+    partes = " UNION ALL ".join(f"SELECT {colunas} FROM {tabela}"
+                                for tabela in ["cortes"] + [tabela_particao(mes) for mes in meses])
+    return f"({partes}) AS cortes"
+
+# --- PAGINAÇÃO DA FILA (cursor por chegada/id, página de tamanho fixo) ---
+TAMANHO_PAGINA = 20
+
+def carregar_fila(cursor=None, somente_abertos=True, usar_cache=True):
+    """Uma página da fila como registros Corte; cursor é (chegada, id) do último exibido."""
+    filtros, params = [], []
+    if somente_abertos:
+        # Atendimentos de hoje que ainda não foram finalizados ou recebidos
+        filtros.append("chegada >= ? AND (saida IS NULL OR pago = 0)")
+        params.append(date.today().strftime("%Y-%m-%d"))
+    if cursor:
+        # Continua a partir do último registro exibido (keyset, sem OFFSET). Como valor de
+        # linha o SQLite busca direto no índice (chegada, id); com OR ele percorreria o
+        # índice desde o começo até chegar ao cursor
+        filtros.append("(chegada, id) < (?, ?)")
+        params += [texto_instante(cursor[0]), cursor[1]]
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    # Busca um registro a mais só para saber se existe próxima página
+    sql = f"SELECT {COLUNAS_CORTE} FROM {{}} {where} ORDER BY chegada DESC, id DESC LIMIT ?"
+    params = tuple(params) + (TAMANHO_PAGINA + 1,)
+    registros = carregar_registros(sql.format("cortes"), params, corte, usar_cache=usar_cache)
+    if somente_abertos:
+        return registros  # em aberto nunca é arquivado
+    # Histórico: os meses arquivados só entram quando a página alcança algum deles
+    # (a tabela quente acabou, ou a página vai até um mês arquivado, onde ainda
+    # há fiado antigo na tabela quente intercalado com os arquivados)
+    inicio = registros[-1].chegada if len(registros) > TAMANHO_PAGINA else None
+    fonte = fonte_cortes(inicio, cursor[0] if cursor else None, COLUNAS_CORTE)
+    if fonte == "cortes":
+        return registros
+    return carregar_registros(sql.format(fonte), params, corte, usar_cache=usar_cache)
+
+# --- EXTRATO (tela do Financeiro; o período inteiro sai pela exportação em transferencia.py) ---
+LIMITE_EXTRATO = 1000
+
+# --- FILA AO VIVO (notificação de alterações linha a linha) ---
+INTERVALO_FILA = 2  # segundos entre as verificações do painel
+
+def ultima_alteracao():
+    with get_pool().conexao() as conn, medir("sqlite", "ultima_alteracao"):
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM alteracoes").fetchone()[0]
+
+def alteracoes_desde(tabela, seq):
+    """Devolve (novo seq, ids alterados), ou (novo seq, None) se o registro já foi limpo."""
+    with get_pool().conexao() as conn, medir("sqlite", "alteracoes_desde"):
+        # Subconsultas separadas: MIN e MAX juntos no mesmo SELECT varrem a tabela inteira
+        menor, maior = conn.execute(
+            "SELECT (SELECT MIN(seq) FROM alteracoes), (SELECT MAX(seq) FROM alteracoes)").fetchone()
+        if maior is None or maior <= seq:
+            return seq, set()
+        if menor > seq + 1:
+            return maior, None  # perdemos alterações: quem chamou precisa recarregar tudo
+        ids = {linha[0] for linha in conn.execute(
+            "SELECT id_linha FROM alteracoes WHERE seq > ? AND tabela = ?", (seq, tabela))}
+    return maior, ids
+
+def _ordem_fila(corte):
+    # Mesma ordem do ORDER BY chegada, id (chegada nula fica no fim da fila, como no SQLite)
+    return (corte.chegada or datetime.min, corte.id)
+
+class FilaAoVivo:
+    """Página da fila guardada na sessão e corrigida só nas linhas que mudaram.
+
+    A cada verificação lê o registro de alterações; se algum corte mudou, busca
+    só esses cortes pelo id e encaixa na página, sem recarregar a tabela.
+    """
+
+    def __init__(self, cursor=None, somente_abertos=True):
+        self.cursor = cursor
+        self.somente_abertos = somente_abertos
+        self.recarregar()
+
+    def recarregar(self):
+        # seq lido antes da página: uma alteração no meio do caminho aparece de novo, nunca se perde
+        self.seq = ultima_alteracao()
+        self.linhas = list(carregar_fila(self.cursor, self.somente_abertos, usar_cache=False))
+
+    def _pertence(self, corte):
+        if self.somente_abertos:
+            inicio_do_dia = datetime.combine(date.today(), datetime.min.time())
+            if not corte.chegada or corte.chegada < inicio_do_dia or (corte.saida and corte.pago):
+                return False
+        return self.cursor is None or _ordem_fila(corte) < tuple(self.cursor)
+
+    def atualizar(self):
+        """Aplica as alterações desde a última verificação. Devolve True se a página mudou."""
+        self.seq, ids = alteracoes_desde("cortes", self.seq)
+        if ids is None:
+            self.recarregar()
+            return True
+        if not ids:
+            return False
+        marcadores = ",".join("?" * len(ids))
+        alteradas = carregar_registros(f"SELECT {COLUNAS_CORTE} FROM cortes WHERE id IN ({marcadores})",
+                                       tuple(ids), corte, usar_cache=False)
+        exibidas = {c.id for c in self.linhas}
+        if any(c.id in exibidas and not self._pertence(c) for c in alteradas):
+            # Alguém saiu da página: a vaga é de uma linha que ainda não foi lida
+            self.recarregar()
+            return True
+        entram = [c for c in alteradas if self._pertence(c)]
+        if len(self.linhas) > TAMANHO_PAGINA:
+            # Página cheia: só entra quem for mais recente que a última linha exibida
+            ultima = _ordem_fila(self.linhas[-1])
+            entram = [c for c in entram if c.id in exibidas or _ordem_fila(c) > ultima]
+        self.linhas = sorted([c for c in self.linhas if c.id not in ids] + entram,
+                             key=_ordem_fila, reverse=True)[:TAMANHO_PAGINA + 1]
+        return True
+
+# --- RESUMO FINANCEIRO ---
+def resumo_financeiro(inicio, fim):
+    # Lê o resumo diário (poucas linhas por dia) em vez de varrer cortes
+    def carregar():
+        with get_pool().conexao() as conn, medir("sqlite", "resumo_financeiro"):
+            return conn.execute(
+                """SELECT COALESCE(SUM(cortes), 0), COALESCE(SUM(recebido), 0)
+                   FROM resumo_diario WHERE dia >= ? AND dia < ?""",
+                (inicio.isoformat(), fim.isoformat())).fetchone()
+    total, faturamento = get_cache().obter(("resumo_financeiro", inicio, fim), {"resumo_diario"}, carregar)
+    ticket_medio = faturamento / total if total > 0 else 0.0
+    return total, faturamento, ticket_medio
+
+# --- LINHA DE COMANDO ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manutenção do banco local da barbearia.")
+    parser.add_argument("--reconstruir-resumo", action="store_true",
+                        help="recalcula resumo_diario a partir dos cortes, inclusive os arquivados")
+    args = parser.parse_args()
+
+    if not args.reconstruir_resumo:
+        parser.error("nada a fazer: use --reconstruir-resumo")
+    reconstruir_resumo()
+    with get_pool().conexao() as conn:
+        dias, cortes = conn.execute("SELECT COUNT(DISTINCT dia), COALESCE(SUM(cortes), 0) "
+                                    "FROM resumo_diario").fetchone()
+    print(f"Resumo diário reconstruído: {dias} dia(s), {cortes} corte(s) em {ARQUIVO_DB}.")
@@ -1,8 +1,7 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
-from datetime import datetime, date
-import time
+from datetime import datetime, date, timedelta
+from functools import partial
 
 # --- CONFIGURAÇÃO DA PÁGINA (Equivalente às propriedades do Form Principal) ---
 st.set_page_config(page_title="BarberSystem Pro", page_icon="✂️", layout="wide")
@@ -54,202 +53,380 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- BANCO DE DADOS (SQLite) ---
-def init_db():
-    conn = sqlite3.connect('barbearia.db')
-    c = conn.cursor()
-    # Tabela de Cortes (Fila/Histórico)
-    c.execute('''CREATE TABLE IF NOT EXISTS cortes
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                  cliente TEXT, 
-                  chegada DATETIME, 
-                  saida DATETIME, 
-                  pago BOOLEAN, 
-                  valor REAL)''')
-    # Tabela de Planos
-    c.execute('''CREATE TABLE IF NOT EXISTS planos
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                  cliente TEXT, 
-                  vencimento DATE, 
-                  status TEXT,
-                  obs TEXT)''')
-    conn.commit()
-    conn.close()
-
-# Inicializa o DB ao abrir
-init_db()
-
-# --- FUNÇÕES AUXILIARES (Helpers) ---
-def run_query(query, params=(), return_data=False):
-    conn = sqlite3.connect('barbearia.db')
-    if return_data:
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        return df
-    else:
-        c = conn.cursor()
-        c.execute(query, params)
-        conn.commit()
-        conn.close()
+# --- BANCO DE DADOS (SQLite, ver banco.py) ---
+from banco import (run_query, resumo_financeiro, reconstruir_resumo, get_cache, FilaAoVivo,
+                   TAMANHO_PAGINA, INTERVALO_FILA, LIMITE_EXTRATO, fonte_cortes)
+from regras import classificar_planos, ordenar_situacoes, CORES_SITUACAO
+from transferencia import arquivo_exportado, importar
+from arquivamento import arquivar, HORIZONTE_MESES
+from metricas import medir, medir_secao, pagina_diagnostico
+from atendimento import get_escalonador
+from clientes import get_indice_clientes
+from relatorios import secao_analise
+
+def resetar_paginacao():
+    st.session_state.fila_cursores = []
+
+def pagina_anterior():
+    st.session_state.fila_cursores.pop()
+
+def proxima_pagina(chegada, id_corte):
+    st.session_state.fila_cursores.append((chegada, id_corte))
 
 # --- INTERFACE: MODO RECEPÇÃO (TABLET) ---
+@medir_secao("kiosk")
 def show_kiosk():
     st.markdown("<h1 style='text-align: center; color: #d4af37;'>💈 Check-in Barbearia 💈</h1>", unsafe_allow_html=True)
     st.write("---")
     
+    # Callback: grava e limpa o campo antes de redesenhar a tela,
+    # sem segurar o tablet esperando (o próximo cliente já pode digitar)
+    def realizar_checkin():
+        nome = st.session_state.kiosk_nome
+        if nome:
+            agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # Cliente já cadastrado: liga pelo id; nome novo, o trigger cria o cadastro
+            id_cliente = get_indice_clientes().id_por_nome(nome)
+            id_corte = run_query("INSERT INTO cortes (cliente, cliente_id, chegada, pago, valor) VALUES (?, ?, ?, ?, ?)",
+                                 (nome, id_cliente, agora, False, 35.00))
+            st.toast(f"Show, {nome}! Você já está na lista do barbeiro.", icon='✅')
+            # Posição e espera estimada, mostradas abaixo do botão
+            st.session_state.kiosk_estimativa = (nome, get_escalonador().estimativa(id_corte))
+            st.session_state.kiosk_nome = ""
+        else:
+            st.toast("Por favor, digite seu nome.", icon='⚠️')
+    
     col1, col2, col3 = st.columns([1,2,1])
     with col2:
         st.info("👋 Bem-vindo! Coloque seu nome abaixo para entrar na fila.")
-        nome = st.text_input("Seu Nome Completo", key="kiosk_nome")
+        campo_nome_kiosk()
         
         # Equivalente ao TButton.OnClick
-        if st.button("📍 CHEGUEI (Check-in)", use_container_width=True):
-            if nome:
-                agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                run_query("INSERT INTO cortes (cliente, chegada, pago, valor) VALUES (?, ?, ?, ?)", 
-                          (nome, agora, False, 35.00))
-                st.success(f"Show, {nome}! Você já está na lista do barbeiro.")
-                time.sleep(2)
-                st.rerun() # Atualiza a tela
+        st.button("📍 CHEGUEI (Check-in)", use_container_width=True, on_click=realizar_checkin)
+
+        if st.session_state.get("kiosk_estimativa"):
+            nome, estimativa = st.session_state.kiosk_estimativa
+            if estimativa:
+                posicao, minutos, _ = estimativa
+                espera = f"cerca de {minutos} min" if minutos else "você é o próximo"
+                st.success(f"{nome}, você é o {posicao}º da fila. Espera estimada: {espera}.")
+
+# Fragmento: cada pausa na digitação reexecuta só o campo e as sugestões
+@st.fragment
+def campo_nome_kiosk():
+    def escolher_sugestao():
+        # Toque numa sugestão: completa o campo com o nome do cadastro
+        id_cliente = st.session_state.kiosk_sugestao
+        if id_cliente is not None:
+            st.session_state.kiosk_nome = get_indice_clientes().nome(id_cliente)
+            st.session_state.kiosk_sugestao = None
+
+    # live: o valor chega a cada pausa na digitação, não só no Enter
+    nome = st.text_input("Seu Nome Completo", key="kiosk_nome", live=True)
+    indice = get_indice_clientes()
+    sugestoes = indice.buscar(nome)
+    if sugestoes and indice.nome(sugestoes[0]) != nome:
+        st.pills("Já é cliente? Toque no seu nome:", sugestoes, format_func=indice.nome,
+                 key="kiosk_sugestao", on_change=escolher_sugestao)
+
+# --- AÇÕES (callbacks: gravam antes de a seção ser redesenhada) ---
+def finalizar_corte(id_corte):
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    run_query("UPDATE cortes SET saida = ? WHERE id = ?", (agora, id_corte))
+
+def chamar_cliente(id_corte, barbeiro):
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # inicio IS NULL: se outro tablet já chamou esse cliente, não troca de cadeira.
+    # NOT EXISTS: e só se a cadeira estiver livre (outro tablet pode ter chamado outro cliente para ela)
+    run_query("""UPDATE cortes SET inicio = ?, barbeiro = ? WHERE id = ? AND inicio IS NULL
+              AND NOT EXISTS (SELECT 1 FROM cortes WHERE barbeiro = ? AND chegada >= ?
+                              AND inicio IS NOT NULL AND saida IS NULL)""",
+              (agora, barbeiro, id_corte, barbeiro, date.today().isoformat()))
+
+def receber_corte(id_corte):
+    run_query("UPDATE cortes SET pago = ? WHERE id = ?", (True, id_corte))
+
+def excluir_planos(ids_planos):
+    # Exclusão lógica (ver migração 4 em banco.py)
+    marcadores = ",".join("?" * len(ids_planos))
+    run_query(f"UPDATE planos SET excluido = 1 WHERE id IN ({marcadores})", tuple(ids_planos))
+
+# --- SEÇÕES DO PAINEL ---
+# Cada seção é um fragmento: um clique dentro dela (Receber, Finalizar, salvar plano...)
+# reexecuta só a própria seção, sem refazer as consultas das outras.
+
+# === ABA 1: CORTES ===
+@st.fragment(run_every=INTERVALO_FILA)
+@medir_secao("fila")
+def secao_fila():
+    st.header("Controle de Atendimentos")
+
+    visao = st.radio("Exibir", ["Abertos hoje", "Histórico completo"], horizontal=True,
+                     key="fila_visao", on_change=resetar_paginacao)
+    cursores = st.session_state.setdefault("fila_cursores", [])
+
+    # Cadeiras: quem está sendo atendido e quem chamar (mensalistas primeiro)
+    escalonador = get_escalonador()
+    cadeiras = escalonador.cadeiras()
+    proximos = iter(escalonador.proximos(sum(1 for _, atual in cadeiras if atual is None)))
+    estimativas = escalonador.estimativas()
+    indice = get_indice_clientes()
+    indice.atualizar()
+    for coluna, (barbeiro, atual) in zip(st.columns(len(cadeiras)), cadeiras):
+        with coluna.container(border=True):
+            st.markdown(f"💺 **{barbeiro or 'Cadeira'}**")
+            proximo = None if atual else next(proximos, None)
+            if atual:
+                st.caption(f"Atendendo {atual.cliente} desde {atual.inicio:%H:%M}")
+            elif proximo:
+                st.button(f"Chamar {proximo.cliente}", key=f"chamar_{barbeiro}", on_click=chamar_cliente,
+                          args=(proximo.id, barbeiro), use_container_width=True)
             else:
-                st.warning("Por favor, digite seu nome.")
+                st.caption("Livre")
 
-# --- INTERFACE: MODO BARBEIRO (ADMIN) ---
-def show_admin():
-    st.title("✂️ Painel do Barbeiro")
-    
-    # Equivalente ao TTabControl
-    tab1, tab2, tab3 = st.tabs(["💈 Fila & Cortes", "📋 Planos Mensais", "💰 Financeiro"])
+    # Carregar dados (Equivalente ao Open do ClientDataSet), uma página por vez
+    # A página fica na sessão; a cada verificação só as linhas alteradas são relidas
+    cursor = cursores[-1] if cursores else None
+    fila = st.session_state.get("fila_ao_vivo")
+    if fila is None or (fila.cursor, fila.somente_abertos) != (cursor, visao == "Abertos hoje"):
+        fila = st.session_state.fila_ao_vivo = FilaAoVivo(cursor, visao == "Abertos hoje")
+    else:
+        fila.atualizar()
+    cortes = fila.linhas
+    tem_mais = len(cortes) > TAMANHO_PAGINA
+    cortes = cortes[:TAMANHO_PAGINA]
 
-    # === ABA 1: CORTES ===
-    with tab1:
-        st.header("Controle de Atendimentos")
-        
-        # Carregar dados (Equivalente ao Open do ClientDataSet)
-        df_cortes = run_query("SELECT * FROM cortes ORDER BY chegada DESC", return_data=True)
-        
-        if not df_cortes.empty:
-            for index, row in df_cortes.iterrows():
-                # Card visual para cada cliente (Loop manual criando componentes)
-                with st.container():
-                    c1, c2, c3, c4 = st.columns([2, 2, 1, 1])
-                    
-                    # Chegada formatada
-                    chegada_dt = pd.to_datetime(row['chegada'])
-                    hora_chegada = chegada_dt.strftime("%H:%M")
-                    dia_chegada = chegada_dt.strftime("%d/%m")
-                    
-                    with c1:
-                        st.markdown(f"**{row['cliente']}**")
-                        st.caption(f"Chegou: {dia_chegada} às {hora_chegada}")
-                    
-                    with c2:
-                        if row['saida']:
-                            saida_dt = pd.to_datetime(row['saida'])
-                            st.write(f"✅ Saiu às {saida_dt.strftime('%H:%M')}")
-                        else:
-                            if st.button("Finalizar Corte", key=f"fim_{row['id']}"):
-                                agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                run_query("UPDATE cortes SET saida = ? WHERE id = ?", (agora, row['id']))
-                                st.rerun()
-
-                    with c3:
-                        status_pag = "Pago ✅" if row['pago'] else "Pendente ❌"
-                        st.write(status_pag)
-                    
-                    with c4:
-                        if not row['pago']:
-                            if st.button("Receber", key=f"pag_{row['id']}"):
-                                run_query("UPDATE cortes SET pago = ? WHERE id = ?", (True, row['id']))
-                                st.rerun()
-                    
-                    st.divider()
-        else:
-            st.info("Nenhum cliente registrado hoje.")
+    if cortes:
+        for corte in cortes:
+            # Card visual para cada cliente (Loop manual criando componentes)
+            with st.container():
+                c1, c2, c3, c4 = st.columns([2, 2, 1, 1])
 
-    # === ABA 2: PLANOS ===
-    with tab2:
-        c1, c2 = st.columns([1, 2])
-        
-        with c1:
-            st.subheader("Novo Plano")
-            with st.form("novo_plano"):
-                p_nome = st.text_input("Nome do Cliente")
-                p_venc = st.date_input("Data de Vencimento")
-                p_status = st.selectbox("Status", ["Ativo", "Cancelado"])
-                btn_add_plan = st.form_submit_button("Salvar Plano")
-                
-                if btn_add_plan and p_nome:
-                    run_query("INSERT INTO planos (cliente, vencimento, status) VALUES (?, ?, ?)", 
-                              (p_nome, p_venc, p_status))
-                    st.success("Plano salvo!")
-                    st.rerun()
-
-        with c2:
-            st.subheader("Clientes Mensalistas")
-            df_planos = run_query("SELECT * FROM planos ORDER BY vencimento ASC", return_data=True)
-            
-            if not df_planos.empty:
-                hoje = date.today()
-                
-                for i, row in df_planos.iterrows():
-                    venc = pd.to_datetime(row['vencimento']).date()
-                    dias_restantes = (venc - hoje).days
-                    
-                    cor_status = "green"
-                    msg_status = row['status']
-                    
-                    # Lógica de cores (Equivalente ao OnGetText ou Styles)
-                    if row['status'] == 'Ativo':
-                        if dias_restantes < 0:
-                            cor_status = "red"
-                            msg_status = "ATRASADO"
-                        elif dias_restantes <= 3:
-                            cor_status = "orange"
-                            msg_status = "Vence em Breve"
+                with c1:
+                    st.markdown(f"**{corte.cliente}**")
+                    # Datas já chegam convertidas do banco (ver modelos.py)
+                    if corte.chegada:
+                        st.caption(f"Chegou: {corte.chegada:%d/%m} às {corte.chegada:%H:%M}")
+                    # Situação do plano vem do índice em memória, sem consulta por linha
+                    plano = indice.plano(corte.cliente_id)
+                    if plano:
+                        situacao, vencimento = plano
+                        st.caption(f":{CORES_SITUACAO.get(situacao, 'gray')}[⭐ Plano {situacao} · "
+                                   f"vence {vencimento:%d/%m}]")
+                    if corte.id in estimativas:
+                        posicao, minutos, _ = estimativas[corte.id]
+                        st.caption(f"⏳ {posicao}º na fila · ~{minutos} min")
+                    elif corte.inicio and not corte.saida:
+                        st.caption(f"💺 Com {corte.barbeiro or 'o barbeiro'} desde {corte.inicio:%H:%M}")
+
+                with c2:
+                    if corte.saida:
+                        st.write(f"✅ Saiu às {corte.saida:%H:%M}")
                     else:
-                        cor_status = "gray"
-                    
-                    cols = st.columns([3, 2, 2, 1])
-                    cols[0].write(f"**{row['cliente']}**")
-                    cols[1].write(f"Venc: {venc.strftime('%d/%m/%Y')}")
-                    cols[2].markdown(f":{cor_status}[{msg_status}]")
-                    
-                    if cols[3].button("🗑️", key=f"del_plan_{row['id']}"):
-                         run_query("DELETE FROM planos WHERE id = ?", (row['id'],))
-                         st.rerun()
+                        st.button("Finalizar Corte", key=f"fim_{corte.id}", on_click=finalizar_corte, args=(corte.id,))
+
+                with c3:
+                    status_pag = "Pago ✅" if corte.pago else "Pendente ❌"
+                    st.write(status_pag)
+
+                with c4:
+                    if not corte.pago:
+                        st.button("Receber", key=f"pag_{corte.id}", on_click=receber_corte, args=(corte.id,))
+
+                st.divider()
+    else:
+        st.info("Nenhum cliente registrado hoje.")
+
+    # Navegação entre páginas
+    n1, n2 = st.columns(2)
+    if cursores:
+        n1.button("⬅️ Mais recentes", on_click=pagina_anterior, use_container_width=True)
+    if tem_mais:
+        ultimo = cortes[-1]
+        n2.button("Carregar anteriores ➡️", on_click=proxima_pagina,
+                  args=(ultimo.chegada, ultimo.id), use_container_width=True)
+
+# Cadastro local (não é sincronizado): cada barbearia configura as próprias cadeiras
+@st.fragment
+def secao_barbeiros():
+    with st.expander("💈 Barbeiros e cadeiras"):
+        df_barbeiros = run_query("SELECT nome, cadeira, ativo FROM barbeiros ORDER BY cadeira, nome",
+                                 return_data=True).astype({"ativo": bool})
+        editado = st.data_editor(
+            df_barbeiros, num_rows="add", hide_index=True, key="editor_barbeiros",
+            column_config={"nome": st.column_config.TextColumn("Barbeiro", required=True),
+                           "cadeira": st.column_config.NumberColumn("Cadeira", min_value=1, step=1),
+                           "ativo": st.column_config.CheckboxColumn("Trabalhando hoje", default=True)})
+        st.caption("Sem barbeiros cadastrados, a fila funciona com uma cadeira só.")
+        if st.button("Salvar barbeiros"):
+            editado = editado.dropna(subset=["nome"])
+            ocupadas = editado[editado["ativo"].fillna(False).astype(bool)]["cadeira"].dropna()
+            if ocupadas.duplicated().any():
+                st.error("Dois barbeiros ativos na mesma cadeira.")
             else:
-                st.write("Nenhum plano cadastrado.")
+                for nome, cadeira, ativo in editado.itertuples(index=False):
+                    run_query("""INSERT INTO barbeiros (nome, cadeira, ativo) VALUES (?, ?, ?)
+                                 ON CONFLICT (nome) DO UPDATE SET cadeira = excluded.cadeira, ativo = excluded.ativo""",
+                              (nome.strip(), None if pd.isna(cadeira) else int(cadeira), int(bool(ativo))))
+                st.success("Barbeiros salvos!")
 
-    # === ABA 3: FINANCEIRO ===
-    with tab3:
-        st.header("Fluxo de Caixa")
-        
-        hoje = datetime.now()
-        inicio_mes = hoje.replace(day=1, hour=0, minute=0, second=0).strftime("%Y-%m-%d")
-        
-        # Consultas de Agregação (SUM, COUNT)
-        total_cortes_mes = run_query(f"SELECT COUNT(*) FROM cortes WHERE chegada >= '{inicio_mes}'", return_data=True).iloc[0,0]
-        faturamento_mes = run_query(f"SELECT SUM(valor) FROM cortes WHERE chegada >= '{inicio_mes}' AND pago = 1", return_data=True).iloc[0,0]
-        
-        if faturamento_mes is None: faturamento_mes = 0
+# === ABA 2: PLANOS ===
+@st.fragment
+@medir_secao("planos")
+def secao_planos():
+    c1, c2 = st.columns([1, 2])
+
+    with c1:
+        st.subheader("Novo Plano")
+        with st.form("novo_plano"):
+            p_nome = st.text_input("Nome do Cliente")
+            p_venc = st.date_input("Data de Vencimento")
+            p_status = st.selectbox("Status", ["Ativo", "Cancelado"])
+            btn_add_plan = st.form_submit_button("Salvar Plano")
+
+            if btn_add_plan and p_nome:
+                run_query("INSERT INTO planos (cliente, vencimento, status) VALUES (?, ?, ?)", 
+                          (p_nome, p_venc.isoformat(), p_status))
+                st.success("Plano salvo!")
+
+    with c2:
+        st.subheader("Clientes Mensalistas")
+        df_planos = run_query("SELECT id, cliente, vencimento, status FROM planos WHERE excluido = 0 ORDER BY vencimento ASC",
+                              return_data=True)
+
+        if not df_planos.empty:
+            with medir("preparo", "classificar_planos"):
+                df_planos = classificar_planos(df_planos, date.today())
+
+            # Filtro por situação (com a contagem de cada uma)
+            contagem = df_planos['situacao'].value_counts()
+            situacoes = ordenar_situacoes(contagem.index)
+            filtro = st.pills("Situação", situacoes, selection_mode="multi", default=situacoes,
+                              format_func=lambda s: f"{s} ({contagem[s]})", key="filtro_planos")
+            df_planos = df_planos[df_planos['situacao'].isin(filtro)].reset_index(drop=True)
+
+            # Uma tabela só, colorida pela situação, em vez de uma linha de componentes por plano
+            tabela = df_planos[['cliente', 'vencimento', 'dias_restantes', 'situacao']].style.apply(
+                lambda _: "color: " + df_planos['cor'], subset=['situacao'])
+            evento = st.dataframe(
+                tabela, hide_index=True, on_select="rerun", selection_mode="multi-row", key="tabela_planos",
+                column_config={
+                    "cliente": st.column_config.TextColumn("Cliente"),
+                    "vencimento": st.column_config.DateColumn("Vencimento", format="DD/MM/YYYY"),
+                    "dias_restantes": st.column_config.NumberColumn("Dias", format="%d"),
+                    "situacao": st.column_config.TextColumn("Situação"),
+                })
+
+            linhas = [i for i in evento.selection.rows if i < len(df_planos)]
+            selecionados = df_planos.loc[linhas, 'id'].tolist()
+            st.button(f"🗑️ Excluir selecionados ({len(selecionados)})", disabled=not selecionados,
+                      on_click=excluir_planos, args=(selecionados,))
+        else:
+            st.write("Nenhum plano cadastrado.")
 
-        m1, m2, m3 = st.columns(3)
-        m1.metric("Cortes no Mês", total_cortes_mes)
-        m2.metric("Faturamento (Recebido)", f"R$ {faturamento_mes:.2f}")
-        m3.metric("Ticket Médio", f"R$ {(faturamento_mes/total_cortes_mes if total_cortes_mes > 0 else 0):.2f}")
+# === ABA 3: FINANCEIRO ===
+@st.fragment
+@medir_secao("financeiro")
+def secao_financeiro():
+    st.header("Fluxo de Caixa")
+
+    hoje = date.today()
+    periodo = st.date_input("Período", value=(hoje.replace(day=1), hoje), format="DD/MM/YYYY")
+    inicio = periodo[0]
+    fim = (periodo[1] if len(periodo) > 1 else periodo[0]) + timedelta(days=1)
+
+    # Consulta de Agregação (COUNT, SUM e ticket médio em uma consulta só)
+    total_cortes, faturamento, ticket_medio = resumo_financeiro(inicio, fim)
+    # Equivalente ao TDBGrid, limitado ao período selecionado
+    df_grid = run_query(f"""SELECT cliente, chegada, valor, pago
+                           FROM {fonte_cortes(inicio, fim, "cliente, chegada, valor, pago")}
+                           WHERE pago = 1 AND chegada >= ? AND chegada < ?
+                           ORDER BY chegada DESC LIMIT ?""",
+                        (inicio.strftime("%Y-%m-%d"), fim.strftime("%Y-%m-%d"), LIMITE_EXTRATO + 1),
+                        return_data=True)
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Cortes no Período", total_cortes)
+    m2.metric("Faturamento (Recebido)", f"R$ {faturamento:.2f}")
+    m3.metric("Ticket Médio", f"R$ {ticket_medio:.2f}")
+
+    secao_analise(inicio, fim)
+
+    st.subheader("Extrato Detalhado")
+    # Na tela, só os LIMITE_EXTRATO mais recentes; o período inteiro vai para o arquivo exportado
+    if len(df_grid) > LIMITE_EXTRATO:
+        st.caption(f"Mostrando os {LIMITE_EXTRATO} mais recentes. Exporte para ver o período inteiro.")
+        df_grid = df_grid.head(LIMITE_EXTRATO)
+    st.dataframe(df_grid, use_container_width=True)
+
+    # Exportação em lotes: o arquivo só é gerado quando o botão é clicado
+    e1, e2, e3 = st.columns(3)
+    formato = e1.selectbox("Formato", ["csv", "parquet"], format_func=str.upper, key="formato_exportacao")
+    sufixo = f"{inicio:%Y%m%d}_{fim - timedelta(days=1):%Y%m%d}"
+    e2.download_button("⬇️ Exportar cortes", partial(arquivo_exportado, "cortes", formato, inicio, fim),
+                       file_name=f"cortes_{sufixo}.{formato}", on_click="ignore", width="stretch")
+    e3.download_button("⬇️ Exportar planos", partial(arquivo_exportado, "planos", formato),
+                       file_name=f"planos.{formato}", on_click="ignore", width="stretch")
+
+    with st.expander("Manutenção"):
+        st.caption("Importa planilhas antigas ou arquivos exportados (CSV ou Parquet). "
+                   "Linhas já importadas antes são ignoradas.")
+        tabela_importacao = st.selectbox("Tabela", ["cortes", "planos"], key="tabela_importacao")
+        planilha = st.file_uploader("Arquivo", type=["csv", "parquet"], key="arquivo_importacao")
+        if planilha and st.button("Importar"):
+            try:
+                gravadas = importar(tabela_importacao, planilha)
+                st.success(f"{gravadas} linha(s) importada(s).")
+            except ValueError as e:
+                st.error(f"Erro ao importar: {e}")
+
+        st.caption("Arquiva os cortes finalizados e pagos mais antigos em tabelas por mês. "
+                   "Eles continuam nos relatórios e na exportação; a fila fica mais leve.")
+        horizonte = st.number_input("Manter na tabela principal (meses)", min_value=1, value=HORIZONTE_MESES,
+                                    step=1, key="horizonte_arquivamento")
+        if st.button("Arquivar cortes antigos"):
+            movidos = arquivar(horizonte)
+            st.success(f"{sum(movidos.values())} corte(s) arquivado(s) em {len(movidos)} mês(es).")
+
+        st.caption("Recalcula o resumo diário a partir do histórico completo de cortes (inclusive os arquivados).")
+        if st.button("Reconstruir resumo"):
+            reconstruir_resumo()
+            st.success("Resumo reconstruído!")
+        cache = get_cache().estatisticas()
+        st.caption(f"Cache de consultas: {cache['acertos']} acertos, {cache['falhas']} idas ao banco "
+                   f"({cache['taxa_acerto']:.0%} de acerto), {cache['invalidacoes']} invalidações.")
+
+# --- INTERFACE: MODO BARBEIRO (ADMIN) ---
+def show_admin():
+    st.title("✂️ Painel do Barbeiro")
+    
+    # Equivalente ao TTabControl
+    tab1, tab2, tab3 = st.tabs(["💈 Fila & Cortes", "📋 Planos Mensais", "💰 Financeiro"], key="aba_admin", on_change="rerun")
 
-        st.subheader("Extrato Detalhado")
-        # Equivalente ao TDBGrid
-        st.dataframe(run_query("SELECT cliente, chegada, valor, pago FROM cortes WHERE pago = 1 ORDER BY chegada DESC", return_data=True), use_container_width=True)
+    # Só a aba aberta executa (on_change="rerun" liga o .open de cada aba)
+    if tab1.open:
+        with tab1:
+            secao_fila()
+            secao_barbeiros()
+    if tab2.open:
+        with tab2:
+            secao_planos()
+    if tab3.open:
+        with tab3:
+            secao_financeiro()
 
 # --- SIDEBAR: MENU LATERAL (Equivalente ao TMultiView) ---
 st.sidebar.image("https://cdn-icons-png.flaticon.com/512/483/483935.png", width=100)
 st.sidebar.title("Menu")
-modo = st.sidebar.radio("Selecione o modo:", ["Recepção (Tablet)", "Área do Barbeiro"])
+modos = ["Recepção (Tablet)", "Área do Barbeiro"]
+if st.query_params.get("diagnostico") == "1":
+    modos.append("Diagnóstico")  # página oculta: só aparece com ?diagnostico=1 na URL
+modo = st.sidebar.radio("Selecione o modo:", modos)
 
 # Controle de fluxo da aplicação
 if modo == "Recepção (Tablet)":
     show_kiosk()
+elif modo == "Diagnóstico":
+    pagina_diagnostico()
 else:
     show_admin()
\ No newline at end of file
@@ -0,0 +1,398 @@
+"""Benchmark das consultas do painel com volumes sintéticos de cortes e planos.
+
+Para cada volume, gera um histórico com chegadas realistas (horário de
+funcionamento com picos no almoço e no fim da tarde, sábado cheio, domingo
+fechado, clientes que voltam), carrega em dois bancos e cronometra:
+  - sqlite:         as consultas que show_admin/show_kiosk fazem no banco local
+                    (banco.py, mesmo esquema do barber.py), sem o cache de consultas;
+  - supabase_local: as mesmas telas no formato PostgREST, contra o substituto
+                    local do Supabase (supabase_local.py), mais o lote de pull da
+                    sincronização;
+  - preparo:        os passos de DataFrame que as seções fazem antes de desenhar;
+  - sincronizacao:  um ciclo de sincronização (pull + push das duas tabelas)
+                    contra o substituto local com latência de rede simulada,
+                    tabela por tabela e com as tabelas em paralelo;
+  - arquivamento:   as telas antes e depois de arquivar os cortes antigos em
+                    partições mensais (arquivamento.py), e o arquivamento em si.
+
+O resultado sai em JSON, para comparar versões:
+    python benchmark.py --volumes 1000 100000 1000000 --saida resultados.json
+    python benchmark.py --backends sincronizacao --latencia 80
+    python benchmark.py --backends arquivamento --volumes 1000000
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import arquivamento
+import banco
+import relatorios
+from regras import classificar_planos
+from supabase_local import ClienteSupabaseLocal
+from sincronizacao import COLUNAS, TAMANHO_LOTE_SYNC, Sincronizador
+
+VOLUMES_PADRAO = [1000, 100000, 1000000]
+REPETICOES_PADRAO = 20
+CORTES_POR_DIA = 40
+LATENCIA_PADRAO_MS = 50   # ida e volta simulada até o Supabase
+TAMANHO_LOTE_CARGA = 10000
+BARBEIROS = ["Carlos", "João", "Pedro"]
+
+# Peso de cada dia da semana (segunda = 0) e de cada hora de funcionamento (9h às 19h)
+PESO_DIA_SEMANA = np.array([0.8, 1.0, 1.0, 1.0, 1.2, 1.6, 0.0])
+PESO_HORA = np.array([0.5, 0.8, 1.2, 1.0, 0.7, 0.7, 0.8, 1.0, 1.3, 1.1])
+PRECOS = np.array([35.0, 45.0, 60.0])
+PROBABILIDADE_PRECO = np.array([0.7, 0.2, 0.1])
+
+
+# --- DADOS SINTÉTICOS ---
+def gerar_cortes(n, hoje, semente=42, por_dia=CORTES_POR_DIA):
+    """Gera n cortes em ordem de chegada, em lotes de tuplas (cliente, chegada, saida, pago, valor, barbeiro).
+
+    Os cortes de hoje ficam parte em aberto, como numa fila de verdade.
+    """
+    rng = np.random.default_rng(semente)
+    dias = max(1, -(-n // por_dia))
+    primeiro = hoje - timedelta(days=dias - 1)
+    dia_semana = (np.arange(dias) + primeiro.weekday()) % 7
+    pesos = PESO_DIA_SEMANA[dia_semana]
+    por_data = rng.multinomial(n, pesos / pesos.sum())
+    clientes = max(100, n // 15)  # clientes fiéis: em média 15 visitas cada
+
+    inicio = 0
+    while inicio < dias:
+        # Dias inteiros por lote, para manter a ordem de chegada entre lotes
+        fim = inicio + 1
+        while fim < dias and por_data[inicio:fim + 1].sum() <= TAMANHO_LOTE_CARGA:
+            fim += 1
+        dia = np.repeat(np.arange(inicio, fim), por_data[inicio:fim])
+        quantos = len(dia)
+        segundos = (rng.choice(len(PESO_HORA), quantos, p=PESO_HORA / PESO_HORA.sum()) + 9) * 3600 \
+            + rng.integers(0, 3600, quantos)
+        ordem = np.lexsort((segundos, dia))
+        dia, segundos = dia[ordem], segundos[ordem]
+        chegada = np.datetime64(primeiro) + dia.astype("timedelta64[D]") + segundos.astype("timedelta64[s]")
+        saida = chegada + (np.clip(rng.normal(35, 8, quantos), 15, 90) * 60).astype("timedelta64[s]")
+        pago = rng.random(quantos) < 0.97
+        em_aberto = dia == dias - 1
+        aberto_agora = em_aberto & (rng.random(quantos) < 0.5)
+        valor = rng.choice(PRECOS, quantos, p=PROBABILIDADE_PRECO)
+        cliente = rng.integers(1, clientes + 1, quantos)
+        barbeiro = rng.integers(0, len(BARBEIROS), quantos)
+        texto_chegada = np.datetime_as_string(chegada, unit="s")
+        texto_saida = np.datetime_as_string(saida, unit="s")
+        yield [(f"Cliente {cliente[i]:06d}", texto_chegada[i].replace("T", " "),
+                None if aberto_agora[i] else texto_saida[i].replace("T", " "),
+                int(pago[i] and not em_aberto[i]), float(valor[i]), BARBEIROS[barbeiro[i]])
+               for i in range(quantos)]
+        inicio = fim
+
+
+def gerar_planos(n, hoje, semente=42):
+    """Gera n planos (cliente, vencimento, status, obs) com vencimentos espalhados em volta de hoje."""
+    rng = np.random.default_rng(semente + 1)
+    vencimento = np.datetime64(hoje) + rng.integers(-60, 60, n).astype("timedelta64[D]")
+    cancelado = rng.random(n) < 0.15
+    texto = np.datetime_as_string(vencimento, unit="D")
+    return [(f"Cliente {i + 1:06d}", texto[i], "Cancelado" if cancelado[i] else "Ativo", None)
+            for i in range(n)]
+
+
+# --- CARGA ---
+def carregar_sqlite(caminho, n_cortes, n_planos, hoje):
+    """Aponta o banco.py para caminho e grava os dados pelos mesmos triggers do sistema."""
+    banco.ARQUIVO_DB = caminho
+    banco.get_pool.clear()
+    banco.get_cache.clear()
+    with banco.get_pool().conexao() as conn:
+        for lote in gerar_cortes(n_cortes, hoje):
+            with conn:
+                conn.executemany("INSERT INTO cortes (cliente, chegada, saida, pago, valor, barbeiro) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", lote)
+        with conn:
+            conn.executemany("INSERT INTO planos (cliente, vencimento, status, obs) VALUES (?, ?, ?, ?)",
+                             gerar_planos(n_planos, hoje))
+        conn.execute("PRAGMA optimize")
+
+
+def carregar_supabase_local(caminho, n_cortes, n_planos, hoje):
+    cliente = ClienteSupabaseLocal(caminho)
+    nomes = ["cliente", "chegada", "saida", "pago", "valor", "barbeiro"]
+    for lote in gerar_cortes(n_cortes, hoje):
+        cliente.table("cortes").insert([dict(zip(nomes, linha)) for linha in lote]).execute()
+    cliente.table("planos").insert([dict(zip(["cliente", "vencimento", "status", "obs"], linha))
+                                    for linha in gerar_planos(n_planos, hoje)]).execute()
+    return cliente
+
+
+# --- CRONÔMETRO ---
+def cronometrar(funcao, repeticoes, preparar=None):
+    """Roda funcao repeticoes vezes (depois de um aquecimento) e resume os tempos em ms."""
+    if preparar:
+        preparar()
+    resultado = funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {"min_ms": round(tempos[0], 3),
+            "mediana_ms": round(statistics.median(tempos), 3),
+            "p95_ms": round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 3),
+            "media_ms": round(statistics.fmean(tempos), 3),
+            "linhas": _linhas(resultado)}
+
+
+def _linhas(resultado):
+    if hasattr(resultado, "data"):
+        return len(resultado.data)
+    if isinstance(resultado, (pd.DataFrame, list, tuple, pa.Table)):
+        return len(resultado)
+    return None
+
+
+# --- CENÁRIOS ---
+def medir_sqlite(hoje, repeticoes):
+    inicio_mes, amanha = hoje.replace(day=1), hoje + timedelta(days=1)
+    primeira = banco.carregar_fila(somente_abertos=False, usar_cache=False)
+    cursor = (primeira[-2].chegada, primeira[-2].id)
+    fila = banco.FilaAoVivo()
+
+    def checkin():
+        banco.run_query("INSERT INTO cortes (cliente, chegada, pago, valor) VALUES (?, ?, ?, ?)",
+                        ("Benchmark", datetime.now().strftime("%Y-%m-%d %H:%M:%S"), False, 35.00))
+
+    def extrato():
+        return banco.run_query("""SELECT cliente, chegada, valor, pago FROM cortes
+                                  WHERE pago = 1 AND chegada >= ? AND chegada < ?
+                                  ORDER BY chegada DESC LIMIT ?""",
+                               (inicio_mes.isoformat(), amanha.isoformat(), banco.LIMITE_EXTRATO + 1),
+                               return_data=True, usar_cache=False)
+
+    def resumo_mes():
+        banco.get_cache().invalidar("resumo_diario")
+        return banco.resumo_financeiro(inicio_mes, amanha)
+
+    def painel_ano():
+        for tabela in ("resumo_diario", "cortes"):
+            banco.get_cache().invalidar(tabela)
+        return relatorios.Painel.carregar(amanha - timedelta(days=365), amanha, "mes")
+
+    return {
+        "kiosk_checkin": cronometrar(checkin, repeticoes),
+        "fila_abertos_hoje": cronometrar(lambda: banco.carregar_fila(usar_cache=False), repeticoes),
+        "fila_historico_pagina_1": cronometrar(
+            lambda: banco.carregar_fila(somente_abertos=False, usar_cache=False), repeticoes),
+        "fila_historico_pagina_2": cronometrar(
+            lambda: banco.carregar_fila(cursor, somente_abertos=False, usar_cache=False), repeticoes),
+        "fila_ao_vivo_sem_alteracao": cronometrar(fila.atualizar, repeticoes),
+        "planos": cronometrar(lambda: banco.run_query(
+            "SELECT id, cliente, vencimento, status FROM planos WHERE excluido = 0 ORDER BY vencimento ASC",
+            return_data=True, usar_cache=False), repeticoes),
+        "financeiro_resumo_mes": cronometrar(resumo_mes, repeticoes),
+        "financeiro_extrato_mes": cronometrar(extrato, repeticoes),
+        "financeiro_resumo_mes_em_cache": cronometrar(
+            lambda: banco.resumo_financeiro(inicio_mes, amanha), repeticoes),
+        # A tela do Financeiro inteira: resumo e extrato, um depois do outro
+        "financeiro_tela": cronometrar(lambda: (resumo_mes(), extrato()), repeticoes),
+        # Análise do período de um ano inteiro (séries, ocupação, a receber), sem cache
+        "financeiro_painel_ano": cronometrar(painel_ano, repeticoes),
+    }
+
+
+def medir_supabase_local(cliente, hoje, repeticoes):
+    inicio_mes, amanha = hoje.replace(day=1).isoformat(), (hoje + timedelta(days=1)).isoformat()
+    cortes = cliente.table
+
+    def pull_sincronizacao():
+        return (cortes("cortes").select(", ".join(["uid", "updated_at"] + COLUNAS["cortes"]))
+                .or_('updated_at.gt."1970-01-01T00:00:00+00:00",'
+                     'and(updated_at.eq."1970-01-01T00:00:00+00:00",uid.gt."")')
+                .order("updated_at").order("uid").limit(TAMANHO_LOTE_SYNC).execute())
+
+    return {
+        "kiosk_checkin": cronometrar(lambda: cortes("cortes").insert(
+            {"cliente": "Benchmark", "chegada": datetime.now().astimezone().isoformat(),
+             "pago": False, "valor": 35.00}).execute(), repeticoes),
+        "fila_abertos_hoje": cronometrar(lambda: cortes("cortes").select("*").gte("chegada", hoje.isoformat())
+                                         .order("chegada", desc=True).order("id", desc=True)
+                                         .limit(banco.TAMANHO_PAGINA + 1).execute(), repeticoes),
+        "fila_historico_pagina_1": cronometrar(lambda: cortes("cortes").select("*")
+                                               .order("chegada", desc=True).order("id", desc=True)
+                                               .limit(banco.TAMANHO_PAGINA + 1).execute(), repeticoes),
+        "planos": cronometrar(lambda: cortes("planos").select("id, cliente, vencimento, status")
+                              .eq("excluido", False).order("vencimento").execute(), repeticoes),
+        "financeiro_periodo_mes": cronometrar(lambda: cortes("cortes").select("valor, pago", count="exact")
+                                              .gte("chegada", inicio_mes).lt("chegada", amanha)
+                                              .execute(), repeticoes),
+        "financeiro_extrato_mes": cronometrar(lambda: cortes("cortes").select("cliente, chegada, valor, pago")
+                                              .eq("pago", True).gte("chegada", inicio_mes).lt("chegada", amanha)
+                                              .order("chegada", desc=True).limit(banco.LIMITE_EXTRATO + 1)
+                                              .execute(), repeticoes),
+        "sincronizacao_pull_lote": cronometrar(pull_sincronizacao, repeticoes),
+    }
+
+
+def medir_sincronizacao(caminho, latencia_ms, repeticoes, hoje):
+    """Ciclos de sincronização sem alterações novas: o custo é quase só a ida e volta da rede."""
+    banco.ARQUIVO_DB = caminho
+    banco.get_pool.clear()
+    banco.get_cache.clear()
+    cliente = carregar_supabase_local(":memory:", 200, 20, hoje)
+    cliente.latencia = latencia_ms / 1000
+    sincronizador = Sincronizador(cliente)  # sem iniciar(): os ciclos rodam só aqui
+    sincronizador.sincronizar()  # réplica vazia: o primeiro ciclo traz tudo
+    requisicao = cliente.table("planos").select("uid").limit(1).execute
+    return {"latencia_ms": latencia_ms,
+            "requisicao": cronometrar(requisicao, repeticoes),
+            "ciclo_sequencial": cronometrar(
+                lambda: [sincronizador._sincronizar_tabela(tabela) for tabela in COLUNAS], repeticoes),
+            "ciclo_em_paralelo": cronometrar(sincronizador.sincronizar, repeticoes)}
+
+
+def medir_arquivamento(caminho, n, repeticoes, hoje):
+    """As mesmas telas antes e depois de arquivar o histórico antigo, e o arquivamento em si."""
+    carregar_sqlite(caminho, n, max(10, n // 20), hoje)
+    amanha = hoje + timedelta(days=1)
+    ano_passado = (amanha - timedelta(days=730), amanha - timedelta(days=365))
+
+    def extrato(inicio, fim):
+        return banco.run_query(f"""SELECT cliente, chegada, valor, pago
+                                   FROM {banco.fonte_cortes(inicio, fim, "cliente, chegada, valor, pago")}
+                                   WHERE pago = 1 AND chegada >= ? AND chegada < ?
+                                   ORDER BY chegada DESC LIMIT ?""",
+                               (inicio.isoformat(), fim.isoformat(), banco.LIMITE_EXTRATO + 1),
+                               return_data=True, usar_cache=False)
+
+    def painel(inicio, fim):
+        for tabela in ("resumo_diario", "cortes"):
+            banco.get_cache().invalidar(tabela)
+        return relatorios.Painel.carregar(inicio, fim, "mes")
+
+    def telas():
+        return {
+            "fila_abertos_hoje": cronometrar(lambda: banco.carregar_fila(usar_cache=False), repeticoes),
+            "fila_historico_pagina_1": cronometrar(
+                lambda: banco.carregar_fila(somente_abertos=False, usar_cache=False), repeticoes),
+            "extrato_mes": cronometrar(lambda: extrato(hoje.replace(day=1), amanha), repeticoes),
+            "extrato_ano_passado": cronometrar(lambda: extrato(*ano_passado), repeticoes),
+            "painel_ano": cronometrar(lambda: painel(amanha - timedelta(days=365), amanha), repeticoes),
+            "painel_ano_passado": cronometrar(lambda: painel(*ano_passado), repeticoes),
+        }
+
+    antes = telas()
+    inicio = time.perf_counter()
+    movidos = arquivamento.arquivar(hoje=hoje)
+    with banco.get_pool().conexao() as conn:
+        quentes = conn.execute("SELECT COUNT(*) FROM cortes").fetchone()[0]
+    return {"arquivar_s": round(time.perf_counter() - inicio, 2), "arquivados": sum(movidos.values()),
+            "meses": len(movidos), "tabela_quente": quentes, "antes": antes, "depois": telas()}
+
+
+def medir_preparo(hoje, repeticoes):
+    """Passos de DataFrame das seções, sobre os dados que cada uma de fato recebe."""
+    fila = banco.carregar_fila(somente_abertos=False, usar_cache=False)[:banco.TAMANHO_PAGINA]
+    planos = banco.run_query("SELECT id, cliente, vencimento, status FROM planos WHERE excluido = 0 "
+                             "ORDER BY vencimento ASC", return_data=True, usar_cache=False)
+    extrato = banco.run_query("SELECT cliente, chegada, valor, pago FROM cortes WHERE pago = 1 "
+                              "ORDER BY chegada DESC LIMIT ?", (banco.LIMITE_EXTRATO,), return_data=True)
+
+    def preparo_fila():
+        # Mesmo trabalho por linha que a secao_fila faz antes de desenhar
+        return [(corte.cliente, f"{corte.chegada:%d/%m}", f"{corte.chegada:%H:%M}",
+                 f"{corte.saida:%H:%M}" if corte.saida else None) for corte in fila]
+
+    def preparo_planos():
+        df = classificar_planos(planos, hoje)
+        df["situacao"].value_counts()
+        df = df[df["situacao"].isin(["ATRASADO", "Vence em Breve", "Ativo"])].reset_index(drop=True)
+        # st.dataframe serializa em Arrow antes de enviar ao navegador
+        return pa.Table.from_pandas(df[["cliente", "vencimento", "dias_restantes", "situacao"]])
+
+    def preparo_extrato():
+        return pa.Table.from_pandas(extrato.assign(chegada=pd.to_datetime(extrato["chegada"])))
+
+    return {"fila": cronometrar(preparo_fila, repeticoes),
+            "planos": cronometrar(preparo_planos, repeticoes),
+            "extrato": cronometrar(preparo_extrato, repeticoes)}
+
+
+# --- EXECUÇÃO ---
+def _versao():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(volumes, repeticoes=REPETICOES_PADRAO, backends=("sqlite", "supabase_local"), proporcao_planos=20,
+             latencia_ms=LATENCIA_PADRAO_MS):
+    hoje = date.today()
+    resultado = {"versao": _versao(), "executado_em": datetime.now().isoformat(timespec="seconds"),
+                 "ambiente": {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                              "pandas": pd.__version__, "plataforma": platform.platform()},
+                 "repeticoes": repeticoes, "volumes": {}}
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in volumes:
+            n_planos = max(10, n // proporcao_planos)
+            medidas = {"cortes": n, "planos": n_planos}
+            if "sqlite" in backends:
+                inicio = time.perf_counter()
+                carregar_sqlite(os.path.join(pasta, f"sqlite_{n}.db"), n, n_planos, hoje)
+                medidas["carga_sqlite_s"] = round(time.perf_counter() - inicio, 2)
+                medidas["sqlite"] = medir_sqlite(hoje, repeticoes)
+                medidas["preparo"] = medir_preparo(hoje, repeticoes)
+            if "supabase_local" in backends:
+                inicio = time.perf_counter()
+                cliente = carregar_supabase_local(os.path.join(pasta, f"supabase_{n}.db"), n, n_planos, hoje)
+                medidas["carga_supabase_local_s"] = round(time.perf_counter() - inicio, 2)
+                medidas["supabase_local"] = medir_supabase_local(cliente, hoje, repeticoes)
+                cliente._db.close()
+            if "arquivamento" in backends:
+                medidas["arquivamento"] = medir_arquivamento(os.path.join(pasta, f"arquivamento_{n}.db"), n,
+                                                             repeticoes, hoje)
+            resultado["volumes"][str(n)] = medidas
+        if "sincronizacao" in backends:
+            resultado["sincronizacao"] = medir_sincronizacao(os.path.join(pasta, "sincronizacao.db"),
+                                                             latencia_ms, repeticoes, hoje)
+        # Solta o arquivo temporário antes de a pasta ser apagada
+        banco.get_pool.clear()
+        banco.get_cache.clear()
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das consultas do painel com dados sintéticos.")
+    parser.add_argument("--volumes", type=int, nargs="+", default=VOLUMES_PADRAO, help="quantidades de cortes")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES_PADRAO)
+    parser.add_argument("--backends", nargs="+", choices=["sqlite", "supabase_local", "sincronizacao", "arquivamento"],
+                        default=["sqlite", "supabase_local"])
+    parser.add_argument("--proporcao-planos", type=int, default=20, help="um plano a cada N cortes")
+    parser.add_argument("--latencia", type=float, default=LATENCIA_PADRAO_MS,
+                        help="sincronizacao: ms de ida e volta simulados por requisição")
+    parser.add_argument("--saida", help="arquivo JSON (padrão: imprime na tela)")
+    args = parser.parse_args()
+
+    relatorio = json.dumps(executar(args.volumes, args.repeticoes, args.backends, args.proporcao_planos,
+                                    args.latencia),
+                           indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(relatorio)
+    else:
+        print(relatorio)
@@ -0,0 +1,254 @@
+"""Cadastro de clientes em memória: busca por prefixo e por semelhança, e situação do plano.
+
+A tabela clientes (migração 7) é montada pelos triggers a partir dos nomes
+de cortes e planos, pela chave canônica regras.chave_nome. Um
+IndiceClientes por processo guarda o cadastro inteiro em memória:
+
+  nomes       lista ordenada de (chave, id): quem começa pelo texto digitado
+              é uma faixa contínua, achada por busca binária;
+  palavras    lista ordenada de (palavra, tamanho, chave, id), para "silva"
+              achar "João Silva" (já na ordem das sugestões dentro de cada palavra);
+  trigramas   trigrama -> palavras do vocabulário, para achar a palavra mesmo
+              com erro de digitação (mesma medida do pg_trgm, palavra a palavra);
+  planos      id -> (status, vencimento) do plano mais recente do cliente.
+
+Nomes se repetem muito (Silva, Santos, João...): o vocabulário é bem menor
+que o cadastro, então a busca aproximada percorre palavras, não clientes.
+Como a fila, o índice se mantém atualizado pelo registro de alterações do
+banco. Com dezenas de milhares de clientes a busca custa poucos milissegundos.
+"""
+import bisect
+import heapq
+import math
+import threading
+from operator import itemgetter
+from datetime import date
+
+import streamlit as st
+
+from banco import get_pool, ultima_alteracao, alteracoes_desde
+from metricas import medir
+from regras import chave_nome, situacao_plano
+
+TAMANHO_MINIMO_BUSCA = 2   # caracteres digitados antes de sugerir nomes
+LIMITE_SUGESTOES = 6
+SEMELHANCA_MINIMA = 0.3    # o limite padrão do pg_trgm
+
+
+def trigramas(chave):
+    """Trigramas de cada palavra, com dois espaços antes e um depois (como o pg_trgm)."""
+    conjunto = set()
+    for palavra in chave.split():
+        texto = f"  {palavra} "
+        conjunto.update(texto[i:i + 3] for i in range(len(texto) - 2))
+    return frozenset(conjunto)
+
+
+class IndiceClientes:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.recarregar()
+
+    # --- CARGA ---
+    def recarregar(self):
+        with self._lock:
+            self._recarregar()
+
+    def _recarregar(self):
+        self.seq = ultima_alteracao()
+        self.nomes, self.chaves, self.por_chave = {}, {}, {}
+        self._nomes = []          # (chave, id), ordenada
+        self._palavras = []       # (palavra, tamanho do nome, chave, id), ordenada
+        self._vocabulario = {}    # palavra -> quantos clientes a usam
+        self._trigramas = {}      # trigrama -> set(palavras)
+        with get_pool().conexao() as conn, medir("sqlite", "indice_clientes: carga"):
+            linhas = conn.execute("SELECT id, nome, chave FROM clientes").fetchall()
+        for id_cliente, nome, chave in linhas:
+            self._adicionar(id_cliente, nome, chave, ordenar=False)
+        self._nomes.sort()
+        self._palavras.sort()
+        self.planos = self._ler_planos()
+
+    def _ler_planos(self):
+        # Em ordem de vencimento: o último plano de cada cliente é o que vale
+        with get_pool().conexao() as conn:
+            return {id_cliente: (status, date.fromisoformat(vencimento))
+                    for id_cliente, status, vencimento in conn.execute(
+                        "SELECT cliente_id, status, vencimento FROM planos "
+                        "WHERE excluido = 0 AND cliente_id IS NOT NULL AND vencimento IS NOT NULL "
+                        "ORDER BY cliente_id, vencimento, id")}
+
+    # --- ESTRUTURA EM MEMÓRIA ---
+    def _adicionar(self, id_cliente, nome, chave, ordenar=True):
+        self.nomes[id_cliente] = nome
+        self.chaves[id_cliente] = chave
+        self.por_chave[chave] = id_cliente
+        inserir = bisect.insort if ordenar else list.append
+        inserir(self._nomes, (chave, id_cliente))
+        for palavra in set(chave.split()):
+            inserir(self._palavras, (palavra, len(chave), chave, id_cliente))
+            if palavra not in self._vocabulario:
+                self._vocabulario[palavra] = 0
+                for tri in trigramas(palavra):
+                    self._trigramas.setdefault(tri, set()).add(palavra)
+            self._vocabulario[palavra] += 1
+
+    def _remover(self, id_cliente):
+        chave = self.chaves.pop(id_cliente, None)
+        if chave is None:
+            return
+        del self.nomes[id_cliente]
+        if self.por_chave.get(chave) == id_cliente:
+            del self.por_chave[chave]
+        _descartar(self._nomes, (chave, id_cliente))
+        for palavra in set(chave.split()):
+            _descartar(self._palavras, (palavra, len(chave), chave, id_cliente))
+            self._vocabulario[palavra] -= 1
+            if not self._vocabulario[palavra]:
+                del self._vocabulario[palavra]
+                for tri in trigramas(palavra):
+                    self._trigramas[tri].discard(palavra)
+
+    # --- ATUALIZAÇÃO PELO REGISTRO DE ALTERAÇÕES ---
+    def atualizar(self):
+        with self._lock:
+            seq = self.seq
+            self.seq, ids = alteracoes_desde("clientes", seq)
+            _, ids_planos = alteracoes_desde("planos", seq)
+            if ids is None or ids_planos is None:
+                self._recarregar()
+                return
+            if ids:
+                marcadores = ",".join("?" * len(ids))
+                with get_pool().conexao() as conn:
+                    linhas = conn.execute(f"SELECT id, nome, chave FROM clientes WHERE id IN ({marcadores})",
+                                          tuple(ids)).fetchall()
+                for id_cliente, nome, chave in linhas:
+                    self._remover(id_cliente)
+                    self._adicionar(id_cliente, nome, chave)
+            if ids_planos:
+                # planos é pequena (uma linha por mensalista): relê o resumo inteiro
+                self.planos = self._ler_planos()
+
+    # --- CONSULTAS ---
+    def id_por_nome(self, nome):
+        """id do cliente com exatamente este nome (ignorando acentos e maiúsculas), ou None."""
+        self.atualizar()
+        return self.por_chave.get(chave_nome(nome))
+
+    def nome(self, id_cliente):
+        return self.nomes.get(id_cliente)
+
+    def plano(self, id_cliente, hoje=None):
+        """(situação, vencimento) do plano mais recente do cliente, ou None. Não consulta o banco."""
+        plano = self.planos.get(id_cliente)
+        if plano is None:
+            return None
+        status, vencimento = plano
+        return situacao_plano(status, vencimento, hoje or date.today()), vencimento
+
+    def buscar(self, texto, limite=LIMITE_SUGESTOES):
+        """ids dos clientes para sugerir enquanto texto é digitado, dos mais aos menos parecidos.
+
+        Primeiro quem começa pelo texto, depois quem tem palavras começando por
+        cada palavra digitada e, se ainda faltar, quem tem palavras parecidas.
+        """
+        consulta = chave_nome(texto)
+        if len(consulta) < TAMANHO_MINIMO_BUSCA:
+            return []
+        self.atualizar()
+        with self._lock, medir("memoria", "indice_clientes: buscar"):
+            inicio, fim = _faixa(self._nomes, consulta)
+            encontrados = [id_cliente for _, id_cliente in self._nomes[inicio:min(fim, inicio + limite)]]
+            for etapa in (self._buscar_palavras, self._buscar_semelhantes):
+                if len(encontrados) >= limite:
+                    break
+                vistos = set(encontrados)
+                encontrados += etapa(consulta, limite - len(encontrados), vistos)
+            return encontrados
+
+    def _clientes_com(self, palavras, prefixo):
+        """ids dos clientes com alguma destas palavras (ou palavra que comece por elas)."""
+        ids = set()
+        for palavra in palavras:
+            inicio, fim = _faixa(self._palavras, palavra) if prefixo else _exata(self._palavras, palavra)
+            ids.update(entrada[-1] for entrada in self._palavras[inicio:fim])
+        return ids
+
+    def _combinar(self, conjuntos, limite, vistos):
+        # Intersecção começando pelo menor conjunto; os mais curtos primeiro entre os que sobram
+        conjuntos = sorted(conjuntos, key=len)
+        ids = conjuntos[0].difference(vistos).intersection(*conjuntos[1:])
+        return heapq.nsmallest(limite, ids, key=lambda id_cliente: (len(self.chaves[id_cliente]),
+                                                                     self.chaves[id_cliente]))
+
+    def _buscar_palavras(self, consulta, limite, vistos):
+        palavras = set(consulta.split())
+        if len(palavras) > 1:
+            return self._combinar([self._clientes_com([palavra], prefixo=True) for palavra in palavras],
+                                  limite, vistos)
+        # Uma palavra só (pode ser um sobrenome comum em milhares de clientes): dentro da faixa de
+        # cada palavra as entradas já estão em ordem de (tamanho, chave), então basta intercalar
+        # as faixas e parar nos primeiros, sem montar conjuntos
+        inicio, fim = _faixa(self._palavras, palavras.pop())
+        faixas = []
+        while inicio < fim:
+            proxima = _exata(self._palavras, self._palavras[inicio][0])[1]
+            faixas.append(map(self._palavras.__getitem__, range(inicio, proxima)))
+            inicio = proxima
+        encontrados = []
+        for *_, id_cliente in heapq.merge(*faixas, key=itemgetter(1, 2)):
+            if id_cliente not in vistos:
+                vistos.add(id_cliente)
+                encontrados.append(id_cliente)
+                if len(encontrados) == limite:
+                    break
+        return encontrados
+
+    def _buscar_semelhantes(self, consulta, limite, vistos):
+        conjuntos = []
+        for palavra in set(consulta.split()):
+            parecidas = self._palavras_semelhantes(palavra)
+            if not parecidas:
+                return []
+            conjuntos.append(self._clientes_com(parecidas, prefixo=False))
+        return self._combinar(conjuntos, limite, vistos)
+
+    def _palavras_semelhantes(self, palavra):
+        """Palavras do vocabulário com semelhança de trigramas >= SEMELHANCA_MINIMA."""
+        tris = trigramas(palavra)
+        # Semelhança >= SEMELHANCA_MINIMA exige ao menos `minimo` trigramas em comum, então toda
+        # palavra parecida aparece em pelo menos um dos (len - minimo + 1) trigramas mais raros
+        minimo = max(1, math.ceil(SEMELHANCA_MINIMA * len(tris)))
+        raros = sorted(tris, key=lambda tri: len(self._trigramas.get(tri, ())))[:len(tris) - minimo + 1]
+        candidatas = set().union(*(self._trigramas.get(tri, ()) for tri in raros))
+        parecidas = []
+        for candidata in candidatas:
+            tris_candidata = trigramas(candidata)
+            comuns = len(tris & tris_candidata)
+            if comuns / (len(tris) + len(tris_candidata) - comuns) >= SEMELHANCA_MINIMA:
+                parecidas.append(candidata)
+        return parecidas
+
+
+def _faixa(lista, prefixo):
+    """Posições de lista (ordenada, de tuplas que começam pelo texto) cujo texto começa com prefixo."""
+    return (bisect.bisect_left(lista, (prefixo,)),
+            bisect.bisect_left(lista, (prefixo + "\U0010ffff",)))
+
+
+def _exata(lista, texto):
+    # (texto,) < (texto, ...) < (texto + "\0",)
+    return bisect.bisect_left(lista, (texto,)), bisect.bisect_left(lista, (texto + "\0",))
+
+
+def _descartar(lista, item):
+    posicao = bisect.bisect_left(lista, item)
+    if posicao < len(lista) and lista[posicao] == item:
+        del lista[posicao]
+
+
+# Um índice por processo, compartilhado por todas as sessões
+@st.cache_resource
+def get_indice_clientes():
+    return IndiceClientes()
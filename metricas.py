@@ -0,0 +1,241 @@
+"""Instrumentação dos caminhos quentes: consultas, chamadas ao Supabase e seções do painel.
+
+Cada medida cai numa série (categoria, nome) com contagem, histograma de
+latência, linhas e bytes. Categorias usadas no sistema:
+  sqlite    consultas no banco local (nome = SQL)
+  supabase  chamadas .execute() ao Supabase
+  preparo   conversões de DataFrame antes de desenhar
+  memoria   buscas nos índices em memória (clientes.py)
+  secao     seção inteira do painel (consultas + preparo + widgets)
+
+Desligada (o padrão), medir() devolve sempre o mesmo objeto vazio: o custo
+por chamada é um teste de booleano. Para ligar, use a página de diagnóstico
+(app.py?diagnostico=1) ou as variáveis de ambiente. A chave é do processo,
+não da sessão: ligar ou desligar na página vale para todos os tablets e abas
+servidos pelo mesmo Streamlit.
+    BARBEARIA_METRICAS=1                       liga desde a partida
+    BARBEARIA_METRICAS_ARQUIVO=metricas.jsonl  liga e grava um resumo por minuto
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Limites superiores dos baldes do histograma, em ms (o último balde é "acima de 5 s")
+LIMITES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+INTERVALO_LOG = 60  # segundos entre as linhas do arquivo de métricas
+TAMANHO_NOME = 120  # SQL longo é cortado no nome da série
+
+
+class Serie:
+    __slots__ = ("chamadas", "total_ms", "maximo_ms", "linhas", "bytes", "baldes")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.total_ms = 0.0
+        self.maximo_ms = 0.0
+        self.linhas = 0
+        self.bytes = 0
+        self.baldes = [0] * (len(LIMITES_MS) + 1)
+
+    def percentil(self, fracao):
+        """Limite superior do balde onde cai o percentil (aproximação do histograma)."""
+        alvo, acumulado = fracao * self.chamadas, 0
+        for limite, quantidade in zip(LIMITES_MS + (self.maximo_ms,), self.baldes):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return min(limite, self.maximo_ms)
+        return self.maximo_ms
+
+
+class Coletor:
+    """Séries de medidas do processo, compartilhadas por todas as sessões."""
+
+    def __init__(self, ativo=False):
+        self.ativo = ativo
+        self.desde = datetime.now()
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, categoria, nome, ms, linhas=None, tamanho=None):
+        chave = (categoria, " ".join(str(nome).split())[:TAMANHO_NOME])
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = Serie()
+            serie.chamadas += 1
+            serie.total_ms += ms
+            serie.maximo_ms = max(serie.maximo_ms, ms)
+            serie.linhas += linhas or 0
+            serie.bytes += tamanho or 0
+            serie.baldes[bisect.bisect_left(LIMITES_MS, ms)] += 1
+
+    def zerar(self):
+        with self._lock:
+            self._series.clear()
+            self.desde = datetime.now()
+
+    def resumo(self):
+        """Uma linha por série, da que mais tempo consumiu para a que menos consumiu."""
+        with self._lock:
+            linhas = [{"categoria": categoria, "nome": nome, "chamadas": s.chamadas,
+                       "total_ms": round(s.total_ms, 3), "media_ms": round(s.total_ms / s.chamadas, 3),
+                       "p50_ms": s.percentil(0.5), "p95_ms": s.percentil(0.95),
+                       "maximo_ms": round(s.maximo_ms, 3), "linhas": s.linhas, "bytes": s.bytes,
+                       "baldes": list(s.baldes)}
+                      for (categoria, nome), s in self._series.items()]
+        return sorted(linhas, key=lambda linha: linha["total_ms"], reverse=True)
+
+    def prometheus(self):
+        """Séries no formato texto do Prometheus (para o textfile collector ou um scraper)."""
+        saida = ["# TYPE barbearia_latencia_ms histogram"]
+        for linha in self.resumo():
+            rotulos = f'categoria="{linha["categoria"]}",nome="{_escapar(linha["nome"])}"'
+            acumulado = 0
+            for limite, quantidade in zip(LIMITES_MS, linha["baldes"]):
+                acumulado += quantidade
+                saida.append(f'barbearia_latencia_ms_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+            saida.append(f'barbearia_latencia_ms_bucket{{{rotulos},le="+Inf"}} {linha["chamadas"]}')
+            saida.append(f"barbearia_latencia_ms_sum{{{rotulos}}} {linha['total_ms']}")
+            saida.append(f"barbearia_latencia_ms_count{{{rotulos}}} {linha['chamadas']}")
+            saida.append(f"barbearia_linhas_total{{{rotulos}}} {linha['linhas']}")
+            saida.append(f"barbearia_bytes_total{{{rotulos}}} {linha['bytes']}")
+        return "\n".join(saida) + "\n"
+
+    def gravar_continuamente(self, caminho, intervalo=INTERVALO_LOG):
+        def gravar():
+            while True:
+                time.sleep(intervalo)
+                with open(caminho, "a", encoding="utf-8") as arquivo:
+                    arquivo.write(json.dumps({"instante": datetime.now().isoformat(timespec="seconds"),
+                                              "series": self.resumo()}, ensure_ascii=False) + "\n")
+        threading.Thread(target=gravar, name="metricas", daemon=True).start()
+
+
+def _escapar(texto):
+    return texto.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _tamanho(resultado):
+    """(linhas, bytes) de um resultado: DataFrame, resposta do Supabase, lista ou rowcount."""
+    if isinstance(resultado, pd.DataFrame):
+        return len(resultado), int(resultado.memory_usage(deep=True, index=False).sum())
+    dados = getattr(resultado, "data", resultado)
+    if isinstance(dados, list):
+        return len(dados), len(json.dumps(dados, default=str))
+    if isinstance(dados, int):
+        return max(dados, 0), None
+    return None, None
+
+
+# Módulo-global em vez de st.cache_resource: medir() roda em toda consulta e
+# precisa custar só a leitura de um atributo quando está desligado
+COLETOR = Coletor(ativo=os.environ.get("BARBEARIA_METRICAS") == "1")
+if os.environ.get("BARBEARIA_METRICAS_ARQUIVO"):
+    COLETOR.ativo = True
+    COLETOR.gravar_continuamente(os.environ["BARBEARIA_METRICAS_ARQUIVO"])
+
+
+class Medida:
+    __slots__ = ("categoria", "nome", "inicio", "_resultado")
+
+    def __init__(self, categoria, nome):
+        self.categoria = categoria
+        self.nome = nome
+        self._resultado = None
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def resultado(self, valor):
+        """Guarda o resultado; linhas e bytes só são calculados depois de parar o relógio."""
+        self._resultado = valor
+
+    def __exit__(self, *erro):
+        ms = (time.perf_counter() - self.inicio) * 1000
+        linhas, tamanho = _tamanho(self._resultado) if self._resultado is not None else (None, None)
+        COLETOR.registrar(self.categoria, self.nome, ms, linhas, tamanho)
+        return False
+
+
+class _MedidaDesligada:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def resultado(self, valor):
+        pass
+
+    def __exit__(self, *erro):
+        return False
+
+
+_DESLIGADA = _MedidaDesligada()
+
+
+def medir(categoria, nome):
+    """Context manager que cronometra o bloco: with medir("sqlite", sql) as medida: ..."""
+    return Medida(categoria, nome) if COLETOR.ativo else _DESLIGADA
+
+
+def medir_secao(nome):
+    """Decorator para as seções do painel (aplicar por baixo do @st.fragment)."""
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not COLETOR.ativo:
+                return funcao(*args, **kwargs)
+            with Medida("secao", nome):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorar
+
+
+# --- PÁGINA DE DIAGNÓSTICO (oculta; aparece no menu com ?diagnostico=1 na URL) ---
+def pagina_diagnostico():
+    st.title("🩺 Diagnóstico")
+    COLETOR.ativo = st.toggle("Coletar métricas (todas as sessões)", value=COLETOR.ativo,
+                              help="Liga e desliga a coleta do processo inteiro, não só desta aba: "
+                                   "vale para todos os tablets conectados. Desligado, o custo por "
+                                   "consulta é desprezível.")
+    st.caption(f"Coletando desde {COLETOR.desde:%d/%m %H:%M:%S}.")
+
+    resumo = COLETOR.resumo()
+    if not resumo:
+        st.info("Nenhuma medida ainda. Ligue a coleta e use o painel normalmente.")
+        return
+
+    df = pd.DataFrame(resumo)
+    categorias = st.pills("Categoria", sorted(df["categoria"].unique()), selection_mode="multi",
+                          default=sorted(df["categoria"].unique()), key="diagnostico_categorias")
+    df = df[df["categoria"].isin(categorias)].reset_index(drop=True)
+    if df.empty:
+        st.info("Nenhuma categoria selecionada.")
+        return
+    evento = st.dataframe(
+        df.drop(columns="baldes"), hide_index=True, on_select="rerun", selection_mode="single-row",
+        key="diagnostico_series", width="stretch",
+        column_config={"nome": st.column_config.TextColumn("Nome", width="large"),
+                       "bytes": st.column_config.NumberColumn("Bytes", format="compact")})
+
+    # Histograma da série selecionada (ou da que mais consumiu tempo)
+    linha = df.iloc[evento.selection.rows[0] if evento.selection.rows else 0]
+    st.caption(f"Histograma de latência: {linha['categoria']} · {linha['nome']}")
+    rotulos = [f"≤ {limite} ms" for limite in LIMITES_MS] + [f"> {LIMITES_MS[-1]} ms"]
+    st.bar_chart(pd.DataFrame({"chamadas": linha["baldes"]}, index=pd.Index(rotulos, name="latência")),
+                 sort=False)
+
+    c1, c2, c3 = st.columns(3)
+    c1.download_button("⬇️ Prometheus", COLETOR.prometheus(), file_name="metricas.prom",
+                       mime="text/plain", on_click="ignore", width="stretch")
+    c2.download_button("⬇️ JSON", json.dumps(resumo, ensure_ascii=False, indent=2), file_name="metricas.json",
+                       mime="application/json", on_click="ignore", width="stretch")
+    c3.button("Zerar métricas", on_click=COLETOR.zerar, width="stretch")
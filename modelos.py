@@ -0,0 +1,42 @@
+"""Registros tipados lidos do banco local.
+
+As telas que percorrem linha a linha (a fila) recebem tuplas nomeadas em vez
+de DataFrames: só as colunas que usam, com as datas já convertidas uma vez
+na leitura. DataFrame fica para o que é tabela de verdade (planos, extrato,
+relatórios).
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+class Corte(NamedTuple):
+    id: int
+    cliente: str
+    chegada: Optional[datetime]
+    saida: Optional[datetime]
+    pago: bool
+    valor: Optional[float]
+    barbeiro: str
+    inicio: Optional[datetime]  # chamado para a cadeira (None = aguardando)
+    cliente_id: Optional[int]   # cadastro em clientes (ver clientes.py)
+
+
+# Projeção usada nas consultas de cortes, na ordem dos campos de Corte
+COLUNAS_CORTE = ", ".join(Corte._fields)
+
+
+def _instante(texto):
+    # Formato gravado pelo sistema: 'YYYY-MM-DD HH:MM:SS' (hora local, sem fuso)
+    return datetime.fromisoformat(texto) if texto else None
+
+
+def corte(_cursor, linha):
+    """row_factory do sqlite3: converte a linha em Corte na própria leitura."""
+    id_corte, cliente, chegada, saida, pago, valor, barbeiro, inicio, cliente_id = linha
+    return Corte(id_corte, cliente, _instante(chegada), _instante(saida), bool(pago), valor, barbeiro,
+                 _instante(inicio), cliente_id)
+
+
+def texto_instante(instante):
+    """Volta ao formato gravado no banco (para usar um Corte como parâmetro de consulta)."""
+    return instante.strftime("%Y-%m-%d %H:%M:%S")
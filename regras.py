@@ -0,0 +1,62 @@
+"""Regras de negócio da barbearia, sem dependência da interface."""
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# --- CLIENTES ---
+def chave_nome(nome):
+    """Forma canônica do nome: sem acentos, sem espaços repetidos, sem maiúsculas.
+
+    "João  da Silva" e "joao da silva" são o mesmo cliente. Também é registrada
+    como função SQL em cada conexão do banco (usada pelos triggers de clientes).
+    """
+    if nome is None:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", str(nome))
+    sem_acento = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acento.split()).casefold()
+
+
+# --- PLANOS MENSAIS ---
+DIAS_AVISO_VENCIMENTO = 3
+
+# Situações na ordem de urgência (é a ordem dos filtros na tela)
+SITUACOES_PLANO = ["ATRASADO", "Vence em Breve", "Ativo", "Cancelado"]
+CORES_SITUACAO = {"ATRASADO": "red", "Vence em Breve": "orange", "Ativo": "green", "Cancelado": "gray"}
+
+
+def classificar_planos(df_planos, hoje):
+    """Acrescenta dias_restantes, situacao e cor a todos os planos de uma vez.
+
+    Planos ativos viram ATRASADO (vencidos), Vence em Breve (até
+    DIAS_AVISO_VENCIMENTO dias) ou Ativo; os demais mantêm o próprio status,
+    em cinza.
+    """
+    vencimento = pd.to_datetime(df_planos["vencimento"], errors="coerce")
+    dias_restantes = (vencimento - pd.Timestamp(hoje)).dt.days
+    ativo = df_planos["status"].eq("Ativo").to_numpy()
+    condicoes = [ativo & (dias_restantes < 0).to_numpy(),
+                 ativo & (dias_restantes <= DIAS_AVISO_VENCIMENTO).to_numpy(),
+                 ativo]
+    situacao = np.select(condicoes, ["ATRASADO", "Vence em Breve", "Ativo"],
+                         default=df_planos["status"].astype(object).to_numpy())
+    cor = np.select(condicoes, ["red", "orange", "green"], default="gray")
+    return df_planos.assign(vencimento=vencimento, dias_restantes=dias_restantes,
+                            situacao=situacao, cor=cor)
+
+
+def ordenar_situacoes(situacoes):
+    """As situações presentes na ordem de SITUACOES_PLANO; status fora da lista vêm depois, em ordem alfabética."""
+    presentes = set(situacoes)
+    return [s for s in SITUACOES_PLANO if s in presentes] + sorted(presentes.difference(SITUACOES_PLANO))
+
+
+def situacao_plano(status, vencimento, hoje):
+    """A mesma classificação de classificar_planos, para um plano só (vencimento como date)."""
+    if status != "Ativo":
+        return status
+    dias_restantes = (vencimento - hoje).days
+    if dias_restantes < 0:
+        return "ATRASADO"
+    return "Vence em Breve" if dias_restantes <= DIAS_AVISO_VENCIMENTO else "Ativo"
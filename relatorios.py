@@ -0,0 +1,198 @@
+"""Relatórios do Financeiro para qualquer período: séries, ocupação, tempo de atendimento e fiado.
+
+Tudo sai de consultas parametrizadas e agregadas no próprio SQLite:
+  - séries, totais e tempo médio: resumo_diario (uma linha por dia e barbeiro,
+    mantida pelos triggers), agrupado por dia, semana ou mês;
+  - ocupação por hora: cortes pelo índice de chegada (idx_cortes_chegada),
+    sem ler as outras colunas, mais as partições arquivadas que o período
+    alcançar (banco.fonte_cortes);
+  - a receber: o total sai de resumo_diario.a_receber (finalizados e não
+    pagos); a lista, de cortes pelo índice (pago, chegada, valor) com o mesmo
+    filtro. Fiado nunca é arquivado, então só a tabela quente é lida.
+Um ano inteiro são poucas centenas de linhas do resumo e uma varredura do
+índice; as consultas passam pelo cache de banco.run_query.
+"""
+from typing import NamedTuple, Optional
+
+import pandas as pd
+import streamlit as st
+
+from banco import run_query, fonte_cortes
+from metricas import medir
+
+# Expressão SQL do começo de cada período, a partir de resumo_diario.dia ('YYYY-MM-DD')
+AGRUPAMENTOS = {
+    "dia": "dia",
+    # Semana começando na segunda-feira (strftime('%w'): domingo = 0)
+    "semana": "date(dia, '-' || ((CAST(strftime('%w', dia) AS INTEGER) + 6) % 7) || ' days')",
+    "mes": "strftime('%Y-%m-01', dia)",
+}
+ROTULOS_AGRUPAMENTO = {"dia": "Dia", "semana": "Semana", "mes": "Mês"}
+DIAS_SEMANA = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+LIMITE_A_RECEBER = 200  # linhas do fiado na tela
+
+
+def _periodo(inicio, fim):
+    # Colunas DATETIME têm afinidade NUMERIC: compara sempre com datas completas
+    return inicio.isoformat(), fim.isoformat()
+
+
+def serie(inicio, fim, agrupamento="dia"):
+    """Cortes, faturado, recebido, a receber, ticket e tempo médio por período (inicio <= dia < fim)."""
+    df = run_query(f"""SELECT {AGRUPAMENTOS[agrupamento]} AS periodo,
+                              SUM(cortes) AS cortes, SUM(finalizados) AS finalizados,
+                              SUM(faturado) AS faturado, SUM(recebido) AS recebido,
+                              SUM(a_receber) AS a_receber, SUM(minutos) AS minutos, SUM(medidos) AS medidos
+                       FROM resumo_diario WHERE dia >= ? AND dia < ?
+                       GROUP BY periodo ORDER BY periodo""",
+                   _periodo(inicio, fim), return_data=True)
+    with medir("preparo", "relatorios: serie"):
+        return _derivadas(df.assign(periodo=pd.to_datetime(df["periodo"])))
+
+
+def por_barbeiro(inicio, fim):
+    """Os mesmos indicadores da série, um por barbeiro, do que mais faturou ao que menos faturou."""
+    df = run_query("""SELECT barbeiro, SUM(cortes) AS cortes, SUM(finalizados) AS finalizados,
+                             SUM(faturado) AS faturado, SUM(recebido) AS recebido,
+                             SUM(a_receber) AS a_receber, SUM(minutos) AS minutos, SUM(medidos) AS medidos
+                      FROM resumo_diario WHERE dia >= ? AND dia < ?
+                      GROUP BY barbeiro ORDER BY faturado DESC""",
+                   _periodo(inicio, fim), return_data=True)
+    return _derivadas(df.assign(barbeiro=df["barbeiro"].replace("", "(sem barbeiro)")))
+
+
+def _derivadas(df):
+    # Colunas calculadas de uma vez sobre o DataFrame inteiro (sem laço por linha)
+    medidos = df["medidos"].where(df["medidos"] > 0)
+    return df.assign(ticket_medio=(df["recebido"] / df["cortes"].where(df["cortes"] > 0)).fillna(0.0),
+                     minutos_medios=df["minutos"] / medidos).drop(columns=["minutos", "medidos"])
+
+
+def tempo_medio(inicio, fim):
+    """Minutos médios entre chegada e saída no período (None se nenhum atendimento foi medido)."""
+    df = run_query("SELECT SUM(minutos) AS minutos, SUM(medidos) AS medidos FROM resumo_diario "
+                   "WHERE dia >= ? AND dia < ?", _periodo(inicio, fim), return_data=True)
+    minutos, medidos = df.iloc[0]
+    return minutos / medidos if pd.notna(medidos) and medidos > 0 else None
+
+
+def ocupacao_por_hora(inicio, fim):
+    """Média de chegadas por dia da semana (linhas, Seg a Dom) e hora (colunas) no período.
+
+    A média é sobre os dias com movimento: um feriado fechado não puxa a média do dia para baixo.
+    """
+    df = run_query(f"""SELECT (CAST(strftime('%w', chegada) AS INTEGER) + 6) % 7 AS dia_semana,
+                             CAST(strftime('%H', chegada) AS INTEGER) AS hora,
+                             COUNT(*) AS chegadas, COUNT(DISTINCT date(chegada)) AS dias
+                      FROM {fonte_cortes(inicio, fim, "chegada")} WHERE chegada >= ? AND chegada < ?
+                      GROUP BY dia_semana, hora""",
+                   _periodo(inicio, fim), return_data=True)
+    if df.empty:
+        return pd.DataFrame(index=pd.Index(DIAS_SEMANA, name="dia_semana"))
+    with medir("preparo", "relatorios: ocupacao"):
+        # Dias abertos de cada dia da semana (o maior número de dias entre as horas)
+        dias_abertos = df.groupby("dia_semana")["dias"].transform("max")
+        mapa = (df.assign(media=df["chegadas"] / dias_abertos)
+                .pivot(index="dia_semana", columns="hora", values="media")
+                .reindex(index=range(7), columns=range(df["hora"].min(), df["hora"].max() + 1))
+                .fillna(0.0))
+        mapa.index = pd.Index(DIAS_SEMANA, name="dia_semana")
+        return mapa
+
+
+def a_receber(inicio, fim, limite=LIMITE_A_RECEBER):
+    """Atendimentos finalizados e não pagos do período, dos mais antigos (mais atrasados) aos mais novos."""
+    return run_query("""SELECT id, cliente, chegada, barbeiro, valor FROM cortes
+                        WHERE pago = 0 AND chegada >= ? AND chegada < ? AND saida IS NOT NULL
+                        ORDER BY chegada LIMIT ?""",
+                     (*_periodo(inicio, fim), limite), return_data=True)
+
+
+class Painel(NamedTuple):
+    serie: pd.DataFrame
+    por_barbeiro: pd.DataFrame
+    ocupacao: pd.DataFrame
+    a_receber: pd.DataFrame
+    tempo_medio: Optional[float]
+
+    @classmethod
+    def carregar(cls, inicio, fim, agrupamento="dia"):
+        """Todas as consultas do painel do período, uma depois da outra.
+
+        Em threads não ficam mais rápidas: o tempo vai quase todo para o pandas,
+        que segura o GIL.
+        """
+        return cls(serie(inicio, fim, agrupamento), por_barbeiro(inicio, fim), ocupacao_por_hora(inicio, fim),
+                   a_receber(inicio, fim), tempo_medio(inicio, fim))
+
+
+def agrupamento_sugerido(inicio, fim):
+    """Até 2 meses por dia, até 6 meses por semana, acima disso por mês."""
+    dias = (fim - inicio).days
+    return "dia" if dias <= 62 else "semana" if dias <= 186 else "mes"
+
+
+# --- TELA (seção Análise do Período do Financeiro, no app.py e no barber.py) ---
+def grafico_ocupacao(ocupacao):
+    """Mapa de calor dia da semana x hora (st.vega_lite_chart, sem dependências a mais)."""
+    dados = ocupacao.rename_axis(columns="hora").stack().rename("media").reset_index()
+    st.vega_lite_chart(dados, {
+        "mark": {"type": "rect", "tooltip": True},
+        "encoding": {
+            "x": {"field": "hora", "type": "ordinal", "title": "Hora"},
+            "y": {"field": "dia_semana", "type": "ordinal", "title": None, "sort": DIAS_SEMANA},
+            "color": {"field": "media", "type": "quantitative", "title": "Chegadas/dia",
+                      "scale": {"scheme": "oranges"}},
+        },
+    }, width="stretch")
+
+
+def secao_analise(inicio, fim):
+    """Análise do período escolhido; roda dentro do fragmento do Financeiro de quem chama."""
+    st.subheader("Análise do Período")
+    agrupamento = st.segmented_control("Agrupar por", list(ROTULOS_AGRUPAMENTO),
+                                       format_func=ROTULOS_AGRUPAMENTO.get, key="agrupamento_financeiro",
+                                       default=agrupamento_sugerido(inicio, fim)) or agrupamento_sugerido(inicio, fim)
+    painel = Painel.carregar(inicio, fim, agrupamento)
+
+    a1, a2 = st.columns(2)
+    a1.metric("A Receber", f"R$ {painel.serie['a_receber'].sum():.2f}")
+    a2.metric("Tempo Médio de Atendimento",
+              f"{painel.tempo_medio:.0f} min" if painel.tempo_medio is not None else "—")
+
+    if not painel.serie.empty:
+        st.bar_chart(painel.serie.set_index("periodo")[["recebido", "a_receber"]],
+                     x_label=ROTULOS_AGRUPAMENTO[agrupamento], y_label="R$", stack=True)
+
+    st.markdown("**Por barbeiro**")
+    st.dataframe(painel.por_barbeiro, width="stretch", hide_index=True,
+                 column_config={
+                     "barbeiro": st.column_config.TextColumn("Barbeiro"),
+                     "cortes": st.column_config.NumberColumn("Cortes", format="%d"),
+                     "finalizados": st.column_config.NumberColumn("Finalizados", format="%d"),
+                     "faturado": st.column_config.NumberColumn("Faturado", format="R$ %.2f"),
+                     "recebido": st.column_config.NumberColumn("Recebido", format="R$ %.2f"),
+                     "a_receber": st.column_config.NumberColumn("A receber", format="R$ %.2f"),
+                     "ticket_medio": st.column_config.NumberColumn("Ticket médio", format="R$ %.2f"),
+                     "minutos_medios": st.column_config.NumberColumn("Minutos/corte", format="%.0f"),
+                 })
+
+    st.markdown("**Movimento por hora** (média de chegadas nos dias abertos)")
+    if painel.ocupacao.empty:
+        st.caption("Sem chegadas no período.")
+    else:
+        grafico_ocupacao(painel.ocupacao)
+
+    st.markdown("**Atendidos e não pagos**")
+    if painel.a_receber.empty:
+        st.caption("Nada a receber no período.")
+    else:
+        if len(painel.a_receber) == LIMITE_A_RECEBER:
+            st.caption(f"Mostrando os {LIMITE_A_RECEBER} mais antigos.")
+        st.dataframe(painel.a_receber.drop(columns=["id"]), width="stretch", hide_index=True,
+                     column_config={
+                         "cliente": st.column_config.TextColumn("Cliente"),
+                         "chegada": st.column_config.DatetimeColumn("Chegada", format="DD/MM/YYYY HH:mm"),
+                         "barbeiro": st.column_config.TextColumn("Barbeiro"),
+                         "valor": st.column_config.NumberColumn("Valor", format="R$ %.2f"),
+                     })
@@ -0,0 +1,254 @@
+"""Sincronização da réplica local (banco.py) com o Supabase.
+
+A interface só lê e grava no SQLite local. Uma thread por processo:
+  1. recebe do Supabase as linhas alteradas depois da última marca d'água
+     (updated_at, uid) e aplica na réplica;
+  2. envia as linhas locais marcadas como pendentes (upsert por uid).
+
+Conflitos: vence a alteração mais recente (updated_at). Uma linha local
+pendente só é sobrescrita se a versão remota for mais nova que ela.
+O push não envia updated_at: o trigger do Supabase grava o relógio do
+servidor em toda escrita, e a linha volta no pull seguinte com esse valor.
+Por isso a comparação junta o relógio do aparelho (alteração local) com o
+do servidor (versão remota) e supõe os dois acertados (NTP); um tablet
+adiantado ganha conflitos que deveria perder, um atrasado perde os seus.
+
+As tabelas são independentes: cada uma faz o próprio pull e push numa thread
+de um pool fixo, e o ciclo dura o tempo da tabela mais lenta, não a soma.
+As threads e o cliente HTTP (e suas conexões keep-alive) são reaproveitados
+entre os ciclos; cada requisição tem o tempo limite de TEMPO_LIMITE_REQUISICAO.
+
+Com o Realtime do Supabase ligado, cada alteração remota antecipa o próximo
+ciclo; o intervalo fixo fica só como rede de segurança. As linhas recebidas
+entram no registro de alterações local (banco.alteracoes_desde), que é o que
+atualiza a fila aberta no painel. Um corte que já foi arquivado na réplica
+(arquivamento.py) volta para a tabela quente antes de receber a alteração.
+
+Para testar sem rede, passe um supabase_local.ClienteSupabaseLocal como cliente
+(e o realtime dele em escutar_realtime).
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from arquivamento import desarquivar
+from banco import get_pool, get_cache
+from metricas import medir
+
+INTERVALO_SYNC = 15        # segundos entre ciclos (ou antes, se solicitar() for chamado)
+TAMANHO_LOTE_SYNC = 500
+# Relê um pouco antes da marca: transações do Supabase que terminaram depois
+# da última leitura podem ter updated_at anterior a ela
+MARGEM_MARCA = timedelta(seconds=60)
+MARCA_INICIAL = "1970-01-01T00:00:00+00:00"
+TEMPO_LIMITE_REQUISICAO = 10  # segundos por requisição ao Supabase (ver conectar() no app.py)
+
+# Colunas sincronizadas de cada tabela, além de uid e updated_at
+COLUNAS = {
+    "cortes": ["cliente", "chegada", "saida", "pago", "valor", "barbeiro", "inicio"],
+    "planos": ["cliente", "vencimento", "status", "obs", "excluido"],
+}
+COLUNAS_DATA_HORA = {"chegada", "saida", "inicio"}
+COLUNAS_BOOL = {"pago", "excluido"}
+
+
+def _instante(texto):
+    return datetime.fromisoformat(texto.replace("Z", "+00:00"))
+
+
+def _para_remoto(coluna, valor):
+    if valor is None:
+        return None
+    if coluna in COLUNAS_DATA_HORA:
+        # Local: hora local sem fuso ('YYYY-MM-DD HH:MM:SS'); Supabase: timestamptz
+        return datetime.strptime(valor, "%Y-%m-%d %H:%M:%S").astimezone().isoformat()
+    if coluna in COLUNAS_BOOL:
+        return bool(valor)
+    return valor
+
+
+def _para_local(coluna, valor):
+    if valor is None:
+        return None
+    if coluna in COLUNAS_DATA_HORA:
+        return _instante(valor).astimezone().strftime("%Y-%m-%d %H:%M:%S")
+    if coluna in COLUNAS_BOOL:
+        return int(valor)
+    return valor
+
+
+class Sincronizador:
+    """Mantém a réplica local e o Supabase convergindo, em segundo plano."""
+
+    def __init__(self, cliente, intervalo=INTERVALO_SYNC):
+        self.cliente = cliente
+        self.intervalo = intervalo
+        self.ultima_sincronizacao = None
+        self.ultimo_erro = None
+        self._acordar = threading.Event()
+        self._ciclo = threading.Lock()  # um ciclo por vez
+        # Uma thread por tabela, criadas uma vez e reaproveitadas a cada ciclo
+        self._executor = ThreadPoolExecutor(max_workers=len(COLUNAS), thread_name_prefix="sincronizacao")
+
+    def iniciar(self):
+        threading.Thread(target=self._sincronizar_continuamente, name="sincronizacao", daemon=True).start()
+        return self
+
+    def solicitar(self):
+        """Antecipa o próximo ciclo (chamado depois de uma escrita local)."""
+        self._acordar.set()
+
+    def escutar_realtime(self, url, chave, cliente_realtime=None):
+        """Assina as alterações de cortes/planos no Supabase numa thread com loop asyncio próprio.
+
+        cliente_realtime: classe no lugar do realtime.AsyncRealtimeClient
+        (supabase_local.ClienteSupabaseLocal.realtime para testar sem rede).
+        """
+        threading.Thread(target=lambda: asyncio.run(self._escutar(url, chave, cliente_realtime)),
+                         name="realtime", daemon=True).start()
+        return self
+
+    async def _escutar(self, url, chave, cliente_realtime=None):
+        if cliente_realtime is None:
+            from realtime import AsyncRealtimeClient as cliente_realtime
+
+        while True:
+            try:
+                cliente = cliente_realtime(f"{url.replace('http', 'ws', 1)}/realtime/v1", chave)
+                await cliente.connect()
+                canal = cliente.channel("barbearia")
+                for tabela in COLUNAS:
+                    # O conteúdo do evento não é usado: o pull por marca d'água traz as
+                    # linhas e resolve conflitos do mesmo jeito que no ciclo normal
+                    canal.on_postgres_changes("*", schema="public", table=tabela,
+                                              callback=lambda _evento: self.solicitar())
+                await canal.subscribe()
+                while cliente.is_connected:
+                    await asyncio.sleep(5)
+            except Exception as e:
+                self.ultimo_erro = f"Realtime: {e}"
+            await asyncio.sleep(self.intervalo)  # reconecta; enquanto isso, vale o ciclo fixo
+
+    def pendentes(self):
+        with get_pool().conexao() as conn, medir("sqlite", "pendentes"):
+            return sum(conn.execute(f"SELECT COUNT(*) FROM {tabela} WHERE pendente = 1").fetchone()[0]
+                       for tabela in COLUNAS)
+
+    def _sincronizar_continuamente(self):
+        while True:
+            try:
+                self.sincronizar()
+            except Exception as e:
+                # Sem internet ou Supabase fora do ar: a réplica continua atendendo
+                self.ultimo_erro = str(e)
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+
+    def sincronizar(self):
+        with self._ciclo:
+            # As tabelas ao mesmo tempo; espera todas antes de fechar o ciclo
+            feitos, _ = wait([self._executor.submit(self._sincronizar_tabela, tabela) for tabela in COLUNAS])
+            for feito in feitos:
+                feito.result()  # repassa o erro de qualquer tabela
+            self.ultima_sincronizacao = datetime.now()
+            self.ultimo_erro = None
+
+    def _sincronizar_tabela(self, tabela):
+        # Recebe antes de enviar: o conflito é resolvido localmente, e o que
+        # sobrar pendente é a versão vencedora
+        self._receber(tabela)
+        self._enviar(tabela)
+
+    # --- PULL ---
+    def _receber(self, tabela):
+        colunas = COLUNAS[tabela]
+        with get_pool().conexao() as conn:
+            linha = conn.execute("SELECT valor FROM sync_controle WHERE chave = ?", (f"marca_{tabela}",)).fetchone()
+        marca = linha[0] if linha else MARCA_INICIAL
+        cursor_marca = (_instante(marca) - MARGEM_MARCA).isoformat()
+        cursor_uid = ""
+        while True:
+            # Keyset por (updated_at, uid): várias linhas gravadas na mesma transação
+            # têm o mesmo updated_at e não podem se perder entre dois lotes
+            with medir("supabase", f"pull {tabela}") as medida:
+                resposta = (self.cliente.table(tabela)
+                            .select(", ".join(["uid", "updated_at"] + colunas))
+                            .or_(f'updated_at.gt."{cursor_marca}",and(updated_at.eq."{cursor_marca}",uid.gt."{cursor_uid}")')
+                            .order("updated_at").order("uid")
+                            .limit(TAMANHO_LOTE_SYNC)
+                            .execute())
+                medida.resultado(resposta)
+            linhas = resposta.data
+            if not linhas:
+                break
+            cursor_marca, cursor_uid = linhas[-1]["updated_at"], linhas[-1]["uid"]
+            if _instante(cursor_marca) > _instante(marca):
+                marca = cursor_marca
+            self._aplicar(tabela, linhas, marca)
+            if len(linhas) < TAMANHO_LOTE_SYNC:
+                break
+
+    def _aplicar(self, tabela, linhas, marca):
+        colunas = COLUNAS[tabela]
+        lista = ", ".join(colunas)
+        atribuicoes = ", ".join(f"{c} = excluded.{c}" for c in colunas)
+        sql_upsert = (f"INSERT INTO {tabela} (uid, updated_at, pendente, {lista}) "
+                      f"VALUES (?, ?, 0, {', '.join('?' * len(colunas))}) "
+                      f"ON CONFLICT (uid) DO UPDATE SET {atribuicoes}, "
+                      f"updated_at = excluded.updated_at, pendente = 0")
+        desarquivados = 0
+        with get_pool().conexao() as conn, medir("sqlite", f"aplicar {tabela}") as medida:
+            medida.resultado(linhas)
+            with conn:
+                # Desliga a marcação de pendência dos triggers só nesta transação
+                conn.execute("UPDATE sync_controle SET valor = '1' WHERE chave = 'aplicando'")
+                for remota in linhas:
+                    local = conn.execute(f"SELECT pendente, updated_at FROM {tabela} WHERE uid = ?",
+                                         (remota["uid"],)).fetchone()
+                    if local is None and tabela == "cortes":
+                        # Corte antigo já arquivado aqui: volta para a tabela quente e recebe a alteração
+                        desarquivados += desarquivar(conn, remota["uid"])
+                    if local and local[0] and _instante(local[1]) > _instante(remota["updated_at"]):
+                        continue  # alteração local mais nova vence; será enviada
+                    if local and _instante(local[1]) == _instante(remota["updated_at"]):
+                        continue  # versão que já está aqui (relida pela MARGEM_MARCA): não regrava nem dispara triggers
+                    conn.execute(sql_upsert, [remota["uid"], remota["updated_at"]] +
+                                 [_para_local(c, remota[c]) for c in colunas])
+                conn.execute("UPDATE sync_controle SET valor = '0' WHERE chave = 'aplicando'")
+                conn.execute("INSERT OR REPLACE INTO sync_controle (chave, valor) VALUES (?, ?)",
+                             (f"marca_{tabela}", marca))
+        get_cache().invalidar(tabela, *(["arquivo_cortes"] if desarquivados else []))
+
+    # --- PUSH ---
+    def _enviar(self, tabela):
+        colunas = COLUNAS[tabela]
+        while True:
+            with get_pool().conexao() as conn:
+                linhas = conn.execute(f"SELECT uid, updated_at, {', '.join(colunas)} FROM {tabela} "
+                                      f"WHERE pendente = 1 LIMIT ?", (TAMANHO_LOTE_SYNC,)).fetchall()
+            if not linhas:
+                break
+            dados = [{"uid": linha[0], **{c: _para_remoto(c, v) for c, v in zip(colunas, linha[2:])}}
+                     for linha in linhas]
+            with medir("supabase", f"push {tabela}") as medida:
+                self.cliente.table(tabela).upsert(dados, on_conflict="uid").execute()
+                medida.resultado(dados)
+            with get_pool().conexao() as conn:
+                with conn:
+                    # Se a linha mudou de novo durante o envio, continua pendente
+                    conn.executemany(f"UPDATE {tabela} SET pendente = 0 WHERE uid = ? AND updated_at = ?",
+                                     [(linha[0], linha[1]) for linha in linhas])
+            if len(linhas) < TAMANHO_LOTE_SYNC:
+                break
+
+
+# Um sincronizador por processo, compartilhado por todas as sessões
+@st.cache_resource
+def get_sincronizador(_cliente, url=None, chave=None):
+    sincronizador = Sincronizador(_cliente).iniciar()
+    if url and chave:
+        sincronizador.escutar_realtime(url, chave)
+    return sincronizador
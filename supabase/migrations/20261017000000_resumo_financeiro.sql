@@ -0,0 +1,16 @@
+-- Resumo do Fluxo de Caixa em uma única ida ao banco.
+-- O app.py lê o Financeiro da réplica local (banco.resumo_financeiro); a função fica para
+-- outros clientes: supabase.rpc("resumo_financeiro", {"inicio": ..., "fim": ...}).
+-- O intervalo é semiaberto: inicio <= chegada < fim.
+create or replace function public.resumo_financeiro(inicio timestamptz, fim timestamptz)
+returns table (total_cortes bigint, faturamento numeric, ticket_medio numeric)
+language sql
+stable
+as $$
+  select count(*)                                                        as total_cortes,
+         coalesce(sum(valor::numeric) filter (where pago), 0)            as faturamento,
+         coalesce(sum(valor::numeric) filter (where pago) / nullif(count(*), 0), 0) as ticket_medio
+  from public.cortes
+  where chegada >= inicio
+    and chegada < fim;
+$$;
@@ -0,0 +1,13 @@
+-- Índices das consultas do painel (fila, financeiro e mensalistas).
+-- Mesmos índices criados pela migração 2 do barber.py no SQLite.
+
+-- Fila: chegada >= hoje, ordenada por (chegada, id) com cursor keyset
+create index if not exists idx_cortes_chegada on public.cortes (chegada desc, id desc);
+-- Extrato e faturamento: pago = true e chegada no período
+create index if not exists idx_cortes_pago_chegada on public.cortes (pago, chegada) include (valor);
+create index if not exists idx_cortes_cliente on public.cortes (cliente);
+
+-- Lista de mensalistas (order by vencimento) e planos vencendo por status
+create index if not exists idx_planos_vencimento on public.planos (vencimento);
+create index if not exists idx_planos_status_vencimento on public.planos (status, vencimento);
+create index if not exists idx_planos_cliente on public.planos (cliente);
@@ -0,0 +1,92 @@
+-- Resumo diário por barbeiro, mantido incrementalmente por trigger.
+-- O Financeiro lê poucas linhas por dia em vez de varrer o histórico de cortes.
+-- Mesmo esquema da migração 3 do barber.py.
+
+alter table public.cortes add column if not exists barbeiro text not null default '';
+
+create table if not exists public.resumo_diario (
+  dia         date    not null,
+  barbeiro    text    not null default '',
+  cortes      integer not null default 0,
+  finalizados integer not null default 0,
+  faturado    numeric not null default 0,
+  recebido    numeric not null default 0,
+  primary key (dia, barbeiro)
+);
+
+-- Dia civil da barbearia (chegada é timestamptz)
+create or replace function public.dia_local(ts timestamptz)
+returns date
+language sql
+immutable
+as $$ select (ts at time zone 'America/Sao_Paulo')::date $$;
+
+create or replace function public.aplicar_resumo_diario(linha public.cortes, sinal integer)
+returns void
+language sql
+as $$
+  insert into public.resumo_diario as r (dia, barbeiro, cortes, finalizados, faturado, recebido)
+  values (public.dia_local(linha.chegada), linha.barbeiro, sinal,
+          sinal * (linha.saida is not null)::int,
+          sinal * coalesce(linha.valor, 0),
+          sinal * case when linha.pago then coalesce(linha.valor, 0) else 0 end)
+  on conflict (dia, barbeiro) do update set
+    cortes      = r.cortes + excluded.cortes,
+    finalizados = r.finalizados + excluded.finalizados,
+    faturado    = r.faturado + excluded.faturado,
+    recebido    = r.recebido + excluded.recebido;
+$$;
+
+-- Check-in soma; Finalizar / Receber tiram a contribuição antiga e somam a nova.
+-- Sem DELETE: o resumo guarda o histórico consolidado.
+create or replace function public.trg_resumo_diario()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op = 'UPDATE' and old.chegada is not null then
+    perform public.aplicar_resumo_diario(old, -1);
+  end if;
+  if new.chegada is not null then
+    perform public.aplicar_resumo_diario(new, 1);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists resumo_cortes on public.cortes;
+create trigger resumo_cortes
+after insert or update of chegada, saida, pago, valor, barbeiro on public.cortes
+for each row execute function public.trg_resumo_diario();
+
+-- Recalcula tudo a partir de cortes: supabase.rpc("reconstruir_resumo_diario")
+create or replace function public.reconstruir_resumo_diario()
+returns void
+language sql
+as $$
+  delete from public.resumo_diario where true;
+  insert into public.resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido)
+  select public.dia_local(chegada), barbeiro, count(*), count(saida),
+         coalesce(sum(valor), 0), coalesce(sum(valor) filter (where pago), 0)
+  from public.cortes
+  where chegada is not null
+  group by 1, 2;
+$$;
+
+select public.reconstruir_resumo_diario();
+
+-- resumo_financeiro passa a ler do resumo diário. Os limites agora são dias
+-- (o app já envia datas), para não depender do fuso da conversão para timestamptz.
+drop function if exists public.resumo_financeiro(timestamptz, timestamptz);
+create or replace function public.resumo_financeiro(inicio date, fim date)
+returns table (total_cortes bigint, faturamento numeric, ticket_medio numeric)
+language sql
+stable
+as $$
+  select coalesce(sum(cortes), 0)::bigint                      as total_cortes,
+         coalesce(sum(recebido), 0)                           as faturamento,
+         coalesce(sum(recebido) / nullif(sum(cortes), 0), 0)  as ticket_medio
+  from public.resumo_diario
+  where dia >= inicio
+    and dia < fim;
+$$;
@@ -0,0 +1,5 @@
+-- Identificador gerado no tablet para cada check-in.
+-- A fila de escrita do app.py reenvia lotes com upsert(on_conflict="checkin_id"),
+-- então um lote que chegou mas cuja resposta se perdeu não vira linha duplicada.
+alter table public.cortes add column if not exists checkin_id uuid;
+create unique index if not exists idx_cortes_checkin_id on public.cortes (checkin_id);
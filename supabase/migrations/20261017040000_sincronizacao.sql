@@ -0,0 +1,33 @@
+-- Metadados da sincronização com a réplica local (sincronizacao.py).
+-- uid: identidade global da linha, gerada no tablet ou aqui.
+-- updated_at: preenchido pelo servidor em toda escrita; é a marca d'água do pull.
+
+alter table public.cortes add column if not exists uid text not null default gen_random_uuid()::text;
+alter table public.cortes add column if not exists updated_at timestamptz not null default clock_timestamp();
+alter table public.planos add column if not exists uid text not null default gen_random_uuid()::text;
+alter table public.planos add column if not exists updated_at timestamptz not null default clock_timestamp();
+-- Exclusão lógica: o delete de um plano precisa chegar às outras réplicas
+alter table public.planos add column if not exists excluido boolean not null default false;
+
+create unique index if not exists idx_cortes_uid on public.cortes (uid);
+create unique index if not exists idx_planos_uid on public.planos (uid);
+create index if not exists idx_cortes_updated_at on public.cortes (updated_at, uid);
+create index if not exists idx_planos_updated_at on public.planos (updated_at, uid);
+
+create or replace function public.tocar_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at = clock_timestamp();
+  return new;
+end;
+$$;
+
+drop trigger if exists tocar_updated_at on public.cortes;
+create trigger tocar_updated_at before insert or update on public.cortes
+for each row execute function public.tocar_updated_at();
+
+drop trigger if exists tocar_updated_at on public.planos;
+create trigger tocar_updated_at before insert or update on public.planos
+for each row execute function public.tocar_updated_at();
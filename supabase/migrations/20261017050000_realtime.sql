@@ -0,0 +1,16 @@
+-- Publica as alterações de cortes e planos no Realtime do Supabase.
+-- A sincronização do app.py assina esses eventos para buscar as mudanças na hora.
+-- "alter publication ... add table" falha se a tabela já estiver publicada:
+-- cada tabela só entra se ainda não estiver, e a migração pode rodar de novo.
+do $$
+declare
+  tabela text;
+begin
+  foreach tabela in array array['cortes', 'planos'] loop
+    if not exists (select 1 from pg_publication_tables
+                   where pubname = 'supabase_realtime' and schemaname = 'public' and tablename = tabela) then
+      execute format('alter publication supabase_realtime add table public.%I', tabela);
+    end if;
+  end loop;
+end
+$$;
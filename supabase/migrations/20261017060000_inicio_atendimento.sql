@@ -0,0 +1,3 @@
+-- Início do atendimento (cliente chamado para a cadeira), usado pelo escalonador
+-- da fila e sincronizado com a réplica local. NULL = ainda aguardando.
+alter table public.cortes add column if not exists inicio timestamptz;
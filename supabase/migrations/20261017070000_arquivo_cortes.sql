@@ -0,0 +1,92 @@
+-- Arquivo de cortes antigos em partições mensais (o mesmo do arquivamento.py na réplica local).
+-- Cortes finalizados e pagos mais antigos que o horizonte saem de public.cortes para
+-- public.cortes_arquivo, particionada por mês de chegada. resumo_diario não tem trigger
+-- de DELETE, então o histórico consolidado continua inteiro.
+-- Rodar de tempos em tempos (pg_cron ou SQL editor): select public.arquivar_cortes(12);
+
+create table if not exists public.cortes_arquivo (like public.cortes)
+partition by range (chegada);
+create index if not exists idx_cortes_arquivo_chegada on public.cortes_arquivo (chegada, id);
+-- uid não pode ser unique numa tabela particionada por chegada; a unicidade vem de public.cortes
+create index if not exists idx_cortes_arquivo_uid on public.cortes_arquivo (uid);
+
+-- Move os meses inteiros anteriores ao horizonte, um mês (uma partição) por vez.
+-- Devolve quantos cortes foram arquivados.
+create or replace function public.arquivar_cortes(meses integer default 12)
+returns integer
+language plpgsql
+as $$
+declare
+  limite timestamp := date_trunc('month', now() at time zone 'America/Sao_Paulo') - make_interval(months => meses);
+  mes    timestamp;
+  linhas integer;
+  total  integer := 0;
+begin
+  select date_trunc('month', min(chegada) at time zone 'America/Sao_Paulo') into mes
+  from public.cortes
+  where chegada < limite at time zone 'America/Sao_Paulo' and saida is not null and pago;
+
+  while mes is not null and mes < limite loop
+    execute format('create table if not exists public.%I partition of public.cortes_arquivo '
+                   'for values from (%L) to (%L)',
+                   'cortes_' || to_char(mes, 'YYYY_MM'),
+                   mes at time zone 'America/Sao_Paulo',
+                   (mes + interval '1 month') at time zone 'America/Sao_Paulo');
+    with movidos as (
+      delete from public.cortes
+      where chegada >= mes at time zone 'America/Sao_Paulo'
+        and chegada < (mes + interval '1 month') at time zone 'America/Sao_Paulo'
+        and saida is not null and pago
+      returning *
+    )
+    insert into public.cortes_arquivo select * from movidos;
+    get diagnostics linhas = row_count;
+    total := total + linhas;
+    mes := mes + interval '1 month';
+  end loop;
+  return total;
+end;
+$$;
+
+-- Uma réplica que ainda tem o corte (ou um arquivo reimportado) pode enviá-lo de novo:
+-- ele sai do arquivo e o resumo desconta a versão arquivada antes de o trigger somar a nova.
+create or replace function public.trg_desarquivar_corte()
+returns trigger
+language plpgsql
+as $$
+declare
+  antigo public.cortes;
+begin
+  delete from public.cortes_arquivo where uid = new.uid returning * into antigo;
+  if found and antigo.chegada is not null then
+    perform public.aplicar_resumo_diario(antigo, -1);
+  end if;
+  return new;
+end;
+$$;
+
+drop trigger if exists desarquivar_corte on public.cortes;
+create trigger desarquivar_corte
+before insert on public.cortes
+for each row execute function public.trg_desarquivar_corte();
+
+-- Histórico completo para relatórios no Supabase: filtros por chegada descem até as
+-- partições (partition pruning), então um período recente não lê o arquivo
+create or replace view public.cortes_historico as
+  select * from public.cortes
+  union all
+  select * from public.cortes_arquivo;
+
+-- A reconstrução do resumo também conta os cortes arquivados
+create or replace function public.reconstruir_resumo_diario()
+returns void
+language sql
+as $$
+  delete from public.resumo_diario where true;
+  insert into public.resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido)
+  select public.dia_local(chegada), barbeiro, count(*), count(saida),
+         coalesce(sum(valor), 0), coalesce(sum(valor) filter (where pago), 0)
+  from public.cortes_historico
+  where chegada is not null
+  group by 1, 2;
+$$;
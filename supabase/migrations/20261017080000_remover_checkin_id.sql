@@ -0,0 +1,8 @@
+-- checkin_id era a chave de reenvio da antiga fila de escrita do app.py; hoje o app.py
+-- grava na réplica local e a sincronização casa as linhas pelo uid (20261017040000),
+-- então a coluna não é mais preenchida nem lida.
+drop index if exists public.idx_cortes_checkin_id;
+alter table public.cortes drop column if exists checkin_id;
+-- cortes_arquivo foi criada com (like public.cortes): as colunas das duas precisam bater
+-- para o insert ... select * de arquivar_cortes (derruba também nas partições)
+alter table if exists public.cortes_arquivo drop column if exists checkin_id;
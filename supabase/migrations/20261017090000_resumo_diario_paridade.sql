@@ -0,0 +1,99 @@
+-- resumo_diario do Supabase com as mesmas colunas e regras da réplica local
+-- (migrações 8, 10 e 11 do banco.py): tempo de atendimento, fiado e exclusão.
+
+-- Nenhum cliente chama mais resumo_financeiro: o app.py e o barber.py leem o
+-- Financeiro da réplica local (banco.resumo_financeiro).
+drop function if exists public.resumo_financeiro(date, date);
+drop function if exists public.resumo_financeiro(timestamptz, timestamptz);
+
+-- minutos: soma de saida - chegada dos atendimentos medidos; medidos: quantos entraram na soma.
+-- a_receber: valor dos atendimentos finalizados e não pagos (relatorios.a_receber).
+alter table public.resumo_diario
+  add column if not exists minutos   double precision not null default 0,
+  add column if not exists medidos   integer          not null default 0,
+  add column if not exists a_receber numeric          not null default 0;
+
+-- Duração em minutos, ou null fora de 5 a 180 (atendimento.DURACAO_MINIMA/MAXIMA):
+-- esquecer de finalizar até o fim do dia não vira uma média de horas
+create or replace function public.minutos_medidos(chegada timestamptz, saida timestamptz)
+returns double precision
+language sql
+immutable
+as $$
+  select case when extract(epoch from saida - chegada) / 60 between 5 and 180
+              then extract(epoch from saida - chegada) / 60 end;
+$$;
+
+create or replace function public.aplicar_resumo_diario(linha public.cortes, sinal integer)
+returns void
+language sql
+as $$
+  insert into public.resumo_diario as r (dia, barbeiro, cortes, finalizados, faturado, recebido,
+                                         minutos, medidos, a_receber)
+  values (public.dia_local(linha.chegada), linha.barbeiro, sinal,
+          sinal * (linha.saida is not null)::int,
+          sinal * coalesce(linha.valor, 0),
+          sinal * case when linha.pago then coalesce(linha.valor, 0) else 0 end,
+          sinal * coalesce(public.minutos_medidos(linha.chegada, linha.saida), 0),
+          sinal * (public.minutos_medidos(linha.chegada, linha.saida) is not null)::int,
+          sinal * case when linha.saida is not null and not linha.pago then coalesce(linha.valor, 0) else 0 end)
+  on conflict (dia, barbeiro) do update set
+    cortes      = r.cortes + excluded.cortes,
+    finalizados = r.finalizados + excluded.finalizados,
+    faturado    = r.faturado + excluded.faturado,
+    recebido    = r.recebido + excluded.recebido,
+    minutos     = r.minutos + excluded.minutos,
+    medidos     = r.medidos + excluded.medidos,
+    a_receber   = r.a_receber + excluded.a_receber;
+$$;
+
+-- Check-in soma; Finalizar / Receber tiram a contribuição antiga e somam a nova.
+-- Corte apagado (correção feita direto no banco) sai do resumo. arquivar_cortes também
+-- apaga de cortes, mas os triggers AFTER só rodam no fim do comando, quando o corte já
+-- está em cortes_arquivo: esses continuam no resumo, que cobre o histórico inteiro.
+create or replace function public.trg_resumo_diario()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op = 'DELETE' then
+    if old.chegada is not null
+       and not exists (select 1 from public.cortes_arquivo where uid = old.uid) then
+      perform public.aplicar_resumo_diario(old, -1);
+    end if;
+    return null;
+  end if;
+  if tg_op = 'UPDATE' and old.chegada is not null then
+    perform public.aplicar_resumo_diario(old, -1);
+  end if;
+  if new.chegada is not null then
+    perform public.aplicar_resumo_diario(new, 1);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists resumo_cortes_delete on public.cortes;
+create trigger resumo_cortes_delete
+after delete on public.cortes
+for each row execute function public.trg_resumo_diario();
+
+-- Recalcula tudo a partir de cortes e do arquivo: supabase.rpc("reconstruir_resumo_diario")
+create or replace function public.reconstruir_resumo_diario()
+returns void
+language sql
+as $$
+  delete from public.resumo_diario where true;
+  insert into public.resumo_diario (dia, barbeiro, cortes, finalizados, faturado, recebido,
+                                    minutos, medidos, a_receber)
+  select public.dia_local(c.chegada), c.barbeiro, count(*), count(c.saida),
+         coalesce(sum(c.valor), 0), coalesce(sum(c.valor) filter (where c.pago), 0),
+         coalesce(sum(public.minutos_medidos(c.chegada, c.saida)), 0),
+         count(public.minutos_medidos(c.chegada, c.saida)),
+         coalesce(sum(c.valor) filter (where c.saida is not null and not c.pago), 0)
+  from public.cortes_historico c
+  where c.chegada is not null
+  group by 1, 2;
+$$;
+
+select public.reconstruir_resumo_diario();
@@ -0,0 +1,349 @@
+"""Substituto local do cliente do Supabase, para desenvolvimento e testes sem rede.
+
+Imita o pedaço da API do supabase-py que o sistema usa
+(table().select/insert/upsert/update/delete, filtros, or_, order, limit, execute)
+sobre um SQLite em memória com o mesmo esquema das tabelas do Supabase.
+Como o servidor de verdade, preenche uid e updated_at em toda escrita.
+Com latencia (segundos), cada execute() espera esse tempo antes de rodar,
+como a ida e volta pela rede; requisições simultâneas esperam juntas, então
+dá para medir o ganho de fazer chamadas independentes em paralelo.
+Tudo roda no próprio processo: não há HTTP, serialização JSON nem conexões
+keep-alive, e a latência é só um sleep. Serve para conferir a lógica e a
+concorrência, não o custo real de rede. Cada execute() fica registrado em
+requisicoes como (tabela, operação, início, fim), em time.perf_counter().
+
+cliente.realtime faz o papel do realtime.AsyncRealtimeClient (Realtime do
+Supabase): as escritas feitas por este cliente viram eventos postgres_changes
+entregues no loop asyncio de quem assinou. Um evento por linha inserida e um
+por update/delete que alterou alguma linha.
+
+    from supabase_local import ClienteSupabaseLocal
+    cliente = ClienteSupabaseLocal()
+    cliente.table("cortes").insert({"cliente": "Ana", "chegada": "2026-10-17T10:00:00-03:00"}).execute()
+    lento = ClienteSupabaseLocal(latencia=0.15)  # 150 ms por requisição
+"""
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Esquema espelhando supabase/migrations (tipos do Postgres mapeados para o SQLite)
+ESQUEMA = {
+    "cortes": {"cliente": "text", "chegada": "timestamptz", "saida": "timestamptz", "pago": "bool",
+               "valor": "numeric", "barbeiro": "text", "inicio": "timestamptz"},
+    "planos": {"cliente": "text", "vencimento": "date", "status": "text", "obs": "text", "excluido": "bool"},
+}
+# Defaults das colunas NOT NULL do Supabase
+PADROES = {"barbeiro": "''", "excluido": "0"}
+# Índices de supabase/migrations (o benchmark compara os dois lados com os mesmos índices)
+INDICES = {
+    "cortes": ["chegada DESC, id DESC", "pago, chegada, valor", "cliente"],
+    "planos": ["vencimento", "status, vencimento", "cliente"],
+}
+OPERADORES = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class RespostaLocal:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class ClienteSupabaseLocal:
+    def __init__(self, caminho=":memory:", latencia=0.0):
+        self.latencia = latencia
+        self.requisicoes = []
+        self._db = sqlite3.connect(caminho, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._ultimo_instante = None
+        self._conexoes_realtime = []
+        for tabela, colunas in ESQUEMA.items():
+            definicao = ", ".join(
+                f"{c} {'INTEGER' if t == 'bool' else 'REAL' if t == 'numeric' else 'TEXT'}"
+                + (f" NOT NULL DEFAULT {PADROES[c]}" if c in PADROES else "")
+                for c, t in colunas.items())
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {tabela} (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                             f"uid TEXT UNIQUE NOT NULL, updated_at TEXT NOT NULL, {definicao})")
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_updated_at ON {tabela} (updated_at, uid)")
+            for numero, colunas_indice in enumerate(INDICES[tabela]):
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_{numero} ON {tabela} ({colunas_indice})")
+
+    def table(self, nome):
+        return ConsultaLocal(self, nome)
+
+    def realtime(self, url=None, chave=None):
+        """Mesma assinatura do AsyncRealtimeClient, para Sincronizador.escutar_realtime(cliente_realtime=...)."""
+        return RealtimeLocal(self)
+
+    def assinantes(self, tabela):
+        """Quantas assinaturas de tabela estão conectadas (para esperar o subscribe nos testes)."""
+        return sum(len(canal._callbacks.get(tabela, [])) for conexao in self._conexoes_realtime
+                   if conexao.is_connected for canal in conexao._canais if canal.inscrito)
+
+    def _publicar(self, tabela, tipo, registros):
+        for conexao in list(self._conexoes_realtime):
+            if conexao.is_connected:
+                for registro in registros:
+                    conexao._entregar(tabela, tipo, registro)
+
+    def _agora(self):
+        # updated_at estritamente crescente, como o clock_timestamp() do servidor
+        agora = datetime.now(timezone.utc)
+        if self._ultimo_instante and agora <= self._ultimo_instante:
+            agora = self._ultimo_instante + timedelta(microseconds=1)
+        self._ultimo_instante = agora
+        return agora.isoformat(timespec="microseconds")
+
+
+class ConsultaLocal:
+    def __init__(self, cliente, tabela):
+        self.cliente = cliente
+        self.tabela = tabela
+        self.colunas = ESQUEMA[tabela]
+        self._operacao = "select"
+        self._campos = "*"
+        self._contar = False
+        self._dados = None
+        self._conflito = None
+        self._ignorar_duplicados = False
+        self._filtros = []
+        self._params = []
+        self._ordem = []
+        self._limite = None
+
+    # --- OPERAÇÕES ---
+    def select(self, campos="*", count=None):
+        self._operacao, self._campos, self._contar = "select", campos, count == "exact"
+        return self
+
+    def insert(self, dados):
+        self._operacao, self._dados = "insert", dados if isinstance(dados, list) else [dados]
+        return self
+
+    def upsert(self, dados, on_conflict="id", ignore_duplicates=False):
+        self._operacao, self._dados = "upsert", dados if isinstance(dados, list) else [dados]
+        self._conflito, self._ignorar_duplicados = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, dados):
+        self._operacao, self._dados = "update", dados
+        return self
+
+    def delete(self):
+        self._operacao = "delete"
+        return self
+
+    # --- FILTROS ---
+    def _filtro(self, coluna, operador, valor):
+        sql, params = self._condicao(coluna, operador, valor)
+        self._filtros.append(sql)
+        self._params += params
+        return self
+
+    def eq(self, coluna, valor): return self._filtro(coluna, "eq", valor)
+    def neq(self, coluna, valor): return self._filtro(coluna, "neq", valor)
+    def gt(self, coluna, valor): return self._filtro(coluna, "gt", valor)
+    def gte(self, coluna, valor): return self._filtro(coluna, "gte", valor)
+    def lt(self, coluna, valor): return self._filtro(coluna, "lt", valor)
+    def lte(self, coluna, valor): return self._filtro(coluna, "lte", valor)
+    def is_(self, coluna, valor): return self._filtro(coluna, "is", valor)
+
+    def in_(self, coluna, valores):
+        valores = [self._para_banco(coluna, v) for v in valores]
+        self._filtros.append(f"{coluna} IN ({', '.join('?' * len(valores))})" if valores else "0")
+        self._params += valores
+        return self
+
+    def or_(self, expressao):
+        sql, params = self._logica("or", expressao)
+        self._filtros.append(sql)
+        self._params += params
+        return self
+
+    def order(self, coluna, desc=False):
+        self._ordem.append(f"{coluna} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, n):
+        self._limite = n
+        return self
+
+    # --- TRADUÇÃO PARA SQL ---
+    def _para_banco(self, coluna, valor):
+        tipo = self.colunas.get(coluna)
+        if valor is None:
+            return None
+        if tipo == "bool":
+            return int(valor in (True, 1, "true", "True", "1"))
+        if tipo == "timestamptz":
+            instante = datetime.fromisoformat(str(valor).replace("Z", "+00:00"))
+            if instante.tzinfo is None:
+                instante = instante.replace(tzinfo=timezone.utc)  # como o Postgres com timezone UTC
+            return instante.astimezone(timezone.utc).isoformat(timespec="microseconds")
+        if coluna == "updated_at":
+            return datetime.fromisoformat(str(valor).replace("Z", "+00:00")).astimezone(
+                timezone.utc).isoformat(timespec="microseconds")
+        return valor
+
+    def _condicao(self, coluna, operador, valor):
+        if operador == "is":
+            valor = str(valor).lower()
+            if valor == "null":
+                return f"{coluna} IS NULL", []
+            return f"{coluna} = ?", [int(valor == "true")]
+        return f"{coluna} {OPERADORES[operador]} ?", [self._para_banco(coluna, valor)]
+
+    def _logica(self, juncao, expressao):
+        partes, params = [], []
+        for termo in _dividir(expressao):
+            aninhado = re.fullmatch(r"(and|or)\((.*)\)", termo)
+            if aninhado:
+                sql, p = self._logica(aninhado.group(1), aninhado.group(2))
+            else:
+                coluna, operador, valor = termo.split(".", 2)
+                if valor.startswith('"') and valor.endswith('"'):
+                    valor = valor[1:-1]
+                sql, p = self._condicao(coluna, operador, valor)
+            partes.append(sql)
+            params += p
+        return "(" + f" {juncao.upper()} ".join(partes) + ")", params
+
+    def _linha(self, linha, nomes):
+        dados = dict(zip(nomes, linha))
+        for coluna, tipo in self.colunas.items():
+            if tipo == "bool" and dados.get(coluna) is not None:
+                dados[coluna] = bool(dados[coluna])
+        return dados
+
+    def execute(self):
+        inicio = time.perf_counter()
+        try:
+            return self._executar()
+        finally:
+            self.cliente.requisicoes.append((self.tabela, self._operacao, inicio, time.perf_counter()))
+
+    def _executar(self):
+        if self.cliente.latencia:
+            time.sleep(self.cliente.latencia)  # fora do lock: a "rede" não serializa as requisições
+        with self.cliente._lock:
+            db = self.cliente._db
+            where = f" WHERE {' AND '.join(self._filtros)}" if self._filtros else ""
+            if self._operacao == "select":
+                campos = "*" if self._campos.strip() == "*" else self._campos
+                sql = f"SELECT {campos} FROM {self.tabela}{where}"
+                if self._ordem:
+                    sql += f" ORDER BY {', '.join(self._ordem)}"
+                if self._limite is not None:
+                    sql += f" LIMIT {int(self._limite)}"
+                cursor = db.execute(sql, self._params)
+                nomes = [d[0] for d in cursor.description]
+                dados = [self._linha(l, nomes) for l in cursor.fetchall()]
+                total = db.execute(f"SELECT COUNT(*) FROM {self.tabela}{where}", self._params).fetchone()[0] \
+                    if self._contar else None
+                return RespostaLocal(dados, total)
+
+            if self._operacao in ("insert", "upsert"):
+                inseridas = []
+                with db:
+                    for dados in self._dados:
+                        dados = {c: self._para_banco(c, v) for c, v in dados.items()}
+                        dados.setdefault("uid", str(uuid.uuid4()))
+                        dados["updated_at"] = self.cliente._agora()
+                        colunas = list(dados)
+                        sql = (f"INSERT INTO {self.tabela} ({', '.join(colunas)}) "
+                               f"VALUES ({', '.join('?' * len(colunas))})")
+                        if self._operacao == "upsert":
+                            if self._ignorar_duplicados:
+                                sql += f" ON CONFLICT ({self._conflito}) DO NOTHING"
+                            else:
+                                sql += (f" ON CONFLICT ({self._conflito}) DO UPDATE SET " +
+                                        ", ".join(f"{c} = excluded.{c}" for c in colunas if c != self._conflito))
+                        db.execute(sql, list(dados.values()))
+                        inseridas.append(dados)
+                self.cliente._publicar(self.tabela, "INSERT", inseridas)
+                return RespostaLocal(inseridas)
+
+            if self._operacao == "update":
+                dados = {c: self._para_banco(c, v) for c, v in self._dados.items()}
+                dados["updated_at"] = self.cliente._agora()
+                with db:
+                    alteradas = db.execute(f"UPDATE {self.tabela} SET {', '.join(f'{c} = ?' for c in dados)}{where}",
+                                           list(dados.values()) + self._params).rowcount
+                self.cliente._publicar(self.tabela, "UPDATE", [dados] if alteradas else [])
+                return RespostaLocal([])
+
+            with db:
+                excluidas = db.execute(f"DELETE FROM {self.tabela}{where}", self._params).rowcount
+            self.cliente._publicar(self.tabela, "DELETE", [{}] if excluidas else [])
+            return RespostaLocal([])
+
+
+# --- REALTIME ---
+class RealtimeLocal:
+    """Imita o pedaço do AsyncRealtimeClient usado em Sincronizador._escutar."""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.is_connected = False
+        self._loop = None
+        self._canais = []
+
+    async def connect(self):
+        self._loop = asyncio.get_running_loop()
+        self.is_connected = True
+        self.cliente._conexoes_realtime.append(self)
+
+    def channel(self, topico):
+        canal = CanalLocal()
+        self._canais.append(canal)
+        return canal
+
+    def desconectar(self):
+        """Simula a queda da conexão; quem assinou reconecta sozinho."""
+        self.is_connected = False
+        self.cliente._conexoes_realtime.remove(self)
+
+    def _entregar(self, tabela, tipo, registro):
+        evento = {"data": {"schema": "public", "table": tabela, "type": tipo, "record": registro}}
+        for canal in self._canais:
+            if canal.inscrito:
+                for callback in canal._callbacks.get(tabela, []):
+                    # Como no cliente de verdade, o callback roda no loop de quem assinou
+                    self._loop.call_soon_threadsafe(callback, evento)
+
+
+class CanalLocal:
+    def __init__(self):
+        self.inscrito = False
+        self._callbacks = {}
+
+    def on_postgres_changes(self, evento, schema="public", table=None, callback=None):
+        self._callbacks.setdefault(table, []).append(callback)
+        return self
+
+    async def subscribe(self):
+        self.inscrito = True
+        return self
+
+
+def _dividir(expressao):
+    """Separa 'a.eq.1,and(b.eq.2,c.eq.3)' nas vírgulas de primeiro nível."""
+    termos, nivel, aspas, atual = [], 0, False, ""
+    for caractere in expressao:
+        if caractere == '"':
+            aspas = not aspas
+        elif not aspas and caractere == "(":
+            nivel += 1
+        elif not aspas and caractere == ")":
+            nivel -= 1
+        elif not aspas and caractere == "," and nivel == 0:
+            termos.append(atual)
+            atual = ""
+            continue
+        atual += caractere
+    if atual:
+        termos.append(atual)
+    return termos
@@ -0,0 +1,21 @@
+"""Fixtures dos testes: cada teste usa um barbearia.db novo, com as migrações aplicadas."""
+import os
+import sys
+
+import pytest
+import streamlit as st
+
+# Os módulos do app ficam na raiz do repositório, sem pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import banco  # noqa: E402
+
+
+@pytest.fixture
+def banco_temporario(tmp_path, monkeypatch):
+    """Aponta o banco.py para um arquivo temporário; devolve o pool de conexões."""
+    monkeypatch.setattr(banco, "ARQUIVO_DB", str(tmp_path / "barbearia.db"))
+    # Pool, cache de consultas e executores são st.cache_resource: nada passa de um teste a outro
+    st.cache_resource.clear()
+    yield banco.get_pool()
+    st.cache_resource.clear()
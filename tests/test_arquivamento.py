@@ -0,0 +1,146 @@
+"""Arquivamento em partições mensais: ida e volta sem perder cortes, réplica e leituras por período."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import banco
+from arquivamento import arquivar, desarquivar
+from banco import tabela_particao
+from sincronizacao import Sincronizador
+from supabase_local import ClienteSupabaseLocal
+
+HOJE = date(2026, 10, 17)
+ARQUIVADOS = [f"2025-{mes:02d}" for mes in range(1, 10)]  # 12 meses inteiros ficam: de 2025-10 em diante
+COLUNAS = "id, uid, cliente, chegada, saida, pago, valor, barbeiro"
+
+
+@pytest.fixture
+def pool(banco_temporario):
+    """Um corte a cada 3 dias desde jan/2025 (um em cada 4 fiado) e dois na virada de jun para jul."""
+    linhas, chegada, i = [], datetime(2025, 1, 1, 10), 0
+    while chegada.date() <= HOJE:
+        linhas.append((f"Cliente {i % 30}", chegada, i % 4 != 0, 30.0 + i % 3, ("Ana", "Bia")[i % 2]))
+        chegada, i = chegada + timedelta(days=3), i + 1
+    linhas += [("Noite", datetime(2025, 6, 30, 23, 30), True, 40.0, "Ana"),
+               ("Madrugada", datetime(2025, 7, 1, 0, 10), True, 40.0, "Ana")]
+    with banco_temporario.conexao() as conn, conn:
+        conn.executemany("INSERT INTO cortes (cliente, chegada, saida, pago, valor, barbeiro) VALUES (?, ?, ?, ?, ?, ?)",
+                         [(cliente, f"{chegada:%Y-%m-%d %H:%M:%S}",
+                           f"{chegada + timedelta(minutes=40):%Y-%m-%d %H:%M:%S}", pago, valor, barbeiro)
+                          for cliente, chegada, pago, valor, barbeiro in linhas])
+    return banco_temporario
+
+
+def executar(sql, params=()):
+    with banco.get_pool().conexao() as conn, conn:
+        conn.execute(sql, params)
+
+
+def consultar(sql, params=()):
+    with banco.get_pool().conexao() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def todos():
+    """Todos os cortes, da tabela quente e das partições."""
+    return sorted(consultar(f"SELECT {COLUNAS} FROM {banco.fonte_cortes(colunas=COLUNAS)}"))
+
+
+def resumo():
+    # minutos é soma de julianday: arredonda para comparar somas feitas em ordens diferentes
+    return [linha[:-1] + (round(linha[-1], 6),)
+            for linha in consultar("SELECT dia, barbeiro, cortes, finalizados, faturado, recebido, medidos, "
+                                   "a_receber, minutos FROM resumo_diario ORDER BY dia, barbeiro")]
+
+
+def test_arquivar_e_desarquivar_mantem_cortes_e_uids(pool):
+    antes, resumo_antes = todos(), resumo()
+    movidos = arquivar(hoje=HOJE)
+
+    assert list(movidos) == ARQUIVADOS
+    assert todos() == antes
+    assert resumo() == resumo_antes
+    # Na tabela quente, antes do limite, só sobrou fiado
+    assert consultar("SELECT COUNT(*) FROM cortes WHERE chegada < '2025-10-01' AND pago = 1") == [(0,)]
+    assert consultar("SELECT mes, linhas FROM arquivo_cortes ORDER BY mes") == list(movidos.items())
+    assert consultar("SELECT COUNT(*) FROM arquivo_uids") == [(sum(movidos.values()),)]
+
+    with pool.conexao() as conn, conn:
+        for (uid,) in conn.execute("SELECT uid FROM arquivo_uids").fetchall():
+            assert desarquivar(conn, uid)
+        assert not desarquivar(conn, "nao-arquivado")
+    banco.get_cache().invalidar("cortes", "arquivo_cortes")
+
+    assert todos() == antes
+    assert resumo() == resumo_antes
+    assert consultar("SELECT COUNT(*) FROM arquivo_uids") == [(0,)]
+    assert consultar("SELECT SUM(linhas) FROM arquivo_cortes") == [(0,)]
+    for mes in ARQUIVADOS:
+        assert consultar(f"SELECT COUNT(*) FROM {tabela_particao(mes)}") == [(0,)]
+
+
+def test_replica_so_arquiva_o_que_ja_foi_enviado(pool):
+    executar("UPDATE cortes SET pendente = 0 WHERE chegada < '2025-05-01'")
+    (pendentes,), = consultar("SELECT COUNT(*) FROM cortes WHERE chegada < '2025-10-01' AND pago = 1 "
+                              "AND pendente = 1")
+
+    movidos = arquivar(somente_sincronizados=True, hoje=HOJE)
+
+    assert list(movidos) == ["2025-01", "2025-02", "2025-03", "2025-04"]
+    assert consultar("SELECT COUNT(*) FROM cortes WHERE chegada < '2025-10-01' AND pago = 1 "
+                     "AND pendente = 1") == [(pendentes,)]
+    assert consultar("SELECT COUNT(*) FROM cortes WHERE chegada < '2025-10-01' AND pago = 1 "
+                     "AND pendente = 0") == [(0,)]
+
+
+def test_corte_arquivado_reenviado_nao_volta_duplicado(pool):
+    arquivar(hoje=HOJE)
+    resumo_antes = resumo()
+    (uid, mes, id_corte), = consultar("SELECT uid, mes, id FROM arquivo_uids ORDER BY uid LIMIT 1")
+    linha, = consultar(f"SELECT uid, cliente, chegada, saida, pago, valor FROM {tabela_particao(mes)} "
+                       f"WHERE id = ?", (id_corte,))
+
+    # Reimportação de um arquivo antigo: o trigger BEFORE INSERT descarta a linha (RAISE(IGNORE))
+    executar("INSERT INTO cortes (uid, cliente, chegada, saida, pago, valor) VALUES (?, ?, ?, ?, ?, ?)", linha)
+
+    assert consultar("SELECT COUNT(*) FROM cortes WHERE uid = ?", (uid,)) == [(0,)]
+    assert consultar(f"SELECT COUNT(*) FROM {tabela_particao(mes)} WHERE uid = ?", (uid,)) == [(1,)]
+    assert resumo() == resumo_antes
+
+
+def test_alteracao_remota_devolve_corte_arquivado(pool):
+    remoto = ClienteSupabaseLocal()
+    sincronizador = Sincronizador(remoto)
+    try:
+        sincronizador.sincronizar()  # tudo enviado: a réplica pode arquivar
+        arquivar(somente_sincronizados=True, hoje=HOJE)
+        (uid, mes), = consultar("SELECT uid, mes FROM arquivo_uids ORDER BY uid LIMIT 1")
+
+        remoto.table("cortes").update({"valor": 99}).eq("uid", uid).execute()
+        sincronizador.sincronizar()
+    finally:
+        sincronizador._executor.shutdown()
+
+    assert consultar("SELECT valor, pendente FROM cortes WHERE uid = ?", (uid,)) == [(99, 0)]
+    assert consultar(f"SELECT COUNT(*) FROM {tabela_particao(mes)} WHERE uid = ?", (uid,)) == [(0,)]
+    assert consultar("SELECT COUNT(*) FROM arquivo_uids WHERE uid = ?", (uid,)) == [(0,)]
+    # O resumo desconta o corte arquivado e soma o valor novo: igual a recalcular do zero
+    mantido = resumo()
+    banco.reconstruir_resumo()
+    assert mantido == resumo()
+
+
+def test_fonte_cortes_igual_a_tabela_quente_na_virada_do_mes(pool):
+    inicio, fim = date(2025, 6, 20), date(2025, 7, 10)
+    sql = f"SELECT {COLUNAS} FROM {{fonte}} WHERE chegada >= ? AND chegada < ? ORDER BY chegada DESC, id DESC"
+    periodo = (inicio.isoformat(), fim.isoformat())
+    assert banco.fonte_cortes(inicio, fim, COLUNAS) == "cortes"
+    antes = consultar(sql.format(fonte="cortes"), periodo)
+    assert {linha[2] for linha in antes} >= {"Noite", "Madrugada"}
+
+    arquivar(hoje=HOJE)
+    fonte = banco.fonte_cortes(inicio, fim, COLUNAS)
+
+    assert tabela_particao("2025-06") in fonte and tabela_particao("2025-07") in fonte
+    assert tabela_particao("2025-05") not in fonte and tabela_particao("2025-08") not in fonte
+    assert consultar(sql.format(fonte=fonte), periodo) == antes
@@ -0,0 +1,103 @@
+"""Escalonador da fila (atendimento.py): média móvel das durações, estimativas de espera e a cadeira livre."""
+import importlib
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from atendimento import DuracaoMovel, Escalonador
+
+HOJE = date.today()
+AGORA = datetime.combine(HOJE, time(10, 0))
+
+
+def texto(instante):
+    return f"{instante:%Y-%m-%d %H:%M:%S}"
+
+
+@pytest.fixture
+def pool(banco_temporario):
+    """Rui (cadeira 1, 20 min por corte) atendendo há 5 min; Leo (cadeira 2, 40 min) livre; Zeca inativo."""
+    ontem = AGORA - timedelta(days=1)
+    with banco_temporario.conexao() as conn, conn:
+        conn.executemany("INSERT INTO barbeiros (nome, cadeira, ativo) VALUES (?, ?, ?)",
+                         [("Rui", 1, 1), ("Leo", 2, 1), ("Zeca", 3, 0)])
+        historico = []
+        for i in range(3):
+            comeco = ontem + timedelta(hours=i)
+            historico += [("Antigo", texto(comeco), texto(comeco), texto(comeco + timedelta(minutes=20)), "Rui"),
+                          ("Antigo", texto(comeco), texto(comeco), texto(comeco + timedelta(minutes=40)), "Leo"),
+                          ("Antigo", texto(comeco), texto(comeco), texto(comeco + timedelta(minutes=10)), "Zeca")]
+        conn.executemany("INSERT INTO cortes (cliente, chegada, inicio, saida, barbeiro) VALUES (?, ?, ?, ?, ?)",
+                         historico)
+        conn.execute("INSERT INTO cortes (cliente, chegada, inicio, barbeiro) VALUES ('Na cadeira', ?, ?, 'Rui')",
+                     (texto(AGORA - timedelta(minutes=30)), texto(AGORA - timedelta(minutes=5))))
+        conn.executemany("INSERT INTO cortes (cliente, chegada) VALUES (?, ?)",
+                         [(cliente, texto(AGORA - timedelta(minutes=minutos)))
+                          for cliente, minutos in (("Ana", 20), ("Bia", 15), ("Caio", 10))])
+    return banco_temporario
+
+
+def ids(pool):
+    with pool.conexao() as conn:
+        return dict(conn.execute("SELECT cliente, id FROM cortes WHERE cliente <> 'Antigo'").fetchall())
+
+
+def test_duracao_movel_media_das_ultimas():
+    duracao = DuracaoMovel(janela=3)
+    assert duracao.media() == 30.0
+    assert duracao.media(padrao=12.0) == 12.0
+    for minutos in (10, 20, 30):
+        duracao.adicionar(minutos)
+    assert duracao.media() == 20.0
+    duracao.adicionar(40)  # sai o 10
+    assert duracao.media() == 30.0
+    duracao.adicionar(50)  # sai o 20
+    assert duracao.media() == 40.0
+
+
+def test_estimativas_simulam_as_cadeiras(pool):
+    escalonador = Escalonador()
+    cortes = ids(pool)
+    assert escalonador.barbeiros == ["Rui", "Leo"]  # Zeca está inativo: não tem cadeira
+    assert [(nome, atual.cliente if atual else None) for nome, atual in escalonador.cadeiras()] == \
+        [("Rui", "Na cadeira"), ("Leo", None)]
+
+    # Leo livre agora; Rui livre em 20 - 5 = 15 min. Cada um volta ao heap com a própria média
+    assert escalonador.estimativas(AGORA) == {
+        cortes["Ana"]: (1, 0, "Leo"),
+        cortes["Bia"]: (2, 15, "Rui"),
+        cortes["Caio"]: (3, 35, "Rui"),
+    }
+    assert [c.cliente for c in escalonador.proximos(2)] == ["Ana", "Bia"]
+
+
+def test_estimativas_acompanham_a_fila(pool):
+    escalonador = Escalonador()
+    cortes = ids(pool)
+    with pool.conexao() as conn, conn:
+        # Rui termina (em 20 min, a média dele não muda); Leo chama a Ana; Caio passa a ser mensalista
+        conn.execute("UPDATE cortes SET saida = ? WHERE cliente = 'Na cadeira'",
+                     (texto(AGORA + timedelta(minutes=15)),))
+        conn.execute("UPDATE cortes SET inicio = ?, barbeiro = 'Leo' WHERE cliente = 'Ana'", (texto(AGORA),))
+        conn.execute("INSERT INTO planos (cliente, vencimento, status) VALUES ('Caio', ?, 'Ativo')",
+                     ((HOJE + timedelta(days=30)).isoformat(),))
+
+    assert escalonador.estimativas(AGORA) == {
+        cortes["Caio"]: (1, 0, "Rui"),
+        cortes["Bia"]: (2, 20, "Rui"),
+    }
+
+
+def test_chamar_cliente_so_com_a_cadeira_livre(pool):
+    barber = importlib.import_module("barber")
+    cortes = ids(pool)
+
+    barber.chamar_cliente(cortes["Ana"], "Rui")   # Rui está atendendo: não chama
+    barber.chamar_cliente(cortes["Bia"], "Leo")
+    barber.chamar_cliente(cortes["Caio"], "Leo")  # Leo acabou de chamar a Bia
+    barber.chamar_cliente(cortes["Bia"], "Rui")   # Bia já foi chamada: não troca de cadeira
+
+    with pool.conexao() as conn:
+        chamados = conn.execute("SELECT cliente, barbeiro FROM cortes WHERE inicio IS NOT NULL AND saida IS NULL "
+                                "ORDER BY cliente").fetchall()
+    assert chamados == [("Bia", "Leo"), ("Na cadeira", "Rui")]
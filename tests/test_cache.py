@@ -0,0 +1,81 @@
+"""Cache de leituras do painel (banco.CacheConsultas): invalidação por tabela, usar_cache=False e TTL."""
+from types import SimpleNamespace
+
+import banco
+from banco import run_query
+from modelos import COLUNAS_CORTE, corte
+
+SQL_RESUMO = "SELECT COALESCE(SUM(cortes), 0) FROM resumo_diario"
+SQL_CLIENTES = "SELECT COUNT(*) FROM clientes"
+SQL_PLANOS = "SELECT COUNT(*) FROM planos"
+
+
+def ler(sql, usar_cache=True):
+    return int(run_query(sql, return_data=True, usar_cache=usar_cache).iloc[0, 0])
+
+
+def escrever_por_fora(sql, params=()):
+    """Escrita que não passa por run_query (como a de outro processo): o cache não fica sabendo."""
+    with banco.get_pool().conexao() as conn, conn:
+        conn.execute(sql, params)
+
+
+def test_escrita_em_cortes_invalida_resumo_e_clientes(banco_temporario):
+    assert (ler(SQL_RESUMO), ler(SQL_CLIENTES), ler(SQL_PLANOS)) == (0, 0, 0)
+    escrever_por_fora("INSERT INTO planos (cliente, vencimento) VALUES ('Bia', '2030-01-10')")
+
+    run_query("INSERT INTO cortes (cliente, chegada) VALUES (?, ?)", ("Ana", "2026-03-02 10:00:00"))
+
+    # Os triggers de cortes mudam resumo_diario e clientes: as duas leituras vão ao banco de novo
+    assert ler(SQL_RESUMO) == 1
+    assert ler(SQL_CLIENTES) == 2
+    # planos não depende de cortes: continua no cache, sem a escrita feita por fora
+    assert ler(SQL_PLANOS) == 0
+
+
+def test_escrita_em_planos_mantem_resumo_no_cache(banco_temporario):
+    assert (ler(SQL_RESUMO), ler(SQL_CLIENTES)) == (0, 0)
+    escrever_por_fora("INSERT INTO cortes (cliente, chegada) VALUES ('Ana', '2026-03-02 10:00:00')")
+
+    run_query("INSERT INTO planos (cliente, vencimento) VALUES (?, ?)", ("Bia", "2030-01-10"))
+
+    assert ler(SQL_RESUMO) == 0
+    assert ler(SQL_CLIENTES) == 2
+    assert ler(SQL_RESUMO, usar_cache=False) == 1
+
+
+def test_usar_cache_false_vai_sempre_ao_banco(banco_temporario):
+    cache = banco.get_cache()
+    assert ler(SQL_RESUMO) == 0
+    escrever_por_fora("INSERT INTO cortes (cliente, chegada) VALUES ('Ana', '2026-03-02 10:00:00')")
+    antes = cache.estatisticas()
+
+    assert ler(SQL_RESUMO, usar_cache=False) == 1
+    registros = banco.carregar_registros(f"SELECT {COLUNAS_CORTE} FROM cortes", (), corte, usar_cache=False)
+    assert [c.cliente for c in registros] == ["Ana"]
+
+    assert cache.estatisticas() == antes  # nem acerto, nem falha, nem item novo
+    assert ler(SQL_RESUMO) == 0
+
+
+def test_item_expira_depois_do_ttl(banco_temporario, monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(banco, "time", SimpleNamespace(monotonic=lambda: agora[0]))
+    assert ler(SQL_RESUMO) == 0
+    escrever_por_fora("INSERT INTO cortes (cliente, chegada) VALUES ('Ana', '2026-03-02 10:00:00')")
+
+    agora[0] += banco.TTL_CACHE - 1
+    assert ler(SQL_RESUMO) == 0
+    agora[0] += 2
+    assert ler(SQL_RESUMO) == 1
+
+
+def test_escrita_durante_a_carga_nao_fica_no_cache(banco_temporario):
+    cache = banco.get_cache()
+
+    def carregar_e_ser_atropelado():
+        cache.invalidar("cortes")  # outra sessão grava enquanto a leitura ainda está no banco
+        return "velho"
+
+    assert cache.obter(("resumo",), {"resumo_diario"}, carregar_e_ser_atropelado) == "velho"
+    assert cache.obter(("resumo",), {"resumo_diario"}, lambda: "novo") == "novo"
@@ -0,0 +1,111 @@
+"""Cadastro de clientes (clientes.IndiceClientes): prefixo, palavra, trigramas e tempo de busca."""
+import itertools
+import time
+
+import pytest
+
+from clientes import IndiceClientes, LIMITE_SUGESTOES
+from regras import chave_nome
+
+NOMES = ["João da Silva", "Joana Prado", "Maria Silva", "Pedro Álvares", "José Conceição",
+         "Silvana Souza", "Ana Maria Silva Santos"]
+
+
+@pytest.fixture
+def pool(banco_temporario):
+    """Clientes criados pelos triggers, a partir de check-ins."""
+    with banco_temporario.conexao() as conn, conn:
+        conn.executemany("INSERT INTO cortes (cliente, chegada) VALUES (?, '2026-03-02 10:00:00')",
+                         [(nome,) for nome in NOMES])
+    return banco_temporario
+
+
+def nomes(indice, texto):
+    return [indice.nome(id_cliente) for id_cliente in indice.buscar(texto)]
+
+
+@pytest.mark.parametrize("nome, chave", [
+    ("João  da Silva", "joao da silva"),
+    ("  JOSÉ CONCEIÇÃO ", "jose conceicao"),
+    ("Pedro\tÁlvares", "pedro alvares"),
+    ("", ""),
+    (None, ""),
+])
+def test_chave_nome_tira_acentos_espacos_e_maiusculas(nome, chave):
+    assert chave_nome(nome) == chave
+
+
+def test_mesmo_cliente_com_ou_sem_acento(pool):
+    with pool.conexao() as conn, conn:
+        conn.execute("INSERT INTO cortes (cliente, chegada) VALUES ('JOAO  DA SILVA', '2026-03-03 10:00:00')")
+        assert conn.execute("SELECT COUNT(*) FROM clientes").fetchone() == (len(NOMES),)
+        ids = conn.execute("SELECT DISTINCT cliente_id FROM cortes WHERE chave_nome(cliente) = 'joao da silva'"
+                           ).fetchall()
+    indice = IndiceClientes()
+    assert [(indice.id_por_nome("joão da silva"),)] == ids
+    assert indice.id_por_nome("Joao da Silva ") == indice.id_por_nome("JOÃO DA SILVA")
+    assert indice.id_por_nome("João Silva") is None
+
+
+def test_busca_por_prefixo_e_por_palavra(pool):
+    indice = IndiceClientes()
+    assert nomes(indice, "j") == []  # menos que TAMANHO_MINIMO_BUSCA
+    # Começa pelo texto (ordem da chave), depois quem tem uma palavra começando por ele
+    assert nomes(indice, "jo") == ["Joana Prado", "João da Silva", "José Conceição"]
+    assert nomes(indice, "JOSE") == ["José Conceição"]
+    # Palavra: "silva" acha o sobrenome; "Silvana" começa por "silva" e entra primeiro
+    assert nomes(indice, "Silva") == ["Silvana Souza", "Maria Silva", "João da Silva", "Ana Maria Silva Santos"]
+    # Várias palavras, em qualquer ordem: todas precisam aparecer
+    assert nomes(indice, "silva maria") == ["Maria Silva", "Ana Maria Silva Santos"]
+    assert nomes(indice, "alva") == ["Pedro Álvares"]
+
+
+def test_busca_com_erro_de_digitacao(pool):
+    indice = IndiceClientes()
+    assert nomes(indice, "Pedor") == ["Pedro Álvares"]
+    assert nomes(indice, "Marai Silvs") == ["Maria Silva", "Ana Maria Silva Santos"]
+    assert nomes(indice, "Conseicao") == ["José Conceição"]
+    assert nomes(indice, "xyzw") == []
+
+
+def test_indice_acompanha_novos_clientes(pool):
+    indice = IndiceClientes()
+    assert nomes(indice, "Bruno") == []
+    with pool.conexao() as conn, conn:
+        conn.execute("INSERT INTO cortes (cliente, chegada) VALUES ('Bruno Silva', '2026-03-03 10:00:00')")
+        conn.execute("UPDATE cortes SET cliente = 'Joana Prado Lima' WHERE cliente = 'Joana Prado'")
+    assert nomes(indice, "Bruno") == ["Bruno Silva"]
+    assert nomes(indice, "lima") == ["Joana Prado Lima"]
+
+
+def test_busca_em_10_mil_clientes_em_tempo_limitado(banco_temporario):
+    primeiros = ["João", "Maria", "José", "Ana", "Pedro", "Paula", "Lucas", "Júlia", "Carlos", "Beatriz",
+                 "Rafael", "Fernanda", "Marcos", "Letícia", "Tiago", "Camila", "André", "Larissa", "Bruno", "Sofia"]
+    meios = ["", "da", "de", "dos", "Aparecida", "Henrique", "Luiz", "Cristina", "Eduardo", "Vitória"]
+    sobrenomes = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima",
+                  "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes",
+                  "Vieira", "Barbosa", "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques",
+                  "Machado", "Mendes", "Freitas", "Cardoso", "Ramos", "Gonçalves", "Santana", "Teixeira",
+                  "Araújo", "Pinto", "Moura", "Cavalcanti", "Conceição", "Batista", "Monteiro", "Correia",
+                  "Campos", "Reis", "Xavier", "Azevedo", "Brito", "Castro", "Prado"]
+    cadastro = [" ".join(filter(None, partes)) for partes in itertools.product(primeiros, meios, sobrenomes)]
+    assert len(cadastro) == 10_000
+    with banco_temporario.conexao() as conn, conn:
+        conn.executemany("INSERT INTO clientes (nome, chave) VALUES (?, ?)",
+                         [(nome, chave_nome(nome)) for nome in cadastro])
+
+    indice = IndiceClientes()
+    consultas = ["jo", "maria", "silva", "santos", "lucas", "pedro henrique", "ana costa", "silvs",
+                 "fernada", "joao da silva", "jul", "xavier", "carlos eduardo rocha", "leticia"]
+    for texto in consultas:
+        indice.buscar(texto)  # primeira passada fora da medição
+    inicio = time.perf_counter()
+    resultados = {texto: indice.buscar(texto) for texto in consultas}
+    por_busca = (time.perf_counter() - inicio) / len(consultas)
+
+    assert por_busca < 0.02  # abaixo de 1 ms numa máquina comum; a folga é para CI lento
+    completos = {"joao da silva": "João da Silva", "carlos eduardo rocha": "Carlos Eduardo Rocha"}
+    assert all(len(ids) == LIMITE_SUGESTOES for texto, ids in resultados.items() if texto not in completos)
+    for texto, nome in completos.items():
+        assert [indice.nome(id_cliente) for id_cliente in resultados[texto]] == [nome]
+    assert all("Silva" in indice.nome(id_cliente) for id_cliente in resultados["silvs"])
@@ -0,0 +1,134 @@
+"""As consultas do painel usam os índices de cortes (EXPLAIN QUERY PLAN), sem varrer a tabela."""
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import arquivamento
+import banco
+import relatorios
+
+HOJE = date.today()
+# A mesma consulta do extrato do Financeiro no app.py e no barber.py
+SQL_EXTRATO = """SELECT cliente, chegada, valor, pago FROM {fonte}
+                 WHERE pago = 1 AND chegada >= ? AND chegada < ?
+                 ORDER BY chegada DESC LIMIT ?"""
+# A mesma consulta de banco.resumo_financeiro (lê a conexão direto, sem run_query)
+SQL_RESUMO = """SELECT COALESCE(SUM(cortes), 0), COALESCE(SUM(recebido), 0)
+                FROM resumo_diario WHERE dia >= ? AND dia < ?"""
+
+
+@pytest.fixture
+def pool(banco_temporario):
+    """Dois anos de cortes, um por dia, e três cortes em aberto hoje."""
+    linhas = []
+    for dias in range(730, 0, -1):
+        chegada = datetime.combine(HOJE - timedelta(days=dias), datetime.min.time()) + timedelta(hours=10)
+        linhas.append((f"Cliente {dias % 40}", f"{chegada:%Y-%m-%d %H:%M:%S}",
+                       f"{chegada + timedelta(minutes=30):%Y-%m-%d %H:%M:%S}", dias % 5 != 0, 35.0))
+    for hora in (9, 10, 11):
+        linhas.append((f"Cliente {hora}", f"{HOJE} {hora:02d}:00:00", None, False, 35.0))
+    with banco_temporario.conexao() as conn, conn:
+        conn.executemany("INSERT INTO cortes (cliente, chegada, saida, pago, valor) VALUES (?, ?, ?, ?, ?)",
+                         linhas)
+    return banco_temporario
+
+
+@pytest.fixture
+def consultas(monkeypatch):
+    """Lista (sql, params) de cada SELECT feito por banco.run_query, banco.carregar_registros e relatorios.run_query.
+
+    Guarda o SQL com os marcadores: com os valores no texto o SQLite pode escolher
+    outro plano, e o que importa é o plano da consulta preparada que o app executa.
+    """
+    feitas = []
+
+    def espiar(modulo, nome):
+        original = getattr(modulo, nome)
+
+        def registrar(query, params=(), *args, **kwargs):
+            if query.lstrip().startswith("SELECT"):
+                feitas.append((query, tuple(params)))
+            return original(query, params, *args, **kwargs)
+        monkeypatch.setattr(modulo, nome, registrar)
+
+    espiar(banco, "run_query")
+    espiar(banco, "carregar_registros")
+    espiar(relatorios, "run_query")
+    return feitas
+
+
+def plano(pool, sql, params):
+    with pool.conexao() as conn:
+        return [linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def assert_indice_de_cortes(detalhes):
+    """Toda leitura de cortes (ou partição) passa por um índice, sem ordenar em tabela temporária."""
+    leituras = [d for d in detalhes if d.startswith(("SCAN cortes", "SEARCH cortes"))]
+    assert leituras, detalhes
+    for detalhe in leituras:
+        assert "USING" in detalhe and "INDEX idx_cortes" in detalhe, detalhes
+    assert not any("TEMP B-TREE FOR ORDER BY" in d for d in detalhes), detalhes
+
+
+def test_fila_em_aberto_busca_pelo_indice_de_chegada(pool, consultas):
+    assert [c.cliente for c in banco.carregar_fila()] == ["Cliente 11", "Cliente 10", "Cliente 9"]
+    (sql, params), = consultas
+    detalhes = plano(pool, sql, params)
+    assert_indice_de_cortes(detalhes)
+    assert any(d.startswith("SEARCH cortes USING INDEX idx_cortes_chegada") for d in detalhes), detalhes
+
+
+def test_paginas_do_historico_seguem_o_indice_de_chegada(pool, consultas):
+    primeira = banco.carregar_fila(somente_abertos=False)
+    ultimo = primeira[banco.TAMANHO_PAGINA - 1]
+    segunda = banco.carregar_fila((ultimo.chegada, ultimo.id), somente_abertos=False)
+    assert segunda[0].chegada < ultimo.chegada
+
+    (sql_primeira, params_primeira), (sql_segunda, params_segunda) = consultas
+    # Primeira página: o índice já está na ordem do ORDER BY e o LIMIT para a leitura
+    assert_indice_de_cortes(plano(pool, sql_primeira, params_primeira))
+    # Demais páginas: busca a partir do cursor, sem percorrer o índice desde o começo
+    detalhes = plano(pool, sql_segunda, params_segunda)
+    assert_indice_de_cortes(detalhes)
+    assert all(d.startswith("SEARCH") for d in detalhes if "cortes" in d), detalhes
+
+
+def test_consultas_do_financeiro_usam_indices(pool, consultas):
+    inicio, fim = HOJE.replace(day=1) - timedelta(days=365), HOJE + timedelta(days=1)
+    periodo = (inicio.isoformat(), fim.isoformat())
+
+    detalhes = plano(pool, SQL_EXTRATO.format(fonte="cortes"), (*periodo, banco.LIMITE_EXTRATO + 1))
+    assert_indice_de_cortes(detalhes)
+    assert any("idx_cortes_pago_chegada (pago=? AND chegada>? AND chegada<?)" in d for d in detalhes), detalhes
+
+    # Métricas do período: do resumo diário, sem ler cortes
+    assert plano(pool, SQL_RESUMO, periodo) == ["SEARCH resumo_diario USING PRIMARY KEY (dia>? AND dia<?)"]
+
+    # Análise do período: séries e tempo médio do resumo diário, ocupação e a receber de cortes
+    relatorios.Painel.carregar(inicio, fim, "mes")
+    lidas_de_cortes = [(sql, params) for sql, params in consultas if "resumo_diario" not in sql]
+    assert len(lidas_de_cortes) == 2
+    for sql, params in lidas_de_cortes:
+        assert_indice_de_cortes(plano(pool, sql, params))
+
+
+def test_historico_e_extrato_com_meses_arquivados(pool, consultas):
+    assert arquivamento.arquivar(meses=6)
+
+    # Página que alcança os meses arquivados: cada parte do UNION ALL busca no próprio índice
+    cursor = (datetime.combine(HOJE - timedelta(days=400), datetime.min.time()), 0)
+    banco.carregar_fila(cursor, somente_abertos=False)
+    sql, params = consultas[-1]
+    partes = re.findall(r"FROM (cortes\w*)", sql)
+    assert len(partes) > 1
+    detalhes = plano(pool, sql, params)
+    assert_indice_de_cortes(detalhes)
+    assert sum(d.startswith("SEARCH cortes") for d in detalhes) == len(partes), detalhes
+
+    inicio, fim = HOJE - timedelta(days=500), HOJE + timedelta(days=1)
+    fonte = banco.fonte_cortes(inicio, fim, "cliente, chegada, valor, pago")
+    detalhes = plano(pool, SQL_EXTRATO.format(fonte=fonte),
+                     (inicio.isoformat(), fim.isoformat(), banco.LIMITE_EXTRATO + 1))
+    assert_indice_de_cortes(detalhes)
@@ -0,0 +1,94 @@
+"""Métricas (metricas.py): caminho desligado, baldes do histograma e exportação Prometheus/JSON."""
+import json
+
+import pytest
+
+import metricas
+from banco import run_query
+from metricas import Coletor, LIMITES_MS, medir, medir_secao
+
+
+@pytest.fixture
+def coletor(monkeypatch):
+    """Coletor novo no lugar do global do processo, desligado como na partida."""
+    coletor = Coletor()
+    monkeypatch.setattr(metricas, "COLETOR", coletor)
+    return coletor
+
+
+def test_desligado_nao_registra_nada(banco_temporario, coletor):
+    @medir_secao("fila")
+    def secao():
+        return run_query("SELECT COUNT(*) FROM cortes", return_data=True, usar_cache=False).iloc[0, 0]
+
+    medida = medir("supabase", "pull cortes")
+    assert medida is medir("sqlite", "outra") is metricas._DESLIGADA  # o mesmo objeto vazio, sem alocar
+    with medida:
+        medida.resultado([{"uid": "a"}])
+    assert secao() == 0
+    assert coletor.resumo() == []
+
+    # A chave é do processo: ligada, a próxima consulta de qualquer sessão já é medida
+    coletor.ativo = True
+    assert secao() == 0
+    assert {(linha["categoria"], linha["nome"]) for linha in coletor.resumo()} == {
+        ("secao", "fila"), ("sqlite", "SELECT COUNT(*) FROM cortes")}
+
+
+def test_baldes_e_percentis(coletor):
+    # Cada medida cai no primeiro balde cujo limite é >= a ela; acima de 5 s, no último
+    for ms in (0.05, 0.1, 3, 3, 7000):
+        coletor.registrar("sqlite", "SELECT  1\n  FROM cortes", ms, linhas=2, tamanho=10)
+    coletor.registrar("supabase", "pull cortes", 1.0)
+
+    sqlite, supabase = coletor.resumo()  # da série que mais consumiu tempo para a que menos
+    assert sqlite["nome"] == "SELECT 1 FROM cortes"  # espaços e quebras de linha normalizados
+    assert len(sqlite["baldes"]) == len(LIMITES_MS) + 1
+    assert {LIMITES_MS[i] if i < len(LIMITES_MS) else "acima": n
+            for i, n in enumerate(sqlite["baldes"]) if n} == {0.1: 2, 5: 2, "acima": 1}
+    assert (sqlite["chamadas"], sqlite["linhas"], sqlite["bytes"]) == (5, 10, 50)
+    assert (sqlite["total_ms"], sqlite["media_ms"], sqlite["maximo_ms"]) == (7006.15, 1401.23, 7000)
+    assert (sqlite["p50_ms"], sqlite["p95_ms"]) == (5, 7000)
+    assert (supabase["baldes"][LIMITES_MS.index(1)], supabase["p50_ms"], supabase["p95_ms"]) == (1, 1.0, 1.0)
+
+    coletor.zerar()
+    assert coletor.resumo() == []
+
+
+def test_medida_conta_linhas_e_bytes_do_resultado(coletor):
+    coletor.ativo = True
+    with medir("supabase", "push cortes") as medida:
+        medida.resultado([{"uid": "a"}, {"uid": "b"}])
+    with medir("sqlite", "UPDATE cortes") as medida:
+        medida.resultado(3)  # rowcount
+
+    linhas = {linha["nome"]: (linha["linhas"], linha["bytes"]) for linha in coletor.resumo()}
+    assert linhas == {"push cortes": (2, len(json.dumps([{"uid": "a"}, {"uid": "b"}]))), "UPDATE cortes": (3, 0)}
+
+
+def test_exportacao_prometheus_e_json(coletor):
+    for ms in (0.05, 3, 7000):
+        coletor.registrar("sqlite", 'SELECT "a\\b"', ms, linhas=1, tamanho=8)
+
+    texto = coletor.prometheus()
+    rotulos = 'categoria="sqlite",nome="SELECT \\"a\\\\b\\""'
+    assert texto.endswith("\n")
+    linhas = texto.splitlines()
+    assert linhas[0] == "# TYPE barbearia_latencia_ms histogram"
+    # Um bucket acumulado por limite, mais +Inf, soma, contagem, linhas e bytes
+    assert len(linhas) == 1 + len(LIMITES_MS) + 5
+    assert linhas[1] == f'barbearia_latencia_ms_bucket{{{rotulos},le="0.1"}} 1'
+    assert f'barbearia_latencia_ms_bucket{{{rotulos},le="2.5"}} 1' in linhas
+    assert f'barbearia_latencia_ms_bucket{{{rotulos},le="5"}} 2' in linhas
+    assert f'barbearia_latencia_ms_bucket{{{rotulos},le="5000"}} 2' in linhas
+    assert linhas[-5:] == [f'barbearia_latencia_ms_bucket{{{rotulos},le="+Inf"}} 3',
+                           f"barbearia_latencia_ms_sum{{{rotulos}}} 7003.05",
+                           f"barbearia_latencia_ms_count{{{rotulos}}} 3",
+                           f"barbearia_linhas_total{{{rotulos}}} 3",
+                           f"barbearia_bytes_total{{{rotulos}}} 24"]
+
+    # O JSON baixado na página de diagnóstico é o resumo, ida e volta sem perda
+    resumo = coletor.resumo()
+    assert json.loads(json.dumps(resumo, ensure_ascii=False)) == resumo
+    assert list(resumo[0]) == ["categoria", "nome", "chamadas", "total_ms", "media_ms", "p50_ms", "p95_ms",
+                               "maximo_ms", "linhas", "bytes", "baldes"]
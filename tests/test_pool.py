@@ -0,0 +1,102 @@
+"""Pool de conexões (banco.PoolConexoes): empréstimo e devolução entre threads, WAL e erro no meio do uso."""
+import threading
+import time
+
+import pytest
+
+from banco import PoolConexoes
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = PoolConexoes(str(tmp_path / "pool.db"), tamanho=4)
+    with pool.conexao() as conn, conn:
+        conn.execute("CREATE TABLE cortes (id INTEGER PRIMARY KEY, cliente TEXT)")
+    return pool
+
+
+def contar(conn):
+    return conn.execute("SELECT COUNT(*) FROM cortes").fetchone()[0]
+
+
+def test_empresta_e_devolve(pool):
+    with pool.conexao() as primeira:
+        pass
+    with pool.conexao() as conn:
+        assert conn is primeira  # LIFO: a última devolvida, com o cache de páginas quente
+
+    emprestadas = []
+    liberar = threading.Event()
+
+    def segurar():
+        with pool.conexao() as conn:
+            emprestadas.append(conn)
+            liberar.wait()
+
+    threads = [threading.Thread(target=segurar) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while len(emprestadas) < 4:
+        time.sleep(0.01)
+    assert len({id(conn) for conn in emprestadas}) == 4  # nenhuma conexão em duas threads ao mesmo tempo
+
+    # Pool esgotado: a quinta thread espera até uma conexão voltar
+    quinta = []
+
+    def esperar_a_vez():
+        with pool.conexao() as conn:
+            quinta.append(conn)
+
+    esperando = threading.Thread(target=esperar_a_vez)
+    esperando.start()
+    esperando.join(0.1)
+    assert esperando.is_alive()
+    liberar.set()
+    esperando.join(1)
+    assert not esperando.is_alive() and quinta[0] in emprestadas
+    for thread in threads:
+        thread.join()
+
+
+def test_leitores_nao_esperam_o_escritor(pool):
+    with pool.conexao() as escritor:
+        assert escritor.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        escritor.execute("BEGIN IMMEDIATE")  # segura a trava de escrita até o commit
+        escritor.execute("INSERT INTO cortes (cliente) VALUES ('Ana')")
+
+        vistos = []
+
+        def ler():
+            with pool.conexao() as conn:
+                vistos.append(contar(conn))
+
+        leitores = [threading.Thread(target=ler) for _ in range(3)]
+        inicio = time.perf_counter()
+        for thread in leitores:
+            thread.start()
+        for thread in leitores:
+            thread.join()
+        # Com WAL, os leitores veem o último commit na hora, sem esperar o busy_timeout
+        assert time.perf_counter() - inicio < 1
+        assert vistos == [0, 0, 0]
+        escritor.commit()
+
+    with pool.conexao() as conn:
+        assert contar(conn) == 1
+
+
+def test_conexao_volta_limpa_depois_de_uma_excecao(pool):
+    livres = pool._livres.qsize()
+    with pytest.raises(ValueError):
+        with pool.conexao() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT INTO cortes (cliente) VALUES ('Ana')")
+            raise ValueError("falhou no meio da gravação")
+
+    # A transação aberta foi desfeita: a conexão voltou ao pool e a trava de escrita foi solta
+    assert pool._livres.qsize() == livres
+    assert not conn.in_transaction
+    with pool.conexao() as conn, conn:
+        conn.execute("INSERT INTO cortes (cliente) VALUES ('Bia')")
+    with pool.conexao() as conn:
+        assert conn.execute("SELECT cliente FROM cortes").fetchall() == [("Bia",)]
@@ -0,0 +1,21 @@
+from datetime import date
+
+import pandas as pd
+
+from regras import classificar_planos, ordenar_situacoes
+
+
+def test_ordenar_situacoes_inclui_status_fora_da_lista():
+    assert ordenar_situacoes(["Cancelado", "Trancado", "Ativo", "ATRASADO", "Suspenso"]) == \
+        ["ATRASADO", "Ativo", "Cancelado", "Suspenso", "Trancado"]
+
+
+def test_classificar_planos_mantem_status_desconhecido():
+    hoje = date(2024, 3, 10)
+    df = pd.DataFrame({"cliente": ["Ana", "Bia", "Caio", "Duda"],
+                       "vencimento": ["2024-03-01", "2024-03-12", "2024-04-10", "2024-04-10"],
+                       "status": ["Ativo", "Ativo", "Ativo", "Suspenso"]})
+    planos = classificar_planos(df, hoje)
+    assert planos["situacao"].tolist() == ["ATRASADO", "Vence em Breve", "Ativo", "Suspenso"]
+    assert ordenar_situacoes(planos["situacao"].value_counts().index) == \
+        ["ATRASADO", "Vence em Breve", "Ativo", "Suspenso"]
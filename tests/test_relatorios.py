@@ -0,0 +1,90 @@
+"""Relatórios do Financeiro (relatorios.py) sobre um mês pequeno, com os números conferidos à mão."""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import relatorios
+
+MARCO, ABRIL, MAIO = date(2026, 3, 1), date(2026, 4, 1), date(2026, 5, 1)
+CORTES = [
+    # cliente, chegada, saida, pago, valor, barbeiro
+    ("Ana", "2026-03-02 09:00:00", "2026-03-02 09:30:00", 1, 40.0, "Rui"),   # segunda
+    ("Bia", "2026-03-02 09:30:00", "2026-03-02 09:50:00", 0, 30.0, "Rui"),   # fiado
+    ("Caio", "2026-03-02 10:00:00", None, 0, 35.0, "Leo"),                   # ainda na fila
+    ("Duda", "2026-03-03 09:10:00", "2026-03-03 09:50:00", 1, 50.0, "Leo"),  # terça
+    ("Edu", "2026-03-09 09:00:00", "2026-03-09 09:03:00", 1, 30.0, ""),      # 3 minutos: não medido
+    ("Fabi", "2026-03-09 11:00:00", "2026-03-09 11:25:00", 0, 45.0, "Rui"),  # fiado
+    ("Gil", "2026-04-01 14:00:00", "2026-04-01 14:30:00", 1, 40.0, "Leo"),   # quarta, outro mês
+]
+COLUNAS_SERIE = ["cortes", "finalizados", "faturado", "recebido", "a_receber", "ticket_medio", "minutos_medios"]
+
+
+@pytest.fixture
+def pool(banco_temporario):
+    with banco_temporario.conexao() as conn, conn:
+        conn.executemany("INSERT INTO cortes (cliente, chegada, saida, pago, valor, barbeiro) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", CORTES)
+    return banco_temporario
+
+
+def linhas(df, *colunas):
+    return df[list(colunas)].round(2).values.tolist()
+
+
+@pytest.mark.parametrize("agrupamento, esperado", [
+    ("dia", [("2026-03-02", 3, 2, 105.0, 40.0, 30.0, 13.33, 25.0),
+             ("2026-03-03", 1, 1, 50.0, 50.0, 0.0, 50.0, 40.0),
+             ("2026-03-09", 2, 2, 75.0, 30.0, 45.0, 15.0, 25.0),
+             ("2026-04-01", 1, 1, 40.0, 40.0, 0.0, 40.0, 30.0)]),
+    ("semana", [("2026-03-02", 4, 3, 155.0, 90.0, 30.0, 22.5, 30.0),
+                ("2026-03-09", 2, 2, 75.0, 30.0, 45.0, 15.0, 25.0),
+                ("2026-03-30", 1, 1, 40.0, 40.0, 0.0, 40.0, 30.0)]),
+    ("mes", [("2026-03-01", 6, 5, 230.0, 120.0, 75.0, 20.0, 28.75),
+             ("2026-04-01", 1, 1, 40.0, 40.0, 0.0, 40.0, 30.0)]),
+])
+def test_serie_por_dia_semana_e_mes(pool, agrupamento, esperado):
+    df = relatorios.serie(MARCO, MAIO, agrupamento)
+    assert list(df.columns) == ["periodo"] + COLUNAS_SERIE
+    assert df["periodo"].dt.strftime("%Y-%m-%d").tolist() == [linha[0] for linha in esperado]
+    assert linhas(df, *COLUNAS_SERIE) == [list(linha[1:]) for linha in esperado]
+
+
+def test_por_barbeiro_do_que_mais_faturou_ao_que_menos(pool):
+    df = relatorios.por_barbeiro(MARCO, ABRIL)
+    assert df["barbeiro"].tolist() == ["Rui", "Leo", "(sem barbeiro)"]
+    assert linhas(df, *COLUNAS_SERIE[:-1]) == [[3, 3, 115.0, 40.0, 75.0, 13.33],
+                                               [2, 1, 85.0, 50.0, 0.0, 25.0],
+                                               [1, 1, 30.0, 30.0, 0.0, 30.0]]
+    # Sem atendimento medido, a média fica vazia em vez de zero
+    assert df["minutos_medios"].round(2).tolist()[:2] == [25.0, 40.0]
+    assert pd.isna(df["minutos_medios"].iloc[2])
+
+
+def test_tempo_medio_ignora_atendimentos_fora_da_faixa(pool):
+    assert relatorios.tempo_medio(MARCO, ABRIL) == pytest.approx(28.75)
+    assert relatorios.tempo_medio(date(2026, 3, 9), date(2026, 3, 10)) == pytest.approx(25.0)
+    assert relatorios.tempo_medio(date(2026, 2, 1), MARCO) is None
+
+
+def test_ocupacao_por_hora_media_nos_dias_abertos(pool):
+    mapa = relatorios.ocupacao_por_hora(MARCO, ABRIL)
+    assert mapa.index.tolist() == relatorios.DIAS_SEMANA
+    assert mapa.columns.tolist() == [9, 10, 11]
+    # Segunda: duas segundas abertas, três chegadas às 9h, uma às 10h (dia 2) e uma às 11h (dia 9)
+    assert mapa.loc["Seg"].tolist() == [1.5, 0.5, 0.5]
+    assert mapa.loc["Ter"].tolist() == [1.0, 0.0, 0.0]
+    assert mapa.drop(index=["Seg", "Ter"]).to_numpy().sum() == 0
+
+    vazio = relatorios.ocupacao_por_hora(date(2026, 2, 1), MARCO)
+    assert vazio.empty and vazio.index.tolist() == relatorios.DIAS_SEMANA
+
+
+def test_a_receber_lista_e_total_batem(pool):
+    lista = relatorios.a_receber(MARCO, ABRIL)
+    assert lista["cliente"].tolist() == ["Bia", "Fabi"]  # Caio ainda está na fila: nada a receber
+
+    painel = relatorios.Painel.carregar(MARCO, ABRIL, "semana")
+    assert painel.serie["a_receber"].sum() == lista["valor"].sum() == 75.0
+    assert painel.por_barbeiro["a_receber"].sum() == 75.0
+    assert painel.tempo_medio == pytest.approx(28.75)
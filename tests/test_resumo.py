@@ -0,0 +1,112 @@
+"""resumo_diario mantido pelos triggers é sempre igual a recalculá-lo do zero (SQL_RECONSTRUIR_RESUMO)."""
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import banco
+
+CORTES = [
+    # cliente, chegada, saida, pago, valor, barbeiro
+    ("Ana", "2026-03-02 09:00:00", None, 0, 35.0, "Rui"),                       # em aberto
+    ("Bia", "2026-03-02 09:30:00", "2026-03-02 10:05:00", 0, 40.0, "Rui"),      # finalizado, fiado
+    ("Caio", "2026-03-02 10:00:00", "2026-03-02 10:30:00", 1, 30.0, "Leo"),     # finalizado e pago
+    ("Duda", "2026-03-02 23:50:00", "2026-03-03 00:20:00", 1, 30.0, "Leo"),     # atravessa a meia-noite
+    ("Edu", "2026-03-03 08:00:00", "2026-03-03 08:03:00", 1, None, "Rui"),      # 3 minutos: não medido
+    ("Fabi", "2026-03-03 09:00:00", "2026-03-03 13:00:00", 1, 45.0, ""),        # 4 horas: não medido
+]
+
+
+@pytest.fixture
+def pool(banco_temporario):
+    with banco_temporario.conexao() as conn, conn:
+        conn.executemany("INSERT INTO cortes (cliente, chegada, saida, pago, valor, barbeiro) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", CORTES)
+    return banco_temporario
+
+
+def resumo(pool):
+    # Dias que ficaram sem cortes (correção de chegada, exclusão) continuam como linhas zeradas;
+    # minutos é soma de julianday, arredondada para comparar somas feitas em ordens diferentes
+    with pool.conexao() as conn:
+        linhas = conn.execute("SELECT dia, barbeiro, cortes, finalizados, faturado, recebido, a_receber, "
+                              "minutos, medidos FROM resumo_diario WHERE cortes <> 0 "
+                              "ORDER BY dia, barbeiro").fetchall()
+    return [linha[:7] + (round(linha[7], 6), linha[8]) for linha in linhas]
+
+
+def assert_igual_a_reconstruir(pool):
+    mantido = resumo(pool)
+    banco.reconstruir_resumo()
+    assert mantido == resumo(pool)
+
+
+def test_check_in_entra_no_resumo(pool):
+    # a_receber só conta o atendido e não pago: Ana, ainda na fila, fica de fora
+    assert resumo(pool) == [
+        ("2026-03-02", "Leo", 2, 2, 60.0, 60.0, 0.0, 60.0, 2),
+        ("2026-03-02", "Rui", 2, 1, 75.0, 0.0, 40.0, 35.0, 1),
+        ("2026-03-03", "", 1, 1, 45.0, 45.0, 0.0, 0.0, 0),
+        ("2026-03-03", "Rui", 1, 1, 0.0, 0.0, 0.0, 0.0, 0),
+    ]
+    assert_igual_a_reconstruir(pool)
+
+
+@pytest.mark.parametrize("sql, params", [
+    ("UPDATE cortes SET pago = 1 WHERE cliente = ?", ("Bia",)),
+    ("UPDATE cortes SET pago = 0 WHERE cliente = ?", ("Caio",)),
+    ("UPDATE cortes SET valor = 50 WHERE cliente = ?", ("Caio",)),
+    ("UPDATE cortes SET valor = NULL WHERE cliente = ?", ("Bia",)),
+    ("UPDATE cortes SET saida = '2026-03-02 09:40:00' WHERE cliente = ?", ("Ana",)),
+    ("UPDATE cortes SET saida = NULL WHERE cliente = ?", ("Caio",)),
+    ("UPDATE cortes SET chegada = '2026-03-01 10:00:00' WHERE cliente = ?", ("Caio",)),
+    ("UPDATE cortes SET chegada = '2026-03-03 10:00:00', saida = '2026-03-03 10:25:00' WHERE cliente = ?",
+     ("Bia",)),
+    ("UPDATE cortes SET barbeiro = 'Leo' WHERE cliente = ?", ("Ana",)),
+    ("DELETE FROM cortes WHERE cliente = ?", ("Caio",)),
+    ("DELETE FROM cortes WHERE chegada < ?", ("2026-03-03",)),
+], ids=["receber", "estornar", "valor", "sem valor", "finalizar", "reabrir", "outro dia",
+        "outro dia e saida", "outro barbeiro", "excluir", "excluir o dia"])
+def test_alteracao_mantem_resumo_igual_a_reconstruir(pool, sql, params):
+    with pool.conexao() as conn, conn:
+        assert conn.execute(sql, params).rowcount
+    assert_igual_a_reconstruir(pool)
+
+
+def test_linha_de_comando_reconstroi_o_resumo(pool, tmp_path):
+    esperado = resumo(pool)
+    with pool.conexao() as conn, conn:
+        conn.execute("DELETE FROM resumo_diario")
+
+    # banco.ARQUIVO_DB é relativo: na pasta do teste, o CLI abre o mesmo barbearia.db
+    saida = subprocess.run([sys.executable, banco.__file__, "--reconstruir-resumo"], cwd=tmp_path,
+                           capture_output=True, text=True, check=True).stdout
+
+    assert "2 dia(s), 6 corte(s)" in saida
+    assert resumo(pool) == esperado
+
+
+def test_resumo_do_supabase_tem_as_colunas_da_replica(banco_temporario):
+    # Sem Postgres aqui: confere o texto das migrações, aplicadas em ordem, contra o esquema local
+    migracoes = sorted((Path(banco.__file__).parent / "supabase" / "migrations").glob("*.sql"))
+    sql = "\n".join(arquivo.read_text(encoding="utf-8") for arquivo in migracoes)
+    tabela = re.search(r"create table if not exists public\.resumo_diario \((.*?)\n\);", sql, re.S).group(1)
+    colunas = [linha.split()[0] for linha in tabela.strip().splitlines() if not linha.strip().startswith("primary")]
+    for alteracao in re.findall(r"alter table public\.resumo_diario(.*?);", sql, re.S):
+        colunas += re.findall(r"add column if not exists (\w+)", alteracao)
+
+    with banco_temporario.conexao() as conn:
+        locais = [linha[1] for linha in conn.execute("PRAGMA table_info(resumo_diario)")]
+    assert colunas == locais
+
+    # A versão em vigor de cada função que grava no resumo preenche todas as colunas
+    for funcao in ("aplicar_resumo_diario", "reconstruir_resumo_diario"):
+        corpo = sql[sql.rindex(f"create or replace function public.{funcao}("):]
+        lista = re.search(r"insert into public\.resumo_diario(?: as r)? \((.*?)\)", corpo, re.S).group(1)
+        assert [c.strip() for c in lista.split(",")] == locais, funcao
+
+    # resumo_financeiro não é chamado por ninguém: removido, e nenhuma migração posterior o recria
+    depois_de_remover = sql[sql.rindex("drop function if exists public.resumo_financeiro"):]
+    assert "function public.resumo_financeiro" not in depois_de_remover
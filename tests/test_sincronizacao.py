@@ -0,0 +1,189 @@
+"""Sincronização da réplica local com o supabase_local.ClienteSupabaseLocal no lugar do Supabase."""
+import time
+from datetime import datetime
+
+import pytest
+
+import banco
+import sincronizacao
+from sincronizacao import Sincronizador
+from supabase_local import ClienteSupabaseLocal
+
+
+@pytest.fixture
+def remoto():
+    return ClienteSupabaseLocal()
+
+
+@pytest.fixture
+def sincronizador(banco_temporario, remoto):
+    sincronizador = Sincronizador(remoto)  # sem iniciar(): os ciclos rodam só quando o teste pede
+    yield sincronizador
+    sincronizador._executor.shutdown()
+
+
+def hoje_as(hora):
+    return datetime.now().replace(hour=hora, minute=0, second=0, microsecond=0)
+
+
+def executar(sql, params=()):
+    with banco.get_pool().conexao() as conn, conn:
+        conn.execute(sql, params)
+
+
+def consultar(sql, params=()):
+    with banco.get_pool().conexao() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def marca(tabela):
+    (valor,), = consultar("SELECT valor FROM sync_controle WHERE chave = ?", (f"marca_{tabela}",))
+    return valor
+
+
+def remotos(remoto, tabela="cortes"):
+    return {linha["uid"]: linha for linha in remoto.table(tabela).select("*").execute().data}
+
+
+def test_recebe_e_envia_e_avanca_a_marca(sincronizador, remoto, monkeypatch):
+    # Lotes pequenos: o pull passa por várias páginas do keyset (updated_at, uid)
+    monkeypatch.setattr(sincronizacao, "TAMANHO_LOTE_SYNC", 2)
+    remoto.table("cortes").insert([{"cliente": f"Remoto {i}", "chegada": hoje_as(9 + i).astimezone().isoformat(),
+                                    "valor": 35} for i in range(5)]).execute()
+    remoto.table("planos").insert({"cliente": "Ana", "vencimento": "2030-01-10", "status": "Ativo"}).execute()
+    sincronizador.sincronizar()
+
+    locais = consultar("SELECT cliente, chegada, pendente FROM cortes ORDER BY chegada")
+    assert locais == [(f"Remoto {i}", f"{hoje_as(9 + i):%Y-%m-%d %H:%M:%S}", 0) for i in range(5)]
+    assert consultar("SELECT cliente, vencimento, pendente FROM planos") == [("Ana", "2030-01-10", 0)]
+    assert marca("cortes") == max(linha["updated_at"] for linha in remotos(remoto).values())
+
+    executar("INSERT INTO cortes (cliente, chegada, valor) VALUES ('Local', ?, 40)",
+             (f"{hoje_as(15):%Y-%m-%d %H:%M:%S}",))
+    assert sincronizador.pendentes() == 1
+    sincronizador.sincronizar()
+    assert sincronizador.pendentes() == 0
+    (uid,), = consultar("SELECT uid FROM cortes WHERE cliente = 'Local'")
+    assert remotos(remoto)[uid]["valor"] == 40
+
+    # A marca só anda com alterações remotas mais novas
+    anterior = marca("cortes")
+    remoto.table("cortes").update({"pago": True}).eq("uid", uid).execute()
+    sincronizador.sincronizar()
+    assert marca("cortes") > anterior
+    assert consultar("SELECT pago, pendente FROM cortes WHERE uid = ?", (uid,)) == [(1, 0)]
+
+
+def test_conflito_vence_a_alteracao_mais_recente(sincronizador, remoto):
+    remoto.table("cortes").insert([{"cliente": "Ana", "chegada": hoje_as(9).astimezone().isoformat(), "valor": 30},
+                                   {"cliente": "Bia", "chegada": hoje_as(10).astimezone().isoformat(), "valor": 30}]
+                                  ).execute()
+    sincronizador.sincronizar()
+    uid_ana, uid_bia = (uid for (uid,) in consultar("SELECT uid FROM cortes ORDER BY chegada"))
+
+    # Ana: local primeiro, remoto depois -> vence o remoto
+    executar("UPDATE cortes SET valor = 40 WHERE uid = ?", (uid_ana,))
+    time.sleep(0.01)
+    remoto.table("cortes").update({"valor": 50}).eq("uid", uid_ana).execute()
+    # Bia: remoto primeiro, local depois -> vence o local, que é enviado
+    remoto.table("cortes").update({"valor": 60}).eq("uid", uid_bia).execute()
+    time.sleep(0.01)
+    executar("UPDATE cortes SET valor = 70 WHERE uid = ?", (uid_bia,))
+
+    sincronizador.sincronizar()
+    assert consultar("SELECT valor, pendente FROM cortes ORDER BY chegada") == [(50, 0), (70, 0)]
+    assert {uid: linha["valor"] for uid, linha in remotos(remoto).items()} == {uid_ana: 50, uid_bia: 70}
+
+
+def test_fila_ao_vivo_ve_alteracao_remota(sincronizador, remoto):
+    remoto.table("cortes").insert([{"cliente": "Ana", "chegada": hoje_as(9).astimezone().isoformat(), "valor": 30},
+                                   {"cliente": "Bia", "chegada": hoje_as(10).astimezone().isoformat(), "valor": 30}]
+                                  ).execute()
+    sincronizador.sincronizar()
+    fila = banco.FilaAoVivo()
+    assert [c.cliente for c in fila.linhas] == ["Bia", "Ana"]
+    assert not fila.atualizar()
+
+    # Em outro aparelho: Ana foi atendida e paga, Caio chegou
+    (uid_ana,), = consultar("SELECT uid FROM cortes WHERE cliente = 'Ana'")
+    remoto.table("cortes").update({"saida": hoje_as(9).replace(minute=30).astimezone().isoformat(),
+                                   "pago": True}).eq("uid", uid_ana).execute()
+    remoto.table("cortes").insert({"cliente": "Caio", "chegada": hoje_as(11).astimezone().isoformat(),
+                                   "valor": 30}).execute()
+    sincronizador.sincronizar()
+
+    assert fila.atualizar()
+    assert [c.cliente for c in fila.linhas] == ["Caio", "Bia"]
+    assert [c.cliente for c in fila.linhas] == [c.cliente for c in banco.carregar_fila(usar_cache=False)]
+
+
+def test_tabelas_sincronizam_em_paralelo(sincronizador, remoto):
+    remoto.table("cortes").insert({"cliente": "Ana", "chegada": hoje_as(9).astimezone().isoformat()}).execute()
+    remoto.table("planos").insert({"cliente": "Ana", "vencimento": "2030-01-10"}).execute()
+    sincronizador.sincronizar()
+
+    # Com uma alteração local em cada tabela, cada uma faz pull e push: 2 idas e voltas por tabela
+    executar("UPDATE cortes SET valor = COALESCE(valor, 0) + 1")
+    executar("UPDATE planos SET obs = COALESCE(obs, '') || '.'")
+    remoto.latencia = 0.05
+    remoto.requisicoes.clear()
+    sincronizador.sincronizar()
+
+    por_tabela = {tabela: [(inicio, fim) for t, _, inicio, fim in remoto.requisicoes if t == tabela]
+                  for tabela in sincronizacao.COLUNAS}
+    assert [len(intervalos) for intervalos in por_tabela.values()] == [2, 2]
+    # Em paralelo, cada requisição de cortes se sobrepõe no tempo a uma de planos
+    # (em sequência, planos só começaria depois que cortes terminasse)
+    assert all(any(inicio < fim_outra and inicio_outra < fim for inicio_outra, fim_outra in por_tabela["planos"])
+               for inicio, fim in por_tabela["cortes"])
+    assert sincronizador.pendentes() == 0
+    assert [linha["valor"] for linha in remotos(remoto).values()] == [1]
+
+
+def test_reler_a_mesma_versao_nao_regrava(sincronizador, remoto):
+    remoto.table("cortes").insert([{"cliente": "Ana", "chegada": hoje_as(9).astimezone().isoformat(), "valor": 30},
+                                   {"cliente": "Bia", "chegada": hoje_as(10).astimezone().isoformat(), "valor": 30}]
+                                  ).execute()
+    sincronizador.sincronizar()
+    antes = consultar("SELECT uid, updated_at, valor FROM cortes ORDER BY uid")
+    seq = banco.ultima_alteracao()
+
+    # Dentro da MARGEM_MARCA o pull traz as mesmas linhas de novo: nada muda na réplica
+    sincronizador.sincronizar()
+    assert consultar("SELECT uid, updated_at, valor FROM cortes ORDER BY uid") == antes
+    assert banco.ultima_alteracao() == seq
+
+    (uid_ana,), = consultar("SELECT uid FROM cortes WHERE cliente = 'Ana'")
+    remoto.table("cortes").update({"valor": 45}).eq("uid", uid_ana).execute()
+    sincronizador.sincronizar()
+    assert banco.alteracoes_desde("cortes", seq)[1] == {consultar("SELECT id FROM cortes WHERE uid = ?",
+                                                                 (uid_ana,))[0][0]}
+
+
+def esperar(condicao, limite=2.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        if time.monotonic() > fim:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_evento_realtime_antecipa_o_ciclo(sincronizador, remoto):
+    sincronizador.escutar_realtime("http://localhost", "chave", cliente_realtime=remoto.realtime)
+    assert esperar(lambda: remoto.assinantes("cortes") and remoto.assinantes("planos"))
+    assert not sincronizador._acordar.is_set()
+
+    # Outro aparelho grava no Supabase: o evento acorda o ciclo antes do intervalo fixo
+    remoto.table("cortes").insert({"cliente": "Ana", "chegada": hoje_as(9).astimezone().isoformat()}).execute()
+    assert sincronizador._acordar.wait(2)
+    sincronizador._acordar.clear()
+    sincronizador.sincronizar()
+    assert consultar("SELECT cliente FROM cortes") == [("Ana",)]
+
+    # Update que não alterou linha não gera evento; com a conexão caída, vale só o ciclo fixo
+    remoto.table("planos").update({"obs": "x"}).eq("uid", "nenhum").execute()
+    conexao, = remoto._conexoes_realtime
+    conexao.desconectar()
+    remoto.table("planos").insert({"cliente": "Ana", "vencimento": "2030-01-10"}).execute()
+    assert not sincronizador._acordar.is_set()
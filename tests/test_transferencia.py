@@ -0,0 +1,34 @@
+import io
+
+import pandas as pd
+import pytest
+
+from transferencia import _normalizar, importar
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("R$ 1.234,56", 1234.56),
+    ("1.234.567,8", 1234567.8),
+    ("R$ 30,00", 30.0),
+    ("45.5", 45.5),
+    ("R$ 40", 40.0),
+    ("abc", None),
+])
+def test_normalizar_valor_em_reais(texto, esperado):
+    df = pd.DataFrame({"cliente": ["Ana"], "valor": [texto]})
+    assert _normalizar("cortes", df)["valor"].iloc[0] == esperado
+
+
+def test_normalizar_valor_numerico():
+    df = pd.DataFrame({"cliente": ["Ana", "Bia"], "valor": [35.0, 1234.56]})
+    assert _normalizar("cortes", df)["valor"].tolist() == [35.0, 1234.56]
+
+
+def test_importar_csv_com_valores_em_reais(banco_temporario):
+    csv = ("cliente;chegada;valor;pago\n"
+           "Ana;01/03/2024 10:00;R$ 1.234,56;sim\n"
+           "Bia;2024-03-01 11:00;35,00;não\n")
+    assert importar("cortes", io.BytesIO(csv.encode("utf-8")), formato="csv") == 2
+    with banco_temporario.conexao() as conn:
+        linhas = conn.execute("SELECT cliente, chegada, valor, pago FROM cortes ORDER BY cliente").fetchall()
+    assert linhas == [("Ana", "2024-03-01 10:00:00", 1234.56, 1), ("Bia", "2024-03-01 11:00:00", 35.0, 0)]
@@ -0,0 +1,249 @@
+"""Exportação e importação em lotes de cortes e planos (CSV e Parquet).
+
+Nenhum dos lados carrega a tabela inteira na memória: a exportação lê o
+SQLite local com fetchmany e grava lote por lote no arquivo; a importação lê
+o arquivo em pedaços e grava cada pedaço de uma vez (executemany no SQLite,
+insert em lote no Supabase).
+
+O uid vai junto na exportação, então reimportar o mesmo arquivo (ou levá-lo do
+barber.py para o app.py) não duplica linhas. Planilhas antigas, sem uid,
+ganham um na importação.
+
+Linha de comando (contabilidade e migração entre barber.py e app.py):
+    python transferencia.py exportar cortes extrato.parquet --inicio 2026-01-01 --fim 2026-02-01
+    python transferencia.py importar cortes planilha_antiga.csv
+    python transferencia.py importar cortes extrato.parquet --supabase
+"""
+import argparse
+import csv
+import io
+import os
+import tempfile
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from banco import get_pool, get_cache, fonte_cortes
+from metricas import medir
+from sincronizacao import COLUNAS, COLUNAS_DATA_HORA, COLUNAS_BOOL, _para_remoto
+
+TAMANHO_LOTE_ARQUIVO = 5000   # linhas lidas/gravadas por vez no arquivo
+TAMANHO_LOTE_SUPABASE = 500   # linhas por requisição ao Supabase
+
+# Colunas de cada tabela no arquivo, na ordem em que são gravadas
+COLUNAS_ARQUIVO = {tabela: ["uid"] + colunas for tabela, colunas in COLUNAS.items()}
+# Filtro de período: coluna de data de cada tabela
+COLUNA_PERIODO = {"cortes": "chegada", "planos": "vencimento"}
+# Valores das colunas NOT NULL quando a planilha não traz a coluna
+PADROES = {"barbeiro": "", "status": "Ativo", "pago": 0, "excluido": 0}
+
+ESQUEMA_PARQUET = {
+    "cortes": pa.schema([("uid", pa.string()), ("cliente", pa.string()),
+                         ("chegada", pa.timestamp("s")), ("saida", pa.timestamp("s")),
+                         ("pago", pa.bool_()), ("valor", pa.float64()), ("barbeiro", pa.string()),
+                         ("inicio", pa.timestamp("s"))]),
+    "planos": pa.schema([("uid", pa.string()), ("cliente", pa.string()), ("vencimento", pa.date32()),
+                         ("status", pa.string()), ("obs", pa.string()), ("excluido", pa.bool_())]),
+}
+
+# Tipo em que o valor sai do SQLite, para as colunas que o Arrow precisa converter
+_TIPO_SQLITE = {pa.timestamp("s").id: pa.string(), pa.date32().id: pa.string(), pa.bool_().id: pa.int8()}
+
+VALORES_VERDADEIROS = {"1", "1.0", "true", "sim", "s", "pago", "yes", "x"}
+
+
+def _formato(arquivo, formato):
+    if formato:
+        return formato
+    nome = arquivo if isinstance(arquivo, (str, os.PathLike)) else getattr(arquivo, "name", "")
+    return "parquet" if str(nome).lower().endswith(".parquet") else "csv"
+
+
+# --- EXPORTAÇÃO ---
+def exportar(tabela, destino, formato=None, inicio=None, fim=None):
+    """Grava a tabela (ou o período inicio <= data < fim) em destino. Devolve o número de linhas.
+
+    destino pode ser um caminho ou um arquivo binário aberto.
+    """
+    colunas = COLUNAS_ARQUIVO[tabela]
+    filtros, params = [], []
+    if tabela == "planos":
+        filtros.append("excluido = 0")
+    if inicio:
+        filtros.append(f"{COLUNA_PERIODO[tabela]} >= ?")
+        params.append(inicio.isoformat())
+    if fim:
+        filtros.append(f"{COLUNA_PERIODO[tabela]} < ?")
+        params.append(fim.isoformat())
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    # Cortes arquivados do período também saem (banco.fonte_cortes)
+    fonte = fonte_cortes(inicio, fim, ", ".join(["id"] + colunas)) if tabela == "cortes" else tabela
+    # Ordem do índice de período: o SQLite entrega as linhas já ordenadas, sem ordenar em memória
+    sql = f"SELECT {', '.join(colunas)} FROM {fonte} {where} ORDER BY {COLUNA_PERIODO[tabela]}, id"
+
+    gravar_lote, fechar = (_escritor_parquet if _formato(destino, formato) == "parquet"
+                           else _escritor_csv)(tabela, destino)
+    total = 0
+    try:
+        with get_pool().conexao() as conn:
+            cursor = conn.execute(sql, params)
+            while lote := cursor.fetchmany(TAMANHO_LOTE_ARQUIVO):
+                gravar_lote(lote)
+                total += len(lote)
+    finally:
+        fechar()
+    return total
+
+
+def _escritor_csv(tabela, destino):
+    binario = not isinstance(destino, (str, os.PathLike))
+    arquivo = (io.TextIOWrapper(destino, encoding="utf-8", newline="") if binario
+               else open(destino, "w", encoding="utf-8", newline=""))
+    escritor = csv.writer(arquivo)
+    escritor.writerow(COLUNAS_ARQUIVO[tabela])
+
+    def fechar():
+        if binario:
+            arquivo.flush()
+            arquivo.detach()  # devolve o arquivo de quem chamou aberto
+        else:
+            arquivo.close()
+    return escritor.writerows, fechar
+
+
+def _escritor_parquet(tabela, destino):
+    esquema = ESQUEMA_PARQUET[tabela]
+    escritor = pq.ParquetWriter(destino, esquema)
+
+    def gravar_lote(lote):
+        # Cada lote vira um row group; datas (texto) e booleanos (0/1) chegam como o
+        # SQLite guarda e o Arrow converte
+        colunas = list(zip(*lote))
+        arrays = [pa.array(valores, _TIPO_SQLITE.get(campo.type.id, campo.type)).cast(campo.type)
+                  for campo, valores in zip(esquema, colunas)]
+        escritor.write_table(pa.Table.from_arrays(arrays, schema=esquema))
+    return gravar_lote, escritor.close
+
+
+def arquivo_exportado(tabela, formato, inicio=None, fim=None):
+    """Exporta para um arquivo temporário e o devolve aberto no início (para o st.download_button)."""
+    arquivo = tempfile.TemporaryFile()
+    exportar(tabela, arquivo, formato, inicio, fim)
+    arquivo.seek(0)
+    return arquivo
+
+
+# --- IMPORTAÇÃO ---
+def _ler_em_lotes(origem, formato, codificacao):
+    if _formato(origem, formato) == "parquet":
+        for lote in pq.ParquetFile(origem).iter_batches(batch_size=TAMANHO_LOTE_ARQUIVO):
+            yield lote.to_pandas()
+        return
+    # Planilhas exportadas pelo Excel em português costumam vir separadas por ';'
+    arquivo = open(origem, "rb") if isinstance(origem, (str, os.PathLike)) else origem
+    try:
+        amostra = arquivo.read(4096).decode(codificacao, errors="ignore")
+        arquivo.seek(0)
+        separador = ";" if amostra.count(";") > amostra.count(",") else ","
+        yield from pd.read_csv(arquivo, sep=separador, dtype=str, encoding=codificacao,
+                               chunksize=TAMANHO_LOTE_ARQUIVO)
+    finally:
+        if arquivo is not origem:
+            arquivo.close()
+
+
+def _normalizar(tabela, df):
+    """Converte um pedaço da planilha para o formato do banco local."""
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    if "cliente" not in df.columns:
+        raise ValueError(f"Arquivo sem a coluna 'cliente' (colunas: {', '.join(df.columns)})")
+    saida = pd.DataFrame(index=df.index)
+    for coluna in COLUNAS_ARQUIVO[tabela]:
+        valores = df[coluna] if coluna in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if coluna in COLUNAS_DATA_HORA or coluna == "vencimento":
+            # ISO primeiro (dayfirst trocaria dia e mês de 2024-02-01); o resto como dd/mm/aaaa
+            instantes = pd.to_datetime(valores, format="ISO8601", errors="coerce")
+            instantes = instantes.fillna(pd.to_datetime(valores[instantes.isna()], format="mixed",
+                                                        dayfirst=True, errors="coerce"))
+            valores = instantes.dt.strftime("%Y-%m-%d" if coluna == "vencimento" else "%Y-%m-%d %H:%M:%S")
+        elif coluna in COLUNAS_BOOL:
+            valores = valores.astype(str).str.strip().str.lower().isin(VALORES_VERDADEIROS).astype(int)
+        elif coluna == "valor":
+            if not pd.api.types.is_numeric_dtype(valores):
+                valores = valores.astype(str).str.replace("R$", "", regex=False).str.strip()
+                # Com vírgula decimal ("1.234,56"), os pontos são separadores de milhar
+                virgula = valores.str.contains(",", regex=False)
+                valores = valores.where(~virgula, valores.str.replace(".", "", regex=False)
+                                                         .str.replace(",", ".", regex=False))
+            valores = pd.to_numeric(valores, errors="coerce")
+        if coluna in PADROES:
+            valores = valores.fillna(PADROES[coluna])
+        saida[coluna] = valores
+    saida = saida[saida["cliente"].notna()]
+    # NaN/NaT viram NULL; astype(object) também troca os escalares do numpy pelos do Python
+    return saida.astype(object).where(saida.notna(), None)
+
+
+def importar(tabela, origem, formato=None, cliente=None, codificacao="utf-8-sig"):
+    """Carrega origem (caminho ou arquivo binário) na tabela. Devolve o número de linhas gravadas.
+
+    Sem cliente, grava no SQLite local (o app.py envia ao Supabase na próxima
+    sincronização); com um cliente do Supabase, grava direto nele.
+    Linhas cujo uid já existe no destino (inclusive entre os cortes arquivados)
+    são ignoradas (no Supabase entram na contagem, que lá é a de linhas enviadas).
+    """
+    colunas = COLUNAS_ARQUIVO[tabela]
+    sql = (f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))}) "
+           f"ON CONFLICT (uid) DO NOTHING")
+    total = 0
+    for pedaco in _ler_em_lotes(origem, formato, codificacao):
+        linhas = _normalizar(tabela, pedaco)
+        if cliente is None:
+            with get_pool().conexao() as conn:
+                with conn:  # um commit por pedaço
+                    # uid nulo: o trigger de sincronização gera um novo
+                    total += conn.executemany(sql, linhas.itertuples(index=False, name=None)).rowcount
+        else:
+            dados = [{c: _para_remoto(c, v) for c, v in zip(colunas, linha)}
+                     for linha in linhas.itertuples(index=False, name=None)]
+            for dado in dados:
+                dado["uid"] = dado["uid"] or str(uuid.uuid4())
+            for i in range(0, len(dados), TAMANHO_LOTE_SUPABASE):
+                with medir("supabase", f"importar {tabela}") as medida:
+                    lote = dados[i:i + TAMANHO_LOTE_SUPABASE]
+                    cliente.table(tabela).upsert(lote, on_conflict="uid", ignore_duplicates=True).execute()
+                    medida.resultado(lote)
+            total += len(dados)
+    if cliente is None:
+        get_cache().invalidar(tabela)
+    return total
+
+
+# --- LINHA DE COMANDO ---
+if __name__ == "__main__":
+    from datetime import date
+
+    parser = argparse.ArgumentParser(description="Exporta/importa cortes e planos em CSV ou Parquet.")
+    parser.add_argument("acao", choices=["exportar", "importar"])
+    parser.add_argument("tabela", choices=list(COLUNAS))
+    parser.add_argument("arquivo")
+    parser.add_argument("--formato", choices=["csv", "parquet"], help="padrão: pela extensão do arquivo")
+    parser.add_argument("--inicio", type=date.fromisoformat, help="exportar: primeiro dia (AAAA-MM-DD)")
+    parser.add_argument("--fim", type=date.fromisoformat, help="exportar: dia seguinte ao último")
+    parser.add_argument("--codificacao", default="utf-8-sig", help="importar CSV (ex.: latin-1)")
+    parser.add_argument("--supabase", action="store_true",
+                        help="importar direto no Supabase (credenciais de .streamlit/secrets.toml)")
+    args = parser.parse_args()
+
+    if args.acao == "exportar":
+        n = exportar(args.tabela, args.arquivo, args.formato, args.inicio, args.fim)
+    else:
+        cliente = None
+        if args.supabase:
+            import streamlit as st
+            from supabase import create_client
+            cliente = create_client(st.secrets["supabase"]["url"], st.secrets["supabase"]["key"])
+        n = importar(args.tabela, args.arquivo, args.formato, cliente, args.codificacao)
+    print(f"{n} linha(s) de {args.tabela}.")